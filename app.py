@@ -1,6 +1,7 @@
 from os import environ as env
 from dotenv import find_dotenv, load_dotenv
 from urllib.parse import quote_plus, urlencode
+from requests.exceptions import RequestException
 
 from authlib.integrations.flask_client import OAuth
 
@@ -9,7 +10,14 @@ from flask import redirect, session, url_for, request
 from flask_cors import CORS
 
 from logger import logger
-from blueprint import searcher_bp, forum_bp
+from json_provider import FastJSONProvider
+from timing import timings
+from metrics import metrics
+from tracing import tracer
+from compression import compression
+from sessions import sessions
+from upstream import UpstreamUnavailable
+from blueprint import searcher_bp, forum_bp, status_bp
 
 
 ENV_FILE = find_dotenv()
@@ -24,9 +32,16 @@ auth_tag = Tag(
 )
 
 app = OpenAPI(__name__, info=info)
+app.json = FastJSONProvider(app)
+# Registrados primeiro para medir a resposta final, já comprimida.
+timings.init_app(app)
+metrics.init_app(app)
+tracer.init_app(app)
 CORS(app)
+compression.init_app(app)
 
 app.secret_key = env.get("APP_SECRET_KEY")
+sessions.init_app(app)
 
 oauth = OAuth(app)
 oauth.register(
@@ -40,6 +55,29 @@ oauth.register(
 )
 
 
+@app.errorhandler(UpstreamUnavailable)
+def handle_upstream_unavailable(error):
+    """O serviço integrado não foi chamado por estar com o circuito aberto ou com o
+    limite de requisições simultâneas atingido. Retorna 503 com o cabeçalho
+    Retry-After.
+    """
+    logger.warning("Serviço integrado indisponível: %s", error)
+    return (
+        {"error": "Upstream service unavailable"},
+        503,
+        {"Retry-After": str(error.retry_after)},
+    )
+
+
+@app.errorhandler(RequestException)
+def handle_upstream_error(error):
+    """Falhas de conexão ou timeout com os serviços integrados são retornadas
+    como 502 ao invés de um erro interno do APP.
+    """
+    logger.warning("Falha na comunicação com serviço integrado: %s", error)
+    return {"error": "Upstream service unavailable"}, 502
+
+
 @app.get("/docs")
 def get_documentation():
     """Redireciona para a rota das documetações fornecidas pelo flask-openapi"""
@@ -61,22 +99,24 @@ def login():
 @app.route("/callback", methods=["GET", "POST"])
 def callback():
     """Rota de retorno do provedor Auth0.
-    Nessa rota o token de acesso e as informações de usuário são armazenados no
-    cookie session do flask para manter o usuário autenticado.
+    Nessa rota o token de acesso e as informações de usuário são armazenados na
+    sessão para manter o usuário autenticado. A sessão fica no servidor (sessions.py)
+    e o cookie contém somente o seu id, que é trocado no login.
     """
     token = oauth.auth0.authorize_access_token()
-    logger.debug("Adiciona info de usuário logado no session cookie.")
+    logger.debug("Adiciona info de usuário logado na sessão.")
+    sessions.regenerate(session)
     session["user"] = token
     return redirect("/")
 
 
 @app.get("/logout", tags=[auth_tag])
 def logout():
-    """Rota para limpar as informações de usuário autenticado do cookie session.
-    Depois disso o usuário não estará mais autenticado.
+    """Rota para limpar as informações de usuário autenticado da sessão, removendo-a
+    do servidor. Depois disso o usuário não estará mais autenticado.
     """
     session.clear()
-    logger.debug("Limpa o session cookie de usuario que estava logado.")
+    logger.debug("Limpa a sessão de usuario que estava logado.")
     return redirect(
         "https://"
         + env.get("AUTH0_DOMAIN")
@@ -113,3 +153,4 @@ def home():
 
 app.register_api(searcher_bp)
 app.register_api(forum_bp)
+app.register_api(status_bp)
@@ -0,0 +1,434 @@
+"""Modo de execução assíncrono (ASGI) do APP.
+
+As rotas de leitura do Forum API e a rota do Searcher API são atendidas de forma
+não bloqueante, aguardando as requisições aos serviços integrados pelo cliente
+AsyncUpstreamClient. Assim um único processo mantém milhares de requisições em
+andamento enquanto aguarda os serviços integrados.
+
+As demais rotas (autenticação, documentação, as rotas de escrita no fórum e as
+listagens em partes) continuam sendo atendidas pelo app Flask, executado em um pool
+de ASYNC_FLASK_THREADS threads. O WsgiToAsgi do asgiref executaria todas elas em uma
+única thread por processo (thread_sensitive), uma requisição por vez. As leituras do
+fórum utilizam o mesmo forum_cache, que é invalidado por essas mutations.
+
+Para utilizar: `uvicorn asgi:application` ou a variável ASYNC_MODE=True no init_app.py.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from os import environ as env
+from urllib.parse import parse_qs
+
+import aiohttp
+from asgiref.sync import SyncToAsync
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from pydantic import ValidationError
+from requests.exceptions import InvalidJSONError
+from werkzeug.exceptions import HTTPException
+
+from app import app
+from blueprint.forum_bp import (
+    decode_forum_response,
+    projected_query,
+    schedule_forum_refresh,
+)
+from blueprint.searcher_bp import decode_search_response, schedule_search_refresh
+from blueprint.pagination import paginate, decode_cursor, sort_listing
+from cache import forum_cache, search_cache, normalize_term
+from blueprint.log import logger, current_endpoint
+from json_provider import data_bytes
+from compression import compression
+from timing import timings
+from tracing import tracer
+from metrics import metrics
+from warmup import warmup
+from schemas import (
+    ArticlePathSchema,
+    ByUserPathSchema,
+    ByPeriodQueryParamSchema,
+    ListingQueryParamSchema,
+    CommentPathSchema,
+    QuerySchema,
+)
+from queries import (
+    articles_query,
+    article_by_id_query,
+    articles_by_user_id_query,
+    articles_by_period_query,
+    comments_query,
+    comment_by_id_query,
+    comments_by_user_id_query,
+    comments_by_period_query,
+)
+from upstream import (
+    forum_client,
+    searcher_client,
+    forum_flight,
+    searcher_flight,
+    UpstreamUnavailable,
+)
+from upstream.async_client import AsyncUpstreamClient
+
+# O circuit breaker e o bulkhead são compartilhados com os clientes síncronos, que
+# atendem as rotas repassadas ao app Flask.
+forum_async_client = AsyncUpstreamClient.from_env(
+    "forum",
+    "FORUM",
+    env.get("FORUM_API_URL"),
+    breaker=forum_client.breaker,
+    bulkhead=forum_client.bulkhead,
+)
+searcher_async_client = AsyncUpstreamClient.from_env(
+    "searcher",
+    "SEARCH",
+    env.get("SEARCH_API_URL"),
+    breaker=searcher_client.breaker,
+    bulkhead=searcher_client.bulkhead,
+)
+
+
+def _period_variables(query):
+    return {"initialDate": query.initialDate, "endDate": query.endDate}
+
+
+# Rotas de leitura do forum_bp atendidas no modo assíncrono. Para cada endpoint:
+# (query graphql, schema do path, schema da query, montagem das variáveis, descrição)
+FORUM_READS = {
+    "forum.get_articles": (
+        articles_query,
+        None,
+        ListingQueryParamSchema,
+        None,
+        "artigos",
+    ),
+    "forum.get_article_by_id": (
+        article_by_id_query,
+        ArticlePathSchema,
+        None,
+        lambda path, query: {"articleID": path.article_id},
+        "artigos",
+    ),
+    "forum.get_article_by_user_id": (
+        articles_by_user_id_query,
+        ByUserPathSchema,
+        ListingQueryParamSchema,
+        lambda path, query: {"userID": path.user_id},
+        "artigos",
+    ),
+    "forum.get_article_by_period": (
+        articles_by_period_query,
+        None,
+        ByPeriodQueryParamSchema,
+        lambda path, query: _period_variables(query),
+        "artigos",
+    ),
+    "forum.get_comments": (
+        comments_query,
+        None,
+        ListingQueryParamSchema,
+        None,
+        "comentários",
+    ),
+    "forum.get_comment_by_id": (
+        comment_by_id_query,
+        CommentPathSchema,
+        None,
+        lambda path, query: {"commentID": path.comment_id},
+        "comentários",
+    ),
+    "forum.get_comments_by_user_id": (
+        comments_by_user_id_query,
+        ByUserPathSchema,
+        ListingQueryParamSchema,
+        lambda path, query: {"userID": path.user_id},
+        "comentários",
+    ),
+    "forum.get_comments_by_period": (
+        comments_by_period_query,
+        None,
+        ByPeriodQueryParamSchema,
+        lambda path, query: _period_variables(query),
+        "comentários",
+    ),
+}
+
+
+async def forum_read(endpoint, view_args, query_args):
+    """Equivalente assíncrono dos handlers GET do forum_bp."""
+    graphql_query, path_schema, query_schema, build_variables, label = FORUM_READS[
+        endpoint
+    ]
+    path = path_schema(**view_args) if path_schema else None
+    query = query_schema(**query_args) if query_schema else None
+
+    listing = isinstance(query, ListingQueryParamSchema)
+    if listing:
+        try:
+            graphql_query = projected_query(graphql_query, query)
+            cursor = decode_cursor(query.after)
+        except ValueError as error:
+            logger.warning("Erro nos paramêtros da listagem: %s", error)
+            return {"error": str(error)}, 400
+
+    variables = build_variables(path, query) if build_variables else None
+    cached, stale = forum_cache.lookup_revalidate(graphql_query, variables)
+    if stale:
+        schedule_forum_refresh(graphql_query, variables)
+    if cached is None:
+        try:
+            cached = await forum_flight.do_async(
+                forum_cache.key(graphql_query, variables),
+                lambda: _post_forum_query(graphql_query, variables),
+            )
+        except UpstreamUnavailable as error:
+            cached = forum_cache.lookup_stale(graphql_query, variables)
+            if cached is None:
+                raise
+            logger.warning(
+                "Forum API indisponível (%s), usando o cache expirado.", error.reason
+            )
+    data, raw = cached
+
+    if data.get("errors"):
+        logger.warning("Erro na busca de %s: %s.", label, data.get("errors"))
+        return data, 400
+
+    if listing and (query.limit or cursor is not None):
+        return paginate(data["data"], query.limit, cursor), 200
+    if raw is not None:
+        return raw, 200
+    return data["data"], 200
+
+
+async def _post_forum_query(graphql_query, variables):
+    generation = forum_cache.generation
+    payload = {"query": graphql_query}
+    if variables:
+        payload["variables"] = variables
+
+    response = await forum_async_client.post(json=payload)
+    data = decode_forum_response(response)
+    raw = data_bytes(response.content, data)
+    if not data.get("errors"):
+        raw = sort_listing(data, raw)
+        forum_cache.set(
+            graphql_query, variables, data, len(response.content), generation, raw
+        )
+    return data, raw
+
+
+async def searcher_read(endpoint, view_args, query_args):
+    """Equivalente assíncrono do handler get_searcher do searcher_bp."""
+    query = QuerySchema(**query_args)
+    cached, stale = search_cache.lookup_revalidate(query.term)
+    if stale:
+        schedule_search_refresh(query.term)
+    if cached is not None:
+        return cached, 200
+
+    try:
+        status_code, searcher_data = await searcher_flight.do_async(
+            normalize_term(query.term), lambda: _search(query.term)
+        )
+    except UpstreamUnavailable as error:
+        stale = search_cache.get_stale(query.term)
+        if stale is None:
+            raise
+        logger.warning(
+            "Searcher API indisponível (%s), usando o cache expirado.", error.reason
+        )
+        return stale, 200
+    if status_code == 200:
+        return searcher_data, 200
+
+    logger.warning(
+        "Erro na busca pelo termo %s. Response status code: %s.",
+        query.term,
+        status_code,
+    )
+    return {"status_code": status_code, "error": "error"}, 200
+
+
+async def _search(term):
+    response = await searcher_async_client.get("/searcher", params={"query": term})
+    if response.status_code != 200:
+        return response.status_code, None
+
+    raw = decode_search_response(response)
+    search_cache.set(term, raw, len(raw))
+    return response.status_code, raw
+
+
+ASYNC_HANDLERS = dict.fromkeys(FORUM_READS, forum_read)
+ASYNC_HANDLERS["searcher.get_searcher"] = searcher_read
+
+
+class ThreadPoolWsgiInstance(WsgiToAsgiInstance):
+    """Requisição repassada ao app Flask, executada em uma thread do 'executor'."""
+
+    def __init__(self, wsgi_application, executor, duplicate_header_limit=100):
+        super().__init__(wsgi_application, duplicate_header_limit)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        run = SyncToAsync(
+            WsgiToAsgiInstance.run_wsgi_app.__wrapped__,
+            thread_sensitive=False,
+            executor=self.executor,
+        )
+        await run(self, body)
+
+
+class ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi que executa as requisições em um pool de threads, ao invés da thread
+    única do sync_to_async com thread_sensitive=True."""
+
+    def __init__(self, wsgi_application, threads=32, duplicate_header_limit=100):
+        super().__init__(wsgi_application, duplicate_header_limit)
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="flask")
+
+    async def __call__(self, scope, receive, send):
+        await ThreadPoolWsgiInstance(
+            self.wsgi_application, self.executor, self.duplicate_header_limit
+        )(scope, receive, send)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class AsyncGateway:
+    """Aplicação ASGI que utiliza a mesma tabela de rotas do app Flask.
+
+    Os endpoints registrados em ASYNC_HANDLERS são atendidos no event loop. Os demais
+    são repassados ao app Flask.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.url_adapter = flask_app.url_map.bind("localhost")
+        self.fallback = ThreadPoolWsgiToAsgi(
+            flask_app, threads=int(env.get("ASYNC_FLASK_THREADS", 32))
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+
+        handler = None
+        if scope["type"] == "http":
+            try:
+                endpoint, view_args = self.url_adapter.match(
+                    scope["path"], method=scope["method"]
+                )
+                handler = ASYNC_HANDLERS.get(endpoint)
+            except HTTPException:
+                pass
+
+        if handler is not None:
+            query_args = {
+                key: values[-1]
+                for key, values in parse_qs(scope["query_string"].decode()).items()
+            }
+            # As listagens em partes (stream) são enviadas pelo app Flask, que lê a
+            # resposta do Forum API de forma incremental.
+            if query_args.get("stream"):
+                handler = None
+
+        if handler is None:
+            return await self.fallback(scope, receive, send)
+        request_headers = dict(scope["headers"])
+        token = timings.begin()
+        start = metrics.begin()
+        trace_token = tracer.begin(
+            endpoint,
+            request_headers.get(b"traceparent", b"").decode(),
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        endpoint_token = current_endpoint.set(endpoint)
+        error = None
+        try:
+            await self.handle(
+                handler, endpoint, view_args, query_args, scope, send, start
+            )
+        except Exception as exception:
+            error = exception
+            raise
+        finally:
+            tracer.end(trace_token, error)
+            metrics.end(start)
+            timings.end(token)
+            current_endpoint.reset(endpoint_token)
+
+    async def handle(
+        self, handler, endpoint, view_args, query_args, scope, send, start
+    ):
+        try:
+            body, status = await handler(endpoint, view_args, query_args)
+            # Os handlers retornam bytes quando a resposta do serviço integrado é
+            # enviada sem alterações.
+            if not isinstance(body, bytes):
+                body = self.flask_app.json.dumps(body, separators=(",", ":")).encode()
+        except ValidationError as error:
+            body, status = error.json().encode(), 422
+        except UpstreamUnavailable as error:
+            logger.warning("Serviço integrado indisponível: %s", error)
+            body = self.flask_app.json.dumps(
+                {"error": "Upstream service unavailable"}
+            ).encode()
+            status = 503
+            retry_after = error.retry_after
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            InvalidJSONError,
+        ) as error:
+            logger.warning("Falha na comunicação com serviço integrado: %s", error)
+            body = self.flask_app.json.dumps(
+                {"error": "Upstream service unavailable"}
+            ).encode()
+            status = 502
+
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"access-control-allow-origin", b"*"),
+        ]
+        if status == 503:
+            headers.append((b"retry-after", str(retry_after).encode()))
+        if status == 200:
+            request_headers = dict(scope["headers"])
+            status, body, extra_headers = compression.process(
+                body,
+                "application/json",
+                request_headers.get(b"accept-encoding", b"").decode(),
+                request_headers.get(b"if-none-match", b"").decode(),
+            )
+            headers += [
+                (k.lower().encode(), v.encode()) for k, v in extra_headers.items()
+            ]
+        headers.append((b"content-length", str(len(body)).encode()))
+        metrics.finish(start, endpoint, scope["method"], status, len(body))
+        tracer.current().set_attribute("http.status_code", status)
+        server_timing = timings.finish(endpoint, len(body))
+        if server_timing:
+            headers.append((b"server-timing", server_timing.encode()))
+
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                warmup.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await forum_async_client.aclose()
+                await searcher_async_client.aclose()
+                self.fallback.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+application = AsyncGateway(app)
@@ -0,0 +1,229 @@
+"""Identificação do usuário das rotas de escrita.
+
+O usuário é lido uma vez por requisição, da sessão criada pelo login no Auth0 ou de
+um token JWT enviado no cabeçalho 'Authorization: Bearer <token>', e apresentado às
+rotas como um UserIdentity imutável. O token é verificado localmente com as chaves
+públicas do Auth0 (JWKS), mantidas em cache, então clientes da API e testes de carga
+podem utilizar as rotas de escrita sem o login pelo navegador.
+"""
+
+import hashlib
+import threading
+import time
+from functools import wraps
+from os import environ as env
+from typing import NamedTuple
+from dotenv import find_dotenv, load_dotenv
+import requests
+from authlib.jose import JsonWebKey, JsonWebToken
+from authlib.jose.errors import JoseError
+from flask import g, request, session
+
+from cache.ttl_cache import TTLCache
+from logger import logger
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+class UserIdentity(NamedTuple):
+    """Usuário autenticado na requisição. 'source' é 'session' ou 'bearer'."""
+
+    user_id: str
+    email: str
+    nickname: str
+    source: str
+
+    def variables(self):
+        """Variáveis do usuário nas mutations do Forum API."""
+        return {
+            "userEmail": self.email,
+            "userID": self.user_id,
+            "userNickname": self.nickname,
+        }
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class JWKSCache:
+    """Chaves públicas (JWKS) do provedor, lidas novamente a cada 'ttl' segundos ou
+    quando um token é assinado por uma chave desconhecida (rotação das chaves), no
+    máximo uma vez a cada 'min_refresh' segundos."""
+
+    def __init__(self, url, ttl=3600.0, min_refresh=60.0, timeout=5.0):
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self.timeout = timeout
+        self._keys = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def _fetch(self):
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        self._keys = JsonWebKey.import_key_set(response.json())
+        self._fetched_at = time.monotonic()
+
+    def find(self, kid):
+        """Chave pública do 'kid' do token. Uma chave desconhecida gera ValueError."""
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+            unknown = self._keys is not None and not any(
+                key.kid == kid for key in self._keys.keys
+            )
+            if (
+                self._keys is None
+                or age >= self.ttl
+                or (unknown and age >= self.min_refresh)
+            ):
+                try:
+                    self._fetch()
+                except (requests.RequestException, ValueError) as error:
+                    if self._keys is None:
+                        raise InvalidToken(f"JWKS indisponível: {error}")
+                    logger.warning("Falha ao atualizar o JWKS: %s", error)
+            keys = self._keys
+        return keys.find_by_kid(kid)
+
+
+class Authenticator:
+    """Resolve o UserIdentity da requisição atual.
+
+    Com o cabeçalho Authorization o token é verificado (assinatura, 'iss', 'aud' e
+    expiração) e as suas claims são mantidas em cache até a expiração do token, então
+    as requisições seguintes com o mesmo token não verificam a assinatura novamente.
+    Sem um 'audience' configurado os tokens são recusados. Sem o cabeçalho é
+    utilizada a sessão do login no Auth0.
+    """
+
+    def __init__(
+        self,
+        jwks=None,
+        issuer=None,
+        audience=None,
+        algorithms=("RS256",),
+        claims_namespace="",
+        cache_size=10000,
+    ):
+        self.jwks = jwks
+        self.issuer = issuer
+        self.audience = audience
+        self.claims_namespace = claims_namespace
+        self.jwt = JsonWebToken(list(algorithms))
+        self.tokens = TTLCache(ttl=300, max_entries=cache_size)
+
+    @classmethod
+    def from_env(cls):
+        # Por padrão as chaves e o emissor ('iss') dos tokens do Auth0.
+        domain = env.get("AUTH0_DOMAIN")
+        issuer = f"https://{domain}/" if domain else None
+        jwks_url = env.get("AUTH_JWKS_URL") or (
+            f"{issuer}.well-known/jwks.json" if domain else None
+        )
+        return cls(
+            jwks=(
+                JWKSCache(jwks_url, ttl=float(env.get("AUTH_JWKS_TTL", 3600)))
+                if jwks_url
+                else None
+            ),
+            issuer=env.get("AUTH_JWT_ISSUER") or issuer,
+            # Sem a API no Auth0 o token deve ser do próprio Application (id_token).
+            audience=env.get("AUTH0_AUDIENCE") or env.get("AUTH0_CLIENT_ID") or None,
+            algorithms=env.get("AUTH_JWT_ALGORITHMS", "RS256").split(","),
+            claims_namespace=env.get("AUTH_CLAIMS_NAMESPACE", ""),
+            cache_size=int(env.get("AUTH_TOKEN_CACHE_SIZE", 10000)),
+        )
+
+    def identity(self):
+        """UserIdentity da requisição atual, ou None sem usuário autenticado. Um token
+        inválido gera InvalidToken."""
+        if "identity" not in g:
+            g.identity = self._resolve()
+        return g.identity
+
+    def _resolve(self):
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            return self._from_token(token.strip())
+        user = session.get("user")
+        if not user:
+            return None
+        user_info = user.get("userinfo") or {}
+        return UserIdentity(
+            user_info.get("sub"),
+            user_info.get("email"),
+            user_info.get("nickname"),
+            "session",
+        )
+
+    def _claim(self, claims, name):
+        return claims.get(f"{self.claims_namespace}{name}") or claims.get(name)
+
+    def _from_token(self, token):
+        key = hashlib.sha256(token.encode()).hexdigest()
+        identity = self.tokens.get(key)
+        if identity is not None:
+            return identity
+
+        # Sem a verificação do 'aud' seria aceito qualquer token do tenant, inclusive
+        # os emitidos para outros Applications.
+        if self.jwks is None or not self.audience:
+            raise InvalidToken("Autenticação por token não configurada")
+        options = {
+            "exp": {"essential": True},
+            "aud": {"essential": True, "value": self.audience},
+        }
+        if self.issuer:
+            options["iss"] = {"essential": True, "value": self.issuer}
+        try:
+            claims = self.jwt.decode(
+                token,
+                lambda header, payload: self.jwks.find(header.get("kid")),
+                claims_options=options,
+            )
+            claims.validate()
+        except (JoseError, ValueError) as error:
+            raise InvalidToken(str(error))
+        if not claims.get("sub"):
+            raise InvalidToken("Token sem a claim 'sub'")
+
+        identity = UserIdentity(
+            claims["sub"],
+            self._claim(claims, "email"),
+            self._claim(claims, "nickname") or self._claim(claims, "name"),
+            "bearer",
+        )
+        ttl = min(claims["exp"] - time.time(), self.tokens.ttl)
+        self.tokens.set(key, identity, len(key), ttl=ttl)
+        return identity
+
+
+authenticator = Authenticator.from_env()
+
+
+def current_user():
+    """UserIdentity da requisição, para as rotas decoradas com login_required."""
+    return g.identity
+
+
+def login_required(view):
+    """Retorna 403 para as requisições sem usuário autenticado, e 401 com um token
+    inválido. A rota lê o usuário com current_user()."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            identity = authenticator.identity()
+        except InvalidToken as error:
+            logger.warning("Token de acesso inválido: %s", error)
+            return {"error": "Invalid token"}, 401, {"WWW-Authenticate": "Bearer"}
+        if identity is None:
+            logger.warning("Usuário não logado!")
+            return {"error": "User not logged in!"}, 403
+        return view(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,48 @@
+"""Compara as req/s do modo síncrono (WSGI) com o modo assíncrono (ASGI) do APP.
+
+python -m benchmarks.async_vs_sync --concurrency 200 --duration 10
+"""
+
+import argparse
+import json
+
+from benchmarks.load import run_load
+from benchmarks.servers import gateway, stubs
+
+ROUTES = [
+    "/api/articles/id/00000000-0000-0001-0000-000000000000",
+    "/api/searcher?term=direito%20moradia",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--latency-ms", default="50")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = []
+    with stubs(stub_env={"STUB_LATENCY_MS": args.latency_ms}) as upstreams:
+        for mode in ("sync", "async"):
+            with gateway(upstreams, port=args.port, mode=mode):
+                for route in ROUTES:
+                    result = run_load(
+                        f"http://127.0.0.1:{args.port}{route}",
+                        concurrency=args.concurrency,
+                        duration=args.duration,
+                    )
+                    result["mode"] = mode
+                    results.append(result)
+                    print(
+                        f"{mode:5} {route[:40]:40} {result['req_per_sec']:>8} req/s "
+                        f"p50={result['p50_ms']}ms p99={result['p99_ms']}ms "
+                        f"errors={result['errors']}"
+                    )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
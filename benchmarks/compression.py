@@ -0,0 +1,69 @@
+"""Mede os bytes e a latência das respostas sem compressão, com gzip, com brotli e com
+If-None-Match (304) nas rotas de leitura.
+
+python -m benchmarks.compression --concurrency 10 --duration 5
+"""
+
+import argparse
+import json
+
+import requests
+
+from benchmarks.load import run_load
+from benchmarks.servers import gateway, stubs
+
+ROUTES = [
+    "/api/articles/id/00000000-0000-0001-0000-000000000000",
+    "/api/articles?limit=100",
+    "/api/searcher?term=direito%20moradia",
+]
+
+CASES = {
+    "identity": {},
+    "gzip": {"Accept-Encoding": "gzip"},
+    "br": {"Accept-Encoding": "br"},
+    "304": {"Accept-Encoding": "br"},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--mode", default="sync", choices=("sync", "async"))
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = []
+    stub_env = {"STUB_LATENCY_MS": "5", "STUB_ARTICLES": "100"}
+    with stubs(stub_env=stub_env) as upstreams:
+        with gateway(upstreams, port=args.port, mode=args.mode):
+            for route in ROUTES:
+                url = f"http://127.0.0.1:{args.port}{route}"
+                for case, headers in CASES.items():
+                    headers = dict(headers)
+                    if case == "304":
+                        etag = requests.get(url, headers=headers).headers["ETag"]
+                        headers["If-None-Match"] = etag
+                    result = run_load(
+                        url,
+                        concurrency=args.concurrency,
+                        duration=args.duration,
+                        headers=headers,
+                    )
+                    result["case"] = case
+                    result["bytes_per_response"] = result["bytes_received"] // max(
+                        result["requests"], 1
+                    )
+                    results.append(result)
+                    print(
+                        f"{case:8} {route[:40]:40} {result['bytes_per_response']:>8} B "
+                        f"{result['req_per_sec']:>8} req/s p50={result['p50_ms']}ms "
+                        f"p99={result['p99_ms']}ms statuses={result['statuses']}"
+                    )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compara o custo de decodificar a resposta do Forum API e codificar a resposta do APP
+com o provider padrão do Flask, com o FastJSONProvider e com o envio direto dos bytes.
+
+python -m benchmarks.json_encoding --articles 20 --comments 5 --repeat 500
+"""
+
+import argparse
+import json
+import os
+import time
+
+
+def measure(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", default="20")
+    parser.add_argument("--comments", default="5")
+    parser.add_argument("--content-size", default="500")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ.update(
+        STUB_ARTICLES=args.articles,
+        STUB_COMMENTS=args.comments,
+        STUB_CONTENT_SIZE=args.content_size,
+    )
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+
+    from benchmarks.stubs import ARTICLE_LIST
+    from json_provider import FastJSONProvider, data_bytes, loads
+
+    body = json.dumps({"data": {"articles": ARTICLE_LIST}}).encode()
+    cached, cached_raw = loads(body), data_bytes(body, loads(body))
+    app = Flask(__name__)
+    default, fast = DefaultJSONProvider(app), FastJSONProvider(app)
+
+    with app.app_context():
+        # Leitura no Forum API (decodificação e codificação) e leitura no cache.
+        cases = {
+            "flask": lambda: default.response(json.loads(body)["data"]),
+            "fast": lambda: fast.response(loads(body)["data"]),
+            "raw": lambda: app.response_class(data_bytes(body, loads(body))),
+            "flask (cache)": lambda: default.response(cached["data"]),
+            "fast (cache)": lambda: fast.response(cached["data"]),
+            "raw (cache)": lambda: app.response_class(cached_raw),
+        }
+        results = {
+            name: round(measure(fn, args.repeat), 3) for name, fn in cases.items()
+        }
+
+    print(f"resposta de {len(body)} bytes, ms por requisição:")
+    for name, elapsed in results.items():
+        print(f"{name:14} {elapsed:>8} ms")
+    print(json.dumps({"bytes": len(body), "ms_per_request": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Gerador de carga assíncrono utilizado pelos benchmarks.
+
+Utiliza conexões HTTP/1.1 keep-alive diretamente sobre asyncio, para que o próprio
+gerador de carga não seja o gargalo da medição.
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+
+    if "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        body = b""
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+            chunk = await reader.readexactly(size + 2)
+            if size == 0:
+                break
+            body += chunk[:-2]
+    else:
+        body = await reader.read()
+    return status, headers, body
+
+
+def build_request(url, method="GET", json_body=None, headers=None):
+    parts = urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    body = json.dumps(json_body).encode() if json_body is not None else b""
+    lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}"]
+    for key, value in (headers or {}).items():
+        lines.append(f"{key}: {value}")
+    if body:
+        lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+    return (parts.hostname, parts.port or 80), (
+        "\r\n".join(lines) + "\r\n\r\n"
+    ).encode() + body
+
+
+async def _run(url, concurrency, duration, method, json_body, headers):
+    address, request = build_request(url, method, json_body, headers)
+    latencies, statuses = [], {}
+    errors, received = 0, 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors, received
+        connection = None
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = await asyncio.open_connection(*address)
+                reader, writer = connection
+                writer.write(request)
+                await writer.drain()
+                status, response_headers, body = await _read_response(reader)
+                received += len(body)
+                statuses[status] = statuses.get(status, 0) + 1
+                if status >= 400:
+                    errors += 1
+                if response_headers.get("connection") == "close":
+                    writer.close()
+                    connection = None
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                errors += 1
+                connection = None
+            latencies.append(time.perf_counter() - start)
+        if connection is not None:
+            connection[1].close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "bytes_received": received,
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def run_load(
+    url, concurrency=50, duration=10.0, method="GET", json_body=None, headers=None
+):
+    """Executa `concurrency` clientes simultâneos contra a url por `duration` segundos."""
+    return asyncio.run(_run(url, concurrency, duration, method, json_body, headers))
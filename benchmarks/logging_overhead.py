@@ -0,0 +1,91 @@
+"""Compara o custo dos logs na thread da requisição escrevendo diretamente no arquivo
+(com rotação) e pela fila do BoundedQueueHandler, e o custo de uma chamada de debug
+desativada com f-string e com os argumentos separados da mensagem.
+
+python -m benchmarks.logging_overhead --lines 3 --repeat 20000
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+
+def measure(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def file_handler(directory, name):
+    from logger import LOG_BACKUP_COUNT, LOG_MAX_BYTES, TEXT_FORMATTERS
+
+    handler = RotatingFileHandler(
+        os.path.join(directory, f"{name}.log"),
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+    )
+    handler.setFormatter(logging.Formatter(TEXT_FORMATTERS["detailed"]["format"]))
+    return handler
+
+
+def bench_logger(name, handler):
+    log = logging.getLogger(f"benchmarks.logging.{name}")
+    log.handlers = [handler]
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    return log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=3, help="logs por requisição")
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    from logger import BoundedQueueHandler
+
+    payload = {"articleId": 1, "title": "x" * 200, "comments": list(range(20))}
+    with tempfile.TemporaryDirectory() as directory:
+        sync = bench_logger("sync", file_handler(directory, "sync"))
+        queued_handler = BoundedQueueHandler(
+            [file_handler(directory, "queue")], maxsize=args.repeat * args.lines + 1
+        )
+        queued_handler.start()
+        queued = bench_logger("queue", queued_handler)
+
+        def request(log):
+            def fn():
+                for _ in range(args.lines):
+                    log.info("Forum API: %s retornou %s", "articles", 200)
+
+            return fn
+
+        # Logs de debug com o nível desativado: a f-string é formatada mesmo assim.
+        def debug_fstring():
+            sync.debug(f"Resposta do Forum API: {payload}")
+
+        def debug_lazy():
+            sync.debug("Resposta do Forum API: %s", payload)
+
+        results = {
+            "sync": round(measure(request(sync), args.repeat) * 1000, 2),
+            "queue": round(measure(request(queued), args.repeat) * 1000, 2),
+            "debug f-string": round(measure(debug_fstring, args.repeat) * 1000, 2),
+            "debug lazy": round(measure(debug_lazy, args.repeat) * 1000, 2),
+        }
+        queued_handler.close()
+        sync.handlers[0].close()
+
+    print(f"{args.lines} logs por requisição, µs por requisição:")
+    for name, elapsed in results.items():
+        print(f"{name:15} {elapsed:>8} µs")
+    print(json.dumps({"lines": args.lines, "us_per_request": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
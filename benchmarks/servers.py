@@ -0,0 +1,79 @@
+"""Inicialização dos processos (stubs e APP) utilizados pelos benchmarks."""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_port(port, timeout=20.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"Porta {port} não respondeu em {timeout}s")
+
+
+@contextmanager
+def process(args, port, extra_env=None):
+    """Executa um processo do benchmark e aguarda a porta estar aberta."""
+    environment = dict(os.environ, PYTHONPATH=ROOT, **(extra_env or {}))
+    proc = subprocess.Popen(
+        args,
+        cwd=ROOT,
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_port(port)
+        yield proc
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+@contextmanager
+def stubs(forum_port=4444, searcher_port=4000, stub_env=None):
+    """Sobe os stubs do Forum API e do Searcher API."""
+    uvicorn = [sys.executable, "-m", "uvicorn", "--log-level", "warning"]
+    with process(
+        uvicorn + ["benchmarks.stubs:forum_stub", "--port", str(forum_port)],
+        forum_port,
+        stub_env,
+    ), process(
+        uvicorn + ["benchmarks.stubs:searcher_stub", "--port", str(searcher_port)],
+        searcher_port,
+        stub_env,
+    ):
+        yield {
+            "FORUM_API_URL": f"http://127.0.0.1:{forum_port}/graphql",
+            "SEARCH_API_URL": f"http://127.0.0.1:{searcher_port}",
+        }
+
+
+def gateway_env(upstreams, port, extra_env=None):
+    environment = {"API_PORT": str(port), "APP_SECRET_KEY": "benchmark", "DEBUG": ""}
+    environment.update(upstreams)
+    environment.update(extra_env or {})
+    return environment
+
+
+@contextmanager
+def gateway(upstreams, port=5000, mode="sync", extra_env=None, server="dev"):
+    """Sobe o APP no modo indicado: 'sync' (WSGI) ou 'async' (ASGI), pelo servidor de
+    desenvolvimento (init_app.py) ou pelo gunicorn (gunicorn.conf.py)."""
+    environment = gateway_env(upstreams, port, extra_env)
+    if mode == "async":
+        environment["ASYNC_MODE"] = "True"
+    args = [sys.executable, "init_app.py"]
+    if server == "gunicorn":
+        args = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+    with process(args, port, environment) as proc:
+        yield proc
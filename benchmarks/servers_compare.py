@@ -0,0 +1,70 @@
+"""Compara as req/s do servidor de desenvolvimento do Flask (python init_app.py) com o
+gunicorn (gunicorn.conf.py) nas rotas de leitura.
+
+python -m benchmarks.servers_compare --concurrency 50 --duration 10 --workers 4
+"""
+
+import argparse
+import json
+
+from benchmarks.load import run_load
+from benchmarks.servers import gateway, stubs
+
+ROUTES = [
+    "/api/articles/id/00000000-0000-0001-0000-000000000000",
+    "/api/articles?limit=20",
+    "/api/searcher?term=direito%20moradia",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--latency-ms", default="20")
+    parser.add_argument("--workers", default="4")
+    parser.add_argument("--threads", default="8")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    # O cache é desativado para que todas as requisições cheguem aos stubs.
+    extra_env = {
+        "FORUM_CACHE_TTL": "0",
+        "SEARCH_CACHE_TTL": "0",
+        "WARMUP_ENABLED": "false",
+        "GUNICORN_WORKERS": args.workers,
+        "GUNICORN_THREADS": args.threads,
+        "GUNICORN_ACCESS_LOG": "",
+        "GUNICORN_MAX_REQUESTS": "0",
+    }
+    results = []
+    stub_env = {"STUB_LATENCY_MS": args.latency_ms}
+    with stubs(stub_env=stub_env) as upstreams:
+        for server in ("dev", "gunicorn"):
+            with gateway(upstreams, port=args.port, extra_env=extra_env, server=server):
+                # O gunicorn abre a porta antes de os workers importarem o APP.
+                for route in ROUTES:
+                    run_load(
+                        f"http://127.0.0.1:{args.port}{route}",
+                        concurrency=args.concurrency,
+                        duration=1.0,
+                    )
+                for route in ROUTES:
+                    result = run_load(
+                        f"http://127.0.0.1:{args.port}{route}",
+                        concurrency=args.concurrency,
+                        duration=args.duration,
+                    )
+                    result["server"] = server
+                    results.append(result)
+                    print(
+                        f"{server:8} {route[:40]:40} {result['req_per_sec']:>8} req/s "
+                        f"p50={result['p50_ms']}ms p99={result['p99_ms']}ms "
+                        f"errors={result['errors']}"
+                    )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
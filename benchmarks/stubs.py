@@ -0,0 +1,164 @@
+"""Servidores stub do Forum API (GraphQL) e do Searcher API para os benchmarks.
+
+São aplicações ASGI executadas pelo uvicorn. A latência e o tamanho das respostas
+são configurados pelas variáveis STUB_LATENCY_MS, STUB_ARTICLES e STUB_COMMENTS. O
+stub do Forum API também apresenta as chaves públicas de STUB_JWKS em
+/.well-known/jwks.json, para os tokens de acesso do benchmark.
+
+    uvicorn benchmarks.stubs:forum_stub --port 4444
+    uvicorn benchmarks.stubs:searcher_stub --port 4000
+"""
+
+import asyncio
+import json
+import re
+import uuid
+from os import environ as env
+from urllib.parse import parse_qs
+
+from queries.selection import parse_selection
+
+LATENCY = float(env.get("STUB_LATENCY_MS", 20)) / 1000
+ARTICLES = int(env.get("STUB_ARTICLES", 20))
+COMMENTS = int(env.get("STUB_COMMENTS", 5))
+CONTENT_SIZE = int(env.get("STUB_CONTENT_SIZE", 500))
+
+ROOT_FIELD = re.compile(r"(?:(\w+)\s*:\s*)?\b(\w+)\s*(?:\([^)]*\))?\s*\{")
+
+
+def _comment(article_id, index, with_replies=True):
+    comment = {
+        "commentId": str(uuid.UUID(int=article_id.int + index + 1)),
+        "articleId": str(article_id),
+        "isReply": False,
+        "commentReply": None,
+        "content": "c" * (CONTENT_SIZE // 5),
+        "userNickname": f"user{index}",
+        "updatedAt": f"2024-06-{index % 28 + 1:02d}T10:00:00",
+    }
+    if with_replies:
+        comment["replies"] = []
+    return comment
+
+
+def _article(index):
+    article_id = uuid.UUID(int=(index + 1) << 64)
+    return {
+        "articleId": str(article_id),
+        "title": f"Artigo {index}",
+        "content": "a" * CONTENT_SIZE,
+        "userNickname": f"user{index % 7}",
+        "updatedAt": f"2024-06-{index % 28 + 1:02d}T{index % 24:02d}:00:00",
+        "comments": [_comment(article_id, i) for i in range(COMMENTS)],
+    }
+
+
+ARTICLE_LIST = [_article(i) for i in range(ARTICLES)]
+COMMENT_LIST = [c for a in ARTICLE_LIST for c in a["comments"]]
+
+
+def _resolve(field, variables):
+    if field in ("articles", "articlesByUserId", "articlesByPeriod"):
+        return ARTICLE_LIST
+    if field == "articleById":
+        return ARTICLE_LIST[0]
+    if field in ("comments", "commentByUserId", "commentsByPeriod"):
+        return COMMENT_LIST
+    if field == "commentById":
+        return COMMENT_LIST[0]
+    if field.startswith("remove"):
+        return {"message": "ok"}
+    if field.endswith("Article"):
+        return {key: ARTICLE_LIST[0][key] for key in ("articleId", "title", "content")}
+    return {key: COMMENT_LIST[0][key] for key in ("commentId", "articleId", "content")}
+
+
+def _select(value, fields):
+    """Mantém somente os campos do conjunto de seleção, como o Forum API."""
+    if isinstance(value, list):
+        return [_select(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        name: _select(value[name], children) if children else value[name]
+        for name, children in fields
+        if name in value
+    }
+
+
+def _root_fields(document):
+    """Retorna os campos (alias, nome, seleção) do primeiro nível da operação graphql."""
+    body = document[document.index("{") + 1 :]
+    fields, depth, start, match = [], 0, 0, None
+    for position, char in enumerate(body):
+        if char == "{":
+            if depth == 0:
+                match = ROOT_FIELD.search(body[start : position + 1])
+                opened = position
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                if match:
+                    selection = parse_selection(
+                        "{ root " + body[opened : position + 1] + " }"
+                    )
+                    alias = match.group(1) or match.group(2)
+                    fields.append((alias, match.group(2), selection))
+                start = position + 1
+    return fields
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def _send_json(send, payload, status=200):
+    body = json.dumps(payload).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def forum_stub(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    if scope["path"] == "/.well-known/jwks.json":
+        return await _send_json(send, json.loads(env.get("STUB_JWKS", '{"keys": []}')))
+    payload = json.loads(await _read_body(receive) or b"{}")
+    await asyncio.sleep(LATENCY)
+    variables = payload.get("variables") or {}
+    data = {
+        alias: _select(_resolve(field, variables), selection)
+        for alias, field, selection in _root_fields(payload.get("query", "{}"))
+    }
+    await _send_json(send, {"data": data})
+
+
+async def searcher_stub(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    await _read_body(receive)
+    await asyncio.sleep(LATENCY)
+    term = parse_qs(scope["query_string"].decode()).get("query", [""])[0]
+    results = {
+        str(page): {
+            "page_info": {"Título": "TÍTULO II", "Capítulo": "CAPÍTULO I"},
+            "content": f"{term} " + "x" * CONTENT_SIZE,
+        }
+        for page in range(10)
+    }
+    await _send_json(send, {"data": {"results": results}})
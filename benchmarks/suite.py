@@ -0,0 +1,324 @@
+"""Benchmark de todas as rotas do forum_bp e do searcher_bp.
+
+Sobe os stubs do Forum API e do Searcher API com a latência e o tamanho das respostas
+indicados, sobe o APP e executa a carga em cada rota, medindo req/s, latências p50,
+p95 e p99 e a memória do APP. Os caches são desativados por padrão, para medir o
+custo de encaminhar cada requisição aos serviços integrados.
+
+O resultado é gravado em benchmarks/results/<data>-<commit>.json, e pode ser
+comparado com o resultado de outro commit:
+
+python -m benchmarks.suite --concurrency 20 --duration 5
+python -m benchmarks.suite --compare benchmarks/results/a.json benchmarks/results/b.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.load import run_load
+from benchmarks.servers import ROOT, gateway, stubs
+
+ARTICLE_ID = "00000000-0000-0001-0000-000000000000"
+COMMENT_ID = "00000000-0000-0001-0000-000000000001"
+USER_ID = "auth0|benchmark"
+BENCHMARK_ISSUER = "https://benchmark.local/"
+BENCHMARK_AUDIENCE = "https://benchmark.local/api"
+
+ROUTES = [
+    ("GET", "/api/articles", None),
+    ("GET", "/api/articles?limit=20", None),
+    ("GET", "/api/articles?view=summary", None),
+    ("GET", f"/api/articles/id/{ARTICLE_ID}", None),
+    ("GET", f"/api/articles/user/{USER_ID}", None),
+    ("GET", "/api/articles/period?initialDate=01-06-2024&endDate=30-06-2024", None),
+    ("GET", "/api/comments", None),
+    ("GET", f"/api/comments/id/{COMMENT_ID}", None),
+    ("GET", f"/api/comments/user/{USER_ID}", None),
+    ("GET", "/api/comments/period?initialDate=01-06-2024&endDate=30-06-2024", None),
+    ("GET", "/api/searcher?term=direito%20moradia", None),
+    (
+        "POST",
+        "/api/batch",
+        {
+            "reads": [
+                {"operation": "articleById", "article_id": ARTICLE_ID},
+                {"operation": "commentById", "comment_id": COMMENT_ID},
+            ]
+        },
+    ),
+    ("POST", "/api/article", {"title": "Benchmark", "content": "conteúdo"}),
+    ("PUT", f"/api/article/{ARTICLE_ID}", {"title": "Benchmark"}),
+    ("DELETE", f"/api/article/{ARTICLE_ID}", None),
+    (
+        "POST",
+        "/api/comment",
+        {"article_id": ARTICLE_ID, "content": "conteúdo"},
+    ),
+    ("PUT", f"/api/comment/{COMMENT_ID}", {"content": "conteúdo"}),
+    ("DELETE", f"/api/comment/{COMMENT_ID}", None),
+]
+
+
+def bearer_token():
+    """Token de acesso do usuário do benchmark e as chaves públicas (JWKS) para
+    verificá-lo, apresentadas pelo stub do Forum API."""
+    from authlib.jose import JsonWebKey, jwt
+
+    key = JsonWebKey.generate_key("RSA", 2048, is_private=True, options={"kid": "1"})
+    claims = {
+        "iss": BENCHMARK_ISSUER,
+        "aud": BENCHMARK_AUDIENCE,
+        "sub": USER_ID,
+        "email": "benchmark@example.com",
+        "nickname": "benchmark",
+        "exp": int(time.time()) + 24 * 60 * 60,
+    }
+    token = jwt.encode({"alg": "RS256", "kid": "1"}, claims, key).decode()
+    return token, json.dumps({"keys": [key.as_dict(is_private=False)]})
+
+
+def session_cookie(backend, secret_key, directory):
+    """Cookie de sessão de um usuário autenticado para o APP do benchmark. Com o
+    backend 'cookie' é a sessão inteira assinada com a APP_SECRET_KEY; com o 'sqlite'
+    a sessão é gravada no arquivo de sessões em 'directory', e o cookie contém o id."""
+    user = {
+        "userinfo": {
+            "email": "benchmark@example.com",
+            "sub": USER_ID,
+            "nickname": "benchmark",
+        }
+    }
+    if backend == "sqlite":
+        os.environ.update(SESSION_BACKEND="sqlite", CACHE_SQLITE_DIR=directory)
+        from sessions import sessions
+
+        return f"session={sessions.create({'user': user})}"
+
+    from flask import Flask
+
+    app = Flask(__name__)
+    app.secret_key = secret_key
+    serializer = app.session_interface.get_signing_serializer(app)
+    return f"session={serializer.dumps({'user': user})}"
+
+
+def process_rss(pid):
+    """Memória residente (bytes) do processo e dos seus processos filhos, lida do
+    /proc. Retorna None fora do Linux."""
+    total = 0
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as file:
+                for child in file.read().split():
+                    total += process_rss(child) or 0
+    except (OSError, ValueError):
+        return None
+    return total
+
+
+class MemorySampler:
+    """Amostra a memória do APP durante a carga, guardando o pico."""
+
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, process_rss(self.pid) or 0)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_route(pid, url, method, body, headers, concurrency, duration):
+    baseline = process_rss(pid)
+    with MemorySampler(pid) as sampler:
+        result = run_load(
+            url,
+            concurrency=concurrency,
+            duration=duration,
+            method=method,
+            json_body=body,
+            headers=headers,
+        )
+    result["method"] = method
+    result["rss_mb"] = round((process_rss(pid) or 0) / 2**20, 1)
+    # Memória ocupada pelas requisições simultâneas: o pico durante a carga acima da
+    # memória anterior, dividido pela quantidade de requisições em andamento.
+    result["memory_per_request_kb"] = (
+        round(max(sampler.peak - baseline, 0) / concurrency / 1024, 1)
+        if baseline
+        else None
+    )
+    return result
+
+
+def run_suite(args):
+    stub_env = {
+        "STUB_LATENCY_MS": args.latency_ms,
+        "STUB_ARTICLES": args.articles,
+        "STUB_COMMENTS": args.comments,
+        "STUB_CONTENT_SIZE": args.content_size,
+    }
+    session_dir = tempfile.mkdtemp(prefix="mvp2_sessions_")
+    extra_env = {
+        "WARMUP_ENABLED": "false",
+        "GUNICORN_MAX_REQUESTS": "0",
+        "SESSION_BACKEND": args.session,
+        "CACHE_SQLITE_DIR": session_dir,
+    }
+    if not args.cache:
+        extra_env.update(FORUM_CACHE_TTL="0", SEARCH_CACHE_TTL="0")
+    upstream_env = stub_env
+    if args.session == "bearer":
+        token, jwks = bearer_token()
+        upstream_env = dict(stub_env, STUB_JWKS=jwks)
+        extra_env.update(
+            SESSION_BACKEND="sqlite",
+            AUTH_JWKS_URL="http://127.0.0.1:4444/.well-known/jwks.json",
+            AUTH_JWT_ISSUER=BENCHMARK_ISSUER,
+            AUTH0_AUDIENCE=BENCHMARK_AUDIENCE,
+        )
+        headers = {"Authorization": f"Bearer {token}"}
+    else:
+        headers = {"Cookie": session_cookie(args.session, "benchmark", session_dir)}
+
+    results = []
+    with stubs(stub_env=upstream_env) as upstreams:
+        with gateway(
+            upstreams,
+            port=args.port,
+            mode=args.mode,
+            extra_env=extra_env,
+            server=args.server,
+        ) as proc:
+            for method, path, body in ROUTES:
+                if args.routes and not any(name in path for name in args.routes):
+                    continue
+                url = f"http://127.0.0.1:{args.port}{path}"
+                # Aquecimento: conexões com os stubs e importações tardias.
+                run_load(url, 5, 0.5, method, body, headers)
+                result = run_route(
+                    proc.pid,
+                    url,
+                    method,
+                    body,
+                    headers,
+                    args.concurrency,
+                    args.duration,
+                )
+                result["route"] = path
+                results.append(result)
+                print(
+                    f"{method:6} {path[:48]:48} {result['req_per_sec']:>8} req/s "
+                    f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+                    f"p99={result['p99_ms']}ms mem/req={result['memory_per_request_kb']}KB "
+                    f"errors={result['errors']}"
+                )
+
+    return {
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "settings": {
+            "mode": args.mode,
+            "server": args.server,
+            "cache": args.cache,
+            "session": args.session,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            **stub_env,
+        },
+        "results": results,
+    }
+
+
+def compare(base_path, new_path):
+    """Apresenta a variação de req/s e p99 de cada rota entre dois resultados."""
+    with open(base_path) as file:
+        base = json.load(file)
+    with open(new_path) as file:
+        new = json.load(file)
+    print(f"{base['commit']} -> {new['commit']}")
+    previous = {(r["method"], r["route"]): r for r in base["results"]}
+    for result in new["results"]:
+        old = previous.get((result["method"], result["route"]))
+        if old is None:
+            continue
+        rps = (result["req_per_sec"] / old["req_per_sec"] - 1) * 100
+        p99 = (result["p99_ms"] / old["p99_ms"] - 1) * 100 if old["p99_ms"] else 0
+        print(
+            f"{result['method']:6} {result['route'][:48]:48} "
+            f"req/s {old['req_per_sec']:>8} -> {result['req_per_sec']:>8} ({rps:+.1f}%) "
+            f"p99 {old['p99_ms']:>8} -> {result['p99_ms']:>8} ({p99:+.1f}%)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency-ms", default="20")
+    parser.add_argument("--articles", default="20")
+    parser.add_argument("--comments", default="5")
+    parser.add_argument("--content-size", default="500")
+    parser.add_argument("--mode", default="sync", choices=("sync", "async"))
+    parser.add_argument("--server", default="dev", choices=("dev", "gunicorn"))
+    parser.add_argument("--cache", action="store_true", help="mantém os caches ativos")
+    parser.add_argument(
+        "--session", default="sqlite", choices=("sqlite", "cookie", "bearer")
+    )
+    parser.add_argument(
+        "--routes", nargs="*", help="executa somente as rotas que contêm esses textos"
+    )
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--output", help="arquivo JSON do resultado")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare)
+
+    report = run_suite(args)
+    output = args.output or os.path.join(
+        ROOT,
+        "benchmarks",
+        "results",
+        f"{datetime.now():%Y%m%d-%H%M%S}-{report['commit']}.json",
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Resultado gravado em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,3 @@
 from blueprint.searcher_bp import searcher_bp
 from blueprint.forum_bp import forum_bp
+from blueprint.status_bp import status_bp
@@ -1,14 +1,33 @@
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from os import environ as env
 from dotenv import find_dotenv, load_dotenv
-import requests
 from flask_openapi3 import APIBlueprint
 from flask_openapi3 import Tag
-from flask import session
-
-from logger import logger
+from flask import Response, current_app, request, stream_with_context
+from pydantic import ValidationError
+from requests.exceptions import ConnectTimeout, InvalidJSONError, RequestException
+from urllib3.exceptions import HTTPError
+import ijson
+
+from auth import current_user, login_required
+from blueprint.log import logger
+from json_provider import loads, data_bytes, raw_json_response
+from tracing import tracer
+from metrics import metrics
+from upstream import (
+    forum_client,
+    forum_flight,
+    iter_graphql_items,
+    UpstreamUnavailable,
+)
+from cache import forum_cache, forum_refresher
+from blueprint.pagination import paginate, decode_cursor, sort_listing
 from schemas import (
     ByUserPathSchema,
     ByPeriodQueryParamSchema,
+    ListingQueryParamSchema,
     ArticlePathSchema,
     CommentPathSchema,
     AddArticleBodySchema,
@@ -30,6 +49,9 @@ from schemas import (
     RemoveCommentResponse,
     UpdateCommentResponse,
     ErrorSchema,
+    BatchBodySchema,
+    BatchResponse,
+    ImportResultSchema,
 )
 from queries import (
     articles_query,
@@ -46,6 +68,13 @@ from queries import (
     add_comment_mutation,
     remove_comment_mutation,
     update_comment_mutation,
+    read_queries,
+    operation_name,
+    build_batch_document,
+    has_document_errors,
+    split_batch_response,
+    project_query,
+    SUMMARY_FIELDS,
 )
 
 
@@ -54,12 +83,31 @@ if ENV_FILE:
     load_dotenv(ENV_FILE)
 
 
-forum_api_url = env.get("FORUM_API_URL")
+batch_max_reads = int(env.get("FORUM_BATCH_MAX_READS", 25))
+import_batch_size = int(env.get("FORUM_IMPORT_BATCH_SIZE", 50))
+import_concurrency = int(env.get("FORUM_IMPORT_CONCURRENCY", 4))
+import_max_line_bytes = int(env.get("FORUM_IMPORT_MAX_LINE_BYTES", 1024 * 1024))
+stream_chunk_size = int(env.get("FORUM_STREAM_CHUNK_SIZE", 64 * 1024))
 tag = Tag(
     name="Forum API",
     description="Rotas para o serviço Forum API. GET/POST/PUT/DELETE para Artigos e Comentários.",
 )
 
+# Variáveis graphql de cada operação de leitura e o atributo do BatchReadSchema
+# utilizado como valor.
+BATCH_READ_VARIABLES = {
+    "articles": {},
+    "articleById": {"articleID": "article_id"},
+    "articlesByUserId": {"userID": "user_id"},
+    "articlesByPeriod": {"initialDate": "initialDate", "endDate": "endDate"},
+    "comments": {},
+    "commentById": {"commentID": "comment_id"},
+    "commentByUserId": {"userID": "user_id"},
+    "commentsByPeriod": {"initialDate": "initialDate", "endDate": "endDate"},
+}
+
+STREAM_MIMETYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
 
 forum_bp = APIBlueprint(
     "forum",
@@ -71,22 +119,474 @@ forum_bp = APIBlueprint(
 )
 
 
+def fetch_forum_query(query, variables=None):
+    """Executa uma query de leitura na Api GraphQL do serviço Forum API.
+
+    As respostas sem erros são armazenadas no forum_cache e reutilizadas até expirarem
+    ou serem invalidadas por uma mutation que altere os artigos ou comentários contidos.
+    Leituras idênticas e simultâneas aguardam uma única requisição ao Forum API.
+    Uma resposta expirada recentemente é retornada imediatamente e atualizada em
+    segundo plano (stale-while-revalidate). Com o Forum API indisponível (circuito
+    aberto ou bulkhead cheio) é retornada a resposta expirada do cache, se existir.
+    """
+    data, _ = fetch_forum_result(query, variables)
+    return data
+
+
+def fetch_forum_result(query, variables=None):
+    """Igual a fetch_forum_query, mas retorna também os bytes do campo 'data' da
+    resposta do Forum API (ou None), na forma (data, raw). Os handlers que não alteram
+    a resposta enviam esses bytes diretamente ao cliente.
+    """
+    cached, stale = forum_cache.lookup_revalidate(query, variables)
+    if cached is not None:
+        if stale:
+            schedule_forum_refresh(query, variables)
+        return cached
+
+    try:
+        return forum_flight.do(
+            forum_cache.key(query, variables),
+            lambda: _post_forum_query(query, variables),
+        )
+    except UpstreamUnavailable as error:
+        stale = forum_cache.lookup_stale(query, variables)
+        if stale is None:
+            raise
+        logger.warning(
+            "Forum API indisponível (%s), usando o cache expirado.", error.reason
+        )
+        return stale
+
+
+def schedule_forum_refresh(query, variables=None):
+    """Agenda a atualização em segundo plano de uma leitura desatualizada do cache."""
+    key = forum_cache.key(query, variables)
+    forum_refresher.submit(
+        key, lambda: forum_flight.do(key, lambda: _post_forum_query(query, variables))
+    )
+
+
+def decode_forum_response(response):
+    """Decodifica a resposta do Forum API no span 'forum.validate', registrando se a
+    resposta contém erros graphql."""
+    with tracer.span("forum.validate", bytes=len(response.content)) as span:
+        try:
+            data = loads(response.content)
+        except ValueError as error:
+            # Ex: uma página de erro do proxy. Tratado como falha de comunicação (502).
+            raise InvalidJSONError(f"Resposta inválida do Forum API: {error}")
+        has_errors = bool(data.get("errors")) or any(
+            isinstance(result, dict) and result.get("errors")
+            for result in (data.get("data") or {}).values()
+        )
+        span.set_attribute("graphql.errors", has_errors)
+    if has_errors:
+        metrics.graphql_error(forum_client.name, getattr(response, "operation", None))
+    return data
+
+
+def _post_forum_query(query, variables):
+    generation = forum_cache.generation
+    payload = {"query": query}
+    if variables:
+        payload["variables"] = variables
+
+    response = forum_client.post(json=payload)
+    data = decode_forum_response(response)
+    raw = data_bytes(response.content, data)
+    if not data.get("errors"):
+        raw = sort_listing(data, raw)
+        forum_cache.set(
+            query, variables, data, len(response.content), generation, raw
+        )
+
+    return data, raw
+
+
+def stream_forum_query(query, variables, stream_format):
+    """Executa uma query de listagem no Forum API e envia os itens ao cliente à medida
+    que são lidos da resposta, como um array JSON ({"articles": [...]}) ou NDJSON, sem
+    carregar a resposta inteira na memória.
+
+    Uma listagem já presente no forum_cache é enviada a partir do cache. As listagens
+    lidas em partes não são armazenadas no cache.
+    """
+    field = operation_name(query)
+    cached = forum_cache.get(query, variables)
+    if cached is not None:
+        records = (("item", item) for item in cached["data"][field] or [])
+        return _stream_response(field, records, stream_format)
+
+    payload = {"query": query}
+    if variables:
+        payload["variables"] = variables
+
+    # A resposta ocupa uma vaga do bulkhead do Forum API até ser fechada, ao final do
+    # envio ou no encerramento da resposta ao cliente.
+    response = forum_client.post(json=payload, stream=True)
+    if not response.ok:
+        try:
+            data = decode_forum_response(response)
+        finally:
+            response.close()
+        logger.warning("Erro na busca de %s: %s.", field, data.get("errors"))
+        return data, 400
+
+    response.raw.decode_content = True
+    records = iter_graphql_items(response.raw, field)
+    return _stream_response(field, records, stream_format, response)
+
+
+def _stream_response(field, records, stream_format, upstream_response=None):
+    response = Response(
+        stream_with_context(
+            _stream_chunks(field, records, stream_format, upstream_response)
+        ),
+        mimetype=STREAM_MIMETYPES[stream_format],
+    )
+    if upstream_response is not None:
+        # O _stream_chunks não é executado se o cliente desconectar antes do envio.
+        response.call_on_close(upstream_response.close)
+    return response
+
+
+def _stream_chunks(field, records, stream_format, upstream_response):
+    """Serializa os itens e os agrupa em partes de até FORUM_STREAM_CHUNK_SIZE bytes.
+    Os erros graphql são enviados no final, no campo 'errors' do JSON ou na última
+    linha do NDJSON.
+
+    Uma falha na leitura da resposta do Forum API depois do início do envio não pode
+    mais alterar o status 200. No NDJSON é enviada uma última linha {"error": ...},
+    e no JSON o array é deixado sem o fechamento, assim o cliente não confunde uma
+    listagem interrompida com uma listagem completa.
+    """
+    dumps = current_app.json.dumps
+    ndjson = stream_format == "ndjson"
+    buffer = [] if ndjson else [f'{{"{field}":[']
+    size = count = 0
+    errors = None
+    try:
+        for kind, value in records:
+            if kind == "errors":
+                errors = value
+                continue
+            item = dumps(value)
+            if ndjson:
+                buffer.append(item + "\n")
+            else:
+                buffer.append("," + item if count else item)
+            size += len(item)
+            count += 1
+            if size >= stream_chunk_size:
+                yield "".join(buffer)
+                buffer, size = [], 0
+
+        if ndjson and errors:
+            buffer.append(dumps({"errors": errors}) + "\n")
+        elif not ndjson:
+            buffer.append(f'],"errors":{dumps(errors)}}}' if errors else "]}")
+        yield "".join(buffer)
+        logger.debug("%s itens de %s enviados em partes.", count, field)
+    except (ijson.JSONError, HTTPError, RequestException) as error:
+        logger.warning("Falha na leitura em partes de %s: %s", field, error)
+        if ndjson:
+            buffer.append(dumps({"error": "Upstream stream interrupted"}) + "\n")
+        # No JSON somente os itens já lidos são enviados, sem fechar o array.
+        yield "".join(buffer)
+    finally:
+        if upstream_response is not None:
+            upstream_response.close()
+
+
+def _listing_response(query, variables, params):
+    """Resposta das rotas de listagem. A query recebe somente os campos pedidos nos
+    paramêtros 'view' ou 'fields', e a listagem é enviada em partes com 'stream' ou
+    paginada pelos paramêtros 'limit' e 'after'. Sem 'limit' e 'after' a listagem
+    completa é enviada sem paginação, como antes da paginação existir.
+    """
+    try:
+        forum_query = projected_query(query, params)
+        cursor = decode_cursor(params.after)
+    except ValueError as error:
+        logger.warning("Erro nos paramêtros da listagem: %s", error)
+        return {"error": str(error)}, 400
+
+    if params.stream:
+        return stream_forum_query(forum_query, variables, params.stream)
+
+    data, raw = fetch_forum_result(forum_query, variables)
+    if data.get("errors"):
+        logger.warning(
+            "Erro na busca de %s: %s.", operation_name(query), data.get("errors")
+        )
+        return data, 400
+
+    if params.limit or cursor is not None:
+        return paginate(data["data"], params.limit, cursor), 200
+    if raw is not None:
+        return raw_json_response(raw)
+    return data["data"], 200
+
+
+def projected_query(query, params):
+    """Retorna a query de listagem com somente os campos pedidos nos paramêtros
+    'fields' ou 'view' da requisição. Um campo inexistente gera ValueError.
+    """
+    if params.fields:
+        # updatedAt é mantido por ser utilizado na ordenação da paginação.
+        return project_query(query, params.fields.split(",") + ["updatedAt"])
+    if params.view == "summary":
+        return project_query(query, SUMMARY_FIELDS, strict=False)
+    return query
+
+
+def fetch_forum_batch(reads):
+    """Executa uma lista de queries de leitura (query, variáveis) no Forum API com uma
+    única requisição, combinando as leituras que não estão no forum_cache em um
+    documento graphql com aliases.
+
+    Retorna uma resposta no mesmo formato de fetch_forum_query para cada leitura.
+    """
+    results = [None] * len(reads)
+    pending = {}
+    for index, (query, variables) in enumerate(reads):
+        cached = forum_cache.get(query, variables)
+        if cached is not None:
+            results[index] = cached
+            continue
+
+        key = forum_cache.key(query, variables)
+        if key not in pending:
+            pending[key] = (f"r{len(pending)}", query, variables, [])
+        pending[key][3].append(index)
+
+    if not pending:
+        return results
+
+    generation = forum_cache.generation
+    document, batch_variables = build_batch_document(
+        [(alias, query, variables) for alias, query, variables, _ in pending.values()]
+    )
+    response = forum_client.post(
+        json={"query": document, "variables": batch_variables},
+    )
+    batch_data = decode_forum_response(response)
+    document_errors = has_document_errors(batch_data)
+    split = split_batch_response(
+        [alias for alias, _, _, _ in pending.values()], batch_data
+    )
+    size = len(response.content) // len(pending)
+
+    for alias, query, variables, indexes in pending.values():
+        if document_errors and len(pending) > 1:
+            # O documento inteiro foi rejeitado (ex: uma variável inválida), então cada
+            # leitura é enviada separadamente para receber somente os seus erros.
+            data = fetch_forum_query(query, variables)
+            for index in indexes:
+                results[index] = data
+            continue
+        data = {"data": {operation_name(query): split[alias]["data"]}}
+        if split[alias]["errors"]:
+            data["errors"] = split[alias]["errors"]
+        else:
+            sort_listing(data)
+            forum_cache.set(query, variables, data, size, generation)
+        for index in indexes:
+            results[index] = data
+
+    return results
+
+
+# Schema, mutation e campo raiz da resposta de cada tipo de registro da importação.
+IMPORT_TYPES = {
+    "article": (AddArticleBodySchema, add_article_mutation, "addArticle"),
+    "comment": (AddCommentBodySchema, add_comment_mutation, "addComment"),
+}
+
+
+def _import_variables(kind, record, user):
+    if kind == "article":
+        variables = {"content": record.content, "title": record.title}
+    else:
+        variables = {
+            "articleID": str(record.article_id),
+            "content": record.content,
+            "isReply": record.is_reply or False,
+            "commentReply": str(record.comment_reply) if record.comment_reply else None,
+        }
+    variables.update(user.variables())
+    return variables
+
+
+def _read_import_lines(stream):
+    """Lê as linhas do corpo NDJSON à medida que são recebidas, retornando
+    (número da linha, linha). Uma linha maior que FORUM_IMPORT_MAX_LINE_BYTES é
+    retornada como None e descartada até o fim."""
+    number = 0
+    while True:
+        line = stream.readline(import_max_line_bytes + 1)
+        if not line:
+            return
+        number += 1
+        if len(line) > import_max_line_bytes and not line.endswith(b"\n"):
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(import_max_line_bytes)
+            yield number, None
+        elif line.strip():
+            yield number, line
+
+
+def _parse_import_record(number, line, user):
+    """Valida uma linha da importação. Retorna o item do lote: (linha, tipo,
+    variáveis da mutation, resultado), com o resultado já preenchido nos registros
+    inválidos."""
+    if line is None:
+        return number, None, None, {"status": "failed", "errors": ["Line too long"]}
+    try:
+        record = loads(line)
+    except ValueError:
+        return number, None, None, {"status": "failed", "errors": ["Invalid JSON"]}
+    kind = record.get("type") if isinstance(record, dict) else None
+    if kind not in IMPORT_TYPES:
+        errors = ["type must be article or comment"]
+        return number, None, None, {"status": "failed", "errors": errors}
+    try:
+        validated = IMPORT_TYPES[kind][0].model_validate(record)
+    except ValidationError as error:
+        messages = [
+            f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}"
+            for detail in error.errors()
+        ]
+        return number, kind, None, {"status": "failed", "errors": messages}
+    return number, kind, _import_variables(kind, validated, user), None
+
+
+def _post_import_mutations(pending):
+    """Envia os registros (alias, item do lote) ao Forum API em um único documento
+    graphql de mutations com aliases. Retorna {alias: (status, resultado)}, com o
+    status 'created', 'failed' ou 'unknown'."""
+    document, variables = build_batch_document(
+        [
+            (alias, IMPORT_TYPES[kind][1], item_variables)
+            for alias, (_, kind, item_variables, _) in pending
+        ],
+        operation_type="mutation",
+    )
+    try:
+        response = forum_client.post(json={"query": document, "variables": variables})
+        data = decode_forum_response(response)
+    except (UpstreamUnavailable, ConnectTimeout) as error:
+        # O documento não foi enviado, e os registros podem ser enviados novamente.
+        logger.warning("Lote da importação não enviado: %s", error)
+        result = ("failed", ["Upstream service unavailable"])
+        return {alias: result for alias, _ in pending}
+    except RequestException as error:
+        # Ex: timeout da resposta. O Forum API pode ter criado parte dos registros.
+        logger.warning("Resultado de um lote da importação desconhecido: %s", error)
+        result = ("unknown", ["Upstream response not received, record may exist"])
+        return {alias: result for alias, _ in pending}
+
+    if len(pending) > 1 and has_document_errors(data):
+        # O documento inteiro foi rejeitado antes da execução (ex: uma variável
+        # inválida), então cada registro é enviado separadamente para receber somente
+        # os seus erros.
+        results = {}
+        for alias, item in pending:
+            results.update(_post_import_mutations([(alias, item)]))
+        return results
+
+    split = split_batch_response([alias for alias, _ in pending], data)
+    results = {}
+    for alias, (_, kind, _, _) in pending:
+        result, errors = split[alias]["data"], split[alias]["errors"]
+        if not errors and (result is None or result.get("errors")):
+            errors = (result or {}).get("errors") or ["Not created"]
+        if errors:
+            results[alias] = ("failed", errors)
+        else:
+            # Mesmo formato da resposta de POST /article e POST /comment.
+            results[alias] = ("created", {IMPORT_TYPES[kind][2]: result})
+    return results
+
+
+def _send_import_batch(batch, user):
+    """Envia os registros válidos do lote ao Forum API e retorna um resultado por
+    registro, na ordem do lote."""
+    pending = [
+        (f"m{index}", item) for index, item in enumerate(batch) if item[3] is None
+    ]
+    results = _post_import_mutations(pending) if pending else {}
+
+    articles_added = False
+    comments_added = set()
+    output = []
+    for index, (number, kind, item_variables, result) in enumerate(batch):
+        if result is None:
+            status, value = results[f"m{index}"]
+            key = "data" if status == "created" else "errors"
+            result = {"status": status, key: value}
+        output.append({"line": number, "type": kind, **result})
+        # Um registro com resultado desconhecido também pode ter sido criado.
+        if result["status"] == "failed":
+            continue
+        if kind == "article":
+            articles_added = True
+        else:
+            comments_added.add(
+                (item_variables["articleID"], item_variables["commentReply"])
+            )
+    # Uma invalidação por lote, ao invés de uma por registro.
+    if articles_added:
+        forum_cache.article_added(user.user_id)
+    for article_id, comment_reply in comments_added:
+        forum_cache.comment_added(article_id, user.user_id, comment_reply)
+    return output
+
+
+def import_records(stream, user):
+    """Importa os registros NDJSON do stream em lotes de FORUM_IMPORT_BATCH_SIZE
+    registros, com até FORUM_IMPORT_CONCURRENCY lotes enviados ao Forum API ao mesmo
+    tempo. Os resultados são retornados por registro, na ordem das linhas, assim que
+    o lote é concluído, e a leitura do corpo aguarda enquanto o limite de lotes em
+    andamento está atingido.
+    """
+    executor = ThreadPoolExecutor(import_concurrency)
+    in_flight = deque()
+    batch = []
+    try:
+        for number, line in _read_import_lines(stream):
+            batch.append(_parse_import_record(number, line, user))
+            if len(batch) < import_batch_size:
+                continue
+            if len(in_flight) >= import_concurrency:
+                yield from in_flight.popleft().result()
+            # Cada lote executa em uma cópia do contexto da requisição (trace e medições).
+            context = contextvars.copy_context()
+            in_flight.append(
+                executor.submit(context.run, _send_import_batch, batch, user)
+            )
+            batch = []
+        if batch:
+            context = contextvars.copy_context()
+            in_flight.append(
+                executor.submit(context.run, _send_import_batch, batch, user)
+            )
+        while in_flight:
+            yield from in_flight.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 @forum_bp.get("/articles", responses={"200": GetArticlesResponse})
-def get_articles():
+def get_articles(query: ListingQueryParamSchema):
     """Busca todos os Artigos existentes no banco de dados.
 
     Utiliza a 'articles_query' para a requisição na Api GraphQL do serviço Forum API.
     """
     logger.debug("Buscando todos artigos existentes.")
 
-    response = requests.post(url=forum_api_url, json={"query": articles_query})
-    article_data = response.json()
-
-    if article_data.get("errors"):
-        logger.warning(f"Erro na busca de artigos: {article_data.get('errors')}.")
-        return article_data, 400
-
-    return article_data["data"], 200
+    return _listing_response(articles_query, None, query)
 
 
 @forum_bp.get("/articles/id/<article_id>", responses={"200": GetArticleByIdResponse})
@@ -99,20 +599,19 @@ def get_article_by_id(path: ArticlePathSchema):
 
     variables = {"articleID": path.article_id}
 
-    response = requests.post(
-        url=forum_api_url, json={"query": article_by_id_query, "variables": variables}
-    )
-    article_data = response.json()
+    article_data, raw = fetch_forum_result(article_by_id_query, variables)
 
     if article_data.get("errors"):
-        logger.warning(f"Erro na busca de artigos: {article_data.get('errors')}.")
+        logger.warning("Erro na busca de artigos: %s.", article_data.get("errors"))
         return article_data, 400
 
+    if raw is not None:
+        return raw_json_response(raw)
     return article_data["data"], 200
 
 
 @forum_bp.get("/articles/user/<user_id>", responses={"200": GetArticleByUserResponse})
-def get_article_by_user_id(path: ByUserPathSchema):
+def get_article_by_user_id(path: ByUserPathSchema, query: ListingQueryParamSchema):
     """Busca todos os Artigos que foram criados pelo usuário com ID <user_id>
     indicado na path da requisição.
 
@@ -122,17 +621,7 @@ def get_article_by_user_id(path: ByUserPathSchema):
 
     variables = {"userID": path.user_id}
 
-    response = requests.post(
-        url=forum_api_url,
-        json={"query": articles_by_user_id_query, "variables": variables},
-    )
-    article_data = response.json()
-
-    if article_data.get("errors"):
-        logger.warning(f"Erro na busca de artigos: {article_data.get('errors')}.")
-        return article_data, 400
-
-    return article_data["data"], 200
+    return _listing_response(articles_by_user_id_query, variables, query)
 
 
 @forum_bp.get("/articles/period", responses={"200": GetArticleByPeriodResponse})
@@ -147,35 +636,18 @@ def get_article_by_period(query: ByPeriodQueryParamSchema):
 
     variables = {"initialDate": query.initialDate, "endDate": query.endDate}
 
-    response = requests.post(
-        url=forum_api_url,
-        json={"query": articles_by_period_query, "variables": variables},
-    )
-    article_data = response.json()
-
-    if article_data.get("errors"):
-        logger.warning(f"Erro na busca de artigos: {article_data.get('errors')}.")
-        return article_data, 400
-
-    return article_data["data"], 200
+    return _listing_response(articles_by_period_query, variables, query)
 
 
 @forum_bp.get("/comments", responses={"200": GetCommentsResponse})
-def get_comments():
+def get_comments(query: ListingQueryParamSchema):
     """Busca todos os Comentários existentes no banco de dados e os artigos a qual são relacionados.
 
     Utiliza a 'comments_query' para a requisição na Api GraphQL do serviço Forum API.
     """
     logger.debug("Buscando comentários existentes.")
 
-    response = requests.post(url=forum_api_url, json={"query": comments_query})
-    comment_data = response.json()
-
-    if comment_data.get("errors"):
-        logger.warning(f"Erro na busca de comentários: {comment_data.get('errors')}.")
-        return comment_data, 400
-
-    return comment_data["data"], 200
+    return _listing_response(comments_query, None, query)
 
 
 @forum_bp.get("/comments/id/<comment_id>", responses={"200": GetCommentByIdResponse})
@@ -188,20 +660,19 @@ def get_comment_by_id(path: CommentPathSchema):
 
     variables = {"commentID": path.comment_id}
 
-    response = requests.post(
-        url=forum_api_url, json={"query": comment_by_id_query, "variables": variables}
-    )
-    comment_data = response.json()
+    comment_data, raw = fetch_forum_result(comment_by_id_query, variables)
 
     if comment_data.get("errors"):
-        logger.warning(f"Erro na busca de comentários: {comment_data.get('errors')}.")
+        logger.warning("Erro na busca de comentários: %s.", comment_data.get("errors"))
         return comment_data, 400
 
+    if raw is not None:
+        return raw_json_response(raw)
     return comment_data["data"], 200
 
 
 @forum_bp.get("/comments/user/<user_id>", responses={"200": GetCommentByUserIdResponse})
-def get_comments_by_user_id(path: ByUserPathSchema):
+def get_comments_by_user_id(path: ByUserPathSchema, query: ListingQueryParamSchema):
     """Busca todos os Comentários que foram criados pelo usuário com ID <user_id>
     indicado na path da requisição.
 
@@ -211,17 +682,7 @@ def get_comments_by_user_id(path: ByUserPathSchema):
 
     variables = {"userID": path.user_id}
 
-    response = requests.post(
-        url=forum_api_url,
-        json={"query": comments_by_user_id_query, "variables": variables},
-    )
-    comment_data = response.json()
-
-    if comment_data.get("errors"):
-        logger.warning(f"Erro na busca de comentários: {comment_data.get('errors')}.")
-        return comment_data, 400
-
-    return comment_data["data"], 200
+    return _listing_response(comments_by_user_id_query, variables, query)
 
 
 @forum_bp.get("/comments/period", responses={"200": GetCommentByPeriodResponse})
@@ -236,61 +697,120 @@ def get_comments_by_period(query: ByPeriodQueryParamSchema):
 
     variables = {"initialDate": query.initialDate, "endDate": query.endDate}
 
-    response = requests.post(
-        url=forum_api_url,
-        json={"query": comments_by_period_query, "variables": variables},
-    )
-    comment_data = response.json()
+    return _listing_response(comments_by_period_query, variables, query)
 
-    if comment_data.get("errors"):
-        logger.warning(f"Erro na busca de comentários: {comment_data.get('errors')}.")
-        return comment_data, 400
 
-    return comment_data["data"], 200
+@forum_bp.post("/batch", responses={"200": BatchResponse})
+def batch_reads(body: BatchBodySchema):
+    """Realiza várias leituras do fórum em uma única requisição. No corpo da requisição
+    deverá ter a lista 'reads', onde cada item indica a operação e seus paramêtros.
+    ex: {"reads": [{"operation": "articleById", "article_id": "..."},
+    {"operation": "commentByUserId", "user_id": "..."}]}
+
+    As leituras são enviadas ao Forum API em um único documento graphql com aliases, e
+    a resposta tem um resultado para cada leitura na mesma ordem da requisição.
+    """
+    logger.debug("Buscando %s leituras em lote.", len(body.reads))
+
+    if len(body.reads) > batch_max_reads:
+        logger.warning("Lote com %s leituras excede o limite.", len(body.reads))
+        return {"error": f"Batch limited to {batch_max_reads} reads"}, 400
+
+    reads = []
+    for index, read in enumerate(body.reads):
+        fields = BATCH_READ_VARIABLES[read.operation]
+        variables = {name: getattr(read, field) for name, field in fields.items()}
+        missing = [fields[name] for name, value in variables.items() if value is None]
+        if missing:
+            return {"error": f"reads[{index}] missing {', '.join(missing)}"}, 400
+        # Os ids já validados como UUID são enviados como texto.
+        variables = {name: str(value) for name, value in variables.items()}
+        reads.append((read_queries[read.operation], variables or None))
+
+    results = fetch_forum_batch(reads)
+
+    return {
+        "results": [
+            {"data": result.get("data"), "errors": result.get("errors")}
+            for result in results
+        ]
+    }, 200
+
+
+@forum_bp.post("/import", responses={"200": ImportResultSchema})
+@login_required
+def import_forum():
+    """Importa artigos e comentários em massa. O corpo da requisição deverá ser
+    NDJSON, com um registro por linha, no formato do corpo de POST /article ou
+    POST /comment acrescido do campo 'type' ('article' ou 'comment').
+    ex: {"type": "article", "title": "...", "content": "..."}
+
+    O corpo é lido à medida que é recebido. Os registros são validados e enviados ao
+    Forum API em lotes, cada lote em um único documento graphql de mutations com
+    aliases, com uma quantidade limitada de lotes simultâneos. A resposta é NDJSON,
+    com uma linha por registro na ordem do corpo, com 'status' e 'data' ou 'errors'.
+
+    O status é 'created', 'failed' ou 'unknown'. Um registro 'failed' não foi criado
+    e pode ser enviado novamente. 'unknown' indica que o lote foi enviado mas a
+    resposta do Forum API não foi recebida (ex: timeout), então o registro pode ter
+    sido criado. A importação não é idempotente, e reenviar essas linhas pode
+    duplicar os registros.
+    """
+    user = current_user()
+    logger.debug("Importação de registros do usuário %s.", user.nickname)
+
+    def generate():
+        counts = {"created": 0, "failed": 0, "unknown": 0}
+        for result in import_records(request.stream, user):
+            counts[result["status"]] += 1
+            yield current_app.json.dumps(result) + "\n"
+        logger.info(
+            "Importação concluída: %d criados, %d com erro, %d desconhecidos.",
+            counts["created"],
+            counts["failed"],
+            counts["unknown"],
+        )
+
+    return Response(
+        stream_with_context(generate()), mimetype=STREAM_MIMETYPES["ndjson"]
+    )
 
 
 @forum_bp.post("/article", responses={"200": AddArticleResponse})
+@login_required
 def add_article(body: AddArticleBodySchema):
     """Insere um novo Artigo no banco de dados. Necessita que se esteja autenticado para as 
     informações de usuário. No corpo da requisição deverá ter o title e content.
 
     Utiliza a 'add_article_mutation' para a requisição na Api GraphQL do serviço Forum API.
     """
-    user = session.get("user")
-    if not user:
-        logger.warning("Usuário não logado!")
-        return {"error": "User not logged in!"}, 403
-
-    user_info = user.get("userinfo")
-    user_data = {
-        "userEmail": user_info.get("email"),
-        "userID": user_info.get("sub"),
-        "userNickname": user_info.get("nickname"),
-    }
+    user = current_user()
 
     variables = {
         "content": body.content,
         "title": body.title,
     }
-    variables.update(user_data)
+    variables.update(user.variables())
 
-    logger.debug(f"Adicionando artigo de usuário '{user_data.get('userNickname')}'")
-    response = requests.post(
-        url=forum_api_url, json={"query": add_article_mutation, "variables": variables}
+    logger.debug("Adicionando artigo de usuário '%s'", user.nickname)
+    response = forum_client.post(
+        json={"query": add_article_mutation, "variables": variables}
     )
-    article_data = response.json()
+    article_data = decode_forum_response(response)
     result = article_data.get("data")
     if article_data.get("errors") or result.get("addArticle").get("errors"):
         erro_msg = article_data.get("errors") or result.get("addArticle").get("errors")
-        logger.warning(f"Erro ao adicionar artigo: {erro_msg}")
+        logger.warning("Erro ao adicionar artigo: %s", erro_msg)
 
         return article_data, 400
 
-    logger.debug(f"Artigo de {user_data.get('userNickname')} adicionado com sucesso.")
+    forum_cache.article_added(user.user_id)
+    logger.debug("Artigo de %s adicionado com sucesso.", user.nickname)
     return article_data["data"], 200
 
 
 @forum_bp.delete("/article/<article_id>", responses={"200": RemoveArticleResponse})
+@login_required
 def remove_article(path: ArticlePathSchema):
     """Remove um Artigo específico pelo seu ID <article_id> indicado na path da requisição.
     Necessita que se esteja autenticado para as informações de usuário. Somente o usuário que 
@@ -298,43 +818,32 @@ def remove_article(path: ArticlePathSchema):
 
     Utiliza a 'remove_article_mutation' para a requisição na Api GraphQL do serviço Forum API.
     """
-    user = session.get("user")
-    if not user:
-        logger.warning("Usuário não logado!")
-        return {"error": "User not logged in!"}, 403
-
-    user_info = user.get("userinfo")
-    user_data = {
-        "userEmail": user_info.get("email"),
-        "userID": user_info.get("sub"),
-        "userNickname": user_info.get("nickname"),
-    }
+    user = current_user()
 
     variables = {"articleID": path.article_id}
-    variables.update(user_data)
+    variables.update(user.variables())
 
-    logger.debug(
-        f"Removendo artigo {path.article_id} de usuário {user_data.get('userNickname')}"
-    )
-    response = requests.post(
-        url=forum_api_url,
+    logger.debug("Removendo artigo %s de usuário %s", path.article_id, user.nickname)
+    response = forum_client.post(
         json={"query": remove_article_mutation, "variables": variables},
     )
-    article_data = response.json()
+    article_data = decode_forum_response(response)
     result = article_data.get("data")
     if article_data.get("errors") or result.get("removeArticle").get("errors"):
         erro_msg = article_data.get("errors") or result.get("removeArticle").get(
             "errors"
         )
-        logger.warning(f"Erro ao remover artigo: {erro_msg}")
+        logger.warning("Erro ao remover artigo: %s", erro_msg)
 
         return article_data, 400
 
-    logger.debug(f"Artigo de {user_data.get('userNickname')} removido com sucesso.")
+    forum_cache.article_changed(path.article_id)
+    logger.debug("Artigo de %s removido com sucesso.", user.nickname)
     return article_data["data"], 200
 
 
 @forum_bp.put("/article/<article_id>", responses={"200": UpdateArticleResponse})
+@login_required
 def update_article(path: ArticlePathSchema, body: UpdateArticleBodySchema):
     """Atualiza Artigo específico pelo seu ID <article_id> indicado na path da requisição.
     Necessita que se esteja autenticado para as informações de usuário. Somente o usuário que criou o 
@@ -342,47 +851,36 @@ def update_article(path: ArticlePathSchema, body: UpdateArticleBodySchema):
 
     Utiliza a 'update_article_mutation' para a requisição na Api GraphQL do serviço Forum API.
     """
-    user = session.get("user")
-    if not user:
-        logger.warning("Usuário não logado!")
-        return {"error": "User not logged in!"}, 403
-
-    user_info = user.get("userinfo")
-    user_data = {
-        "userEmail": user_info.get("email"),
-        "userID": user_info.get("sub"),
-        "userNickname": user_info.get("nickname"),
-    }
+    user = current_user()
 
     variables = {
         "articleID": path.article_id,
         "content": body.content or None,
         "title": body.title or None,
     }
-    variables.update(user_data)
+    variables.update(user.variables())
 
-    logger.debug(
-        f"Atualizando artigo {path.article_id} de usuário {user_data.get('userNickname')}"
-    )
-    response = requests.post(
-        url=forum_api_url,
+    logger.debug("Atualizando artigo %s de usuário %s", path.article_id, user.nickname)
+    response = forum_client.post(
         json={"query": update_article_mutation, "variables": variables},
     )
-    article_data = response.json()
+    article_data = decode_forum_response(response)
     result = article_data.get("data")
     if article_data.get("errors") or result.get("updateArticle").get("errors"):
         erro_msg = article_data.get("errors") or result.get("updateArticle").get(
             "errors"
         )
-        logger.warning(f"Erro ao atualizar artigo: {erro_msg}")
+        logger.warning("Erro ao atualizar artigo: %s", erro_msg)
 
         return article_data, 400
 
-    logger.debug(f"Artigo de {user_data.get('userNickname')} atualizado com sucesso.")
+    forum_cache.article_changed(path.article_id)
+    logger.debug("Artigo de %s atualizado com sucesso.", user.nickname)
     return result, 200
 
 
 @forum_bp.post("/comment", responses={"200": AddCommentResponse})
+@login_required
 def add_comment(body: AddCommentBodySchema):
     """Insere um novo Comentário no banco de dados. Necessita que se esteja autenticado para as 
     informações de usuário. No corpo da requisição deverá ter article_id, content 
@@ -390,45 +888,37 @@ def add_comment(body: AddCommentBodySchema):
 
     Utiliza a 'add_comment_mutation' para a requisição na Api GraphQL do serviço Forum API.
     """
-    user = session.get("user")
-    if not user:
-        logger.warning("Usuário não logado!")
-        return {"error": "User not logged in!"}, 403
-
-    user_info = user.get("userinfo")
-    user_data = {
-        "userEmail": user_info.get("email"),
-        "userID": user_info.get("sub"),
-        "userNickname": user_info.get("nickname"),
-    }
+    user = current_user()
 
+    article_id = str(body.article_id)
+    comment_reply = str(body.comment_reply) if body.comment_reply else None
     variables = {
-        "articleID": body.article_id,
+        "articleID": article_id,
         "content": body.content,
         "isReply": body.is_reply or False,
-        "commentReply": body.comment_reply or None,
+        "commentReply": comment_reply,
     }
-    variables.update(user_data)
+    variables.update(user.variables())
 
-    logger.debug(f"Adicionando comentário de usuário {user_data.get('userNickname')}")
-    response = requests.post(
-        url=forum_api_url, json={"query": add_comment_mutation, "variables": variables}
+    logger.debug("Adicionando comentário de usuário %s", user.nickname)
+    response = forum_client.post(
+        json={"query": add_comment_mutation, "variables": variables}
     )
-    comment_data = response.json()
+    comment_data = decode_forum_response(response)
     result = comment_data.get("data")
     if comment_data.get("errors") or result.get("addComment").get("errors"):
         erro_msg = comment_data.get("errors") or result.get("addComment").get("errors")
-        logger.warning(f"Erro ao adicionar comentário: {erro_msg}")
+        logger.warning("Erro ao adicionar comentário: %s", erro_msg)
 
         return comment_data, 400
 
-    logger.debug(
-        f"Comentário de {user_data.get('userNickname')} adicionado com sucesso."
-    )
+    forum_cache.comment_added(article_id, user.user_id, comment_reply)
+    logger.debug("Comentário de %s adicionado com sucesso.", user.nickname)
     return result, 200
 
 
 @forum_bp.delete("/comment/<comment_id>", responses={"200": RemoveCommentResponse})
+@login_required
 def remove_comment(path: CommentPathSchema):
     """Remove um Comentário específico pelo seu ID <comment_id> indicado na path da requisição.
     Necessita que se esteja autenticado para as informações de usuário. Somente o usuário que criou 
@@ -436,41 +926,32 @@ def remove_comment(path: CommentPathSchema):
 
     Utiliza a 'remove_comment_mutation' para a requisição na Api GraphQL do serviço Forum API.
     """
-    user = session.get("user")
-    if not user:
-        logger.warning("Usuário não logado!")
-        return {"error": "User not logged in!"}, 403
-
-    user_info = user.get("userinfo")
-    user_data = {
-        "userEmail": user_info.get("email"),
-        "userID": user_info.get("sub"),
-        "userNickname": user_info.get("nickname"),
-    }
+    user = current_user()
 
     variables = {"commentID": path.comment_id}
-    variables.update(user_data)
+    variables.update(user.variables())
 
-    logger.debug(f"Removendo comentário de usuário {user_data.get('userNickname')}")
-    response = requests.post(
-        url=forum_api_url,
+    logger.debug("Removendo comentário de usuário %s", user.nickname)
+    response = forum_client.post(
         json={"query": remove_comment_mutation, "variables": variables},
     )
-    comment_data = response.json()
+    comment_data = decode_forum_response(response)
     result = comment_data.get("data")
     if comment_data.get("errors") or result.get("removeComment").get("errors"):
         erro_msg = comment_data.get("errors") or result.get("removeComment").get(
             "errors"
         )
-        logger.warning(f"Erro ao remover comentário: {erro_msg}")
+        logger.warning("Erro ao remover comentário: %s", erro_msg)
 
         return comment_data, 400
 
-    logger.debug(f"Comentário de {user_data.get('userNickname')} removido com sucesso.")
+    forum_cache.comment_changed(path.comment_id)
+    logger.debug("Comentário de %s removido com sucesso.", user.nickname)
     return result, 200
 
 
 @forum_bp.put("/comment/<comment_id>", responses={"200": UpdateCommentResponse})
+@login_required
 def update_comment(path: CommentPathSchema, body: UpdateCommentBodySchema):
     """Atualiza Comentário específico pelo seu ID <comment_id> indicado na path da requisição.
     Necessita que se esteja autenticado para as informações de usuário. Somente o usuário que criou 
@@ -478,40 +959,28 @@ def update_comment(path: CommentPathSchema, body: UpdateCommentBodySchema):
 
     Utiliza a 'update_comment_mutation' para a requisição na Api GraphQL do serviço Forum API.
     """
-    user = session.get("user")
-    if not user:
-        logger.warning("Usuário não logado!")
-        return {"error": "User not logged in!"}, 403
-
-    user_info = user.get("userinfo")
-    user_data = {
-        "userEmail": user_info.get("email"),
-        "userID": user_info.get("sub"),
-        "userNickname": user_info.get("nickname"),
-    }
+    user = current_user()
 
     variables = {
         "commentID": path.comment_id,
         "content": body.content,
     }
-    variables.update(user_data)
+    variables.update(user.variables())
 
-    logger.debug(f"Atualizando comentário de usuário {user_data.get('userNickname')}")
-    response = requests.post(
-        url=forum_api_url,
+    logger.debug("Atualizando comentário de usuário %s", user.nickname)
+    response = forum_client.post(
         json={"query": update_comment_mutation, "variables": variables},
     )
-    comment_data = response.json()
+    comment_data = decode_forum_response(response)
     result = comment_data.get("data")
     if comment_data.get("errors") or result.get("updateComment").get("errors"):
         erro_msg = comment_data.get("errors") or result.get("updateComment").get(
             "errors"
         )
-        logger.warning(f"Erro ao atualizar comentário: {erro_msg}")
+        logger.warning("Erro ao atualizar comentário: %s", erro_msg)
 
         return comment_data, 400
 
-    logger.debug(
-        f"Comentário de {user_data.get('userNickname')} atualizado com sucesso."
-    )
+    forum_cache.comment_changed(path.comment_id)
+    logger.debug("Comentário de %s atualizado com sucesso.", user.nickname)
     return result, 200
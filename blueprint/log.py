@@ -0,0 +1,131 @@
+import logging
+import reprlib
+import threading
+import time
+from contextvars import ContextVar
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+from flask import has_request_context, request
+
+from logger import logger as app_logger
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+# Endpoint da requisição atendida fora do Flask (modo assíncrono, asgi.py).
+current_endpoint = ContextVar("current_endpoint", default=None)
+
+
+class Compact:
+    """Argumento de uma mensagem de log, convertido em texto somente quando o registro
+    é formatado (na thread de fundo dos logs) e limitado a 'limit' caracteres. Os
+    dicionários e listas (ex: os erros graphql) são percorridos somente até o limite."""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value, limit):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        if isinstance(self.value, (dict, list, tuple, set)):
+            text = _repr.repr(self.value)
+        else:
+            text = str(self.value)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}... (+{len(text) - self.limit} caracteres)"
+
+
+_repr = reprlib.Repr()
+_repr.maxlevel = 4
+_repr.maxdict = _repr.maxlist = _repr.maxtuple = _repr.maxset = 10
+_repr.maxstring = _repr.maxother = 200
+
+
+class RequestLogger(logging.LoggerAdapter):
+    """Logger das rotas do fórum e do searcher.
+
+    As mensagens recebem os valores como argumentos (logger.warning("Erro: %s", erros))
+    e só são formatadas se o nível estiver ativo, já limitando o tamanho de cada valor.
+    Os registros abaixo de ERROR são amostrados por endpoint e nível: no máximo 'limit'
+    registros a cada 'window' segundos, e os demais são descartados antes de qualquer
+    formatação. A quantidade descartada é informada no próximo registro aceito, assim
+    uma sequência de erros do serviço integrado não se transforma em uma sequência de
+    escritas de log.
+    """
+
+    def __init__(self, logger, limit=20, window=10.0, max_length=500):
+        super().__init__(logger, {})
+        self.limit = limit
+        self.window = window
+        self.max_length = max_length
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, logger):
+        return cls(
+            logger,
+            limit=int(env.get("LOG_SAMPLE_LIMIT", 20)),
+            window=float(env.get("LOG_SAMPLE_WINDOW", 10)),
+            max_length=int(env.get("LOG_MAX_ARG_LENGTH", 500)),
+        )
+
+    @staticmethod
+    def endpoint():
+        if has_request_context():
+            return request.endpoint
+        return current_endpoint.get()
+
+    def _sample(self, level):
+        """Retorna None para descartar o registro, ou a quantidade de registros
+        descartados desde o último aceito."""
+        if not self.limit or level >= logging.ERROR:
+            return 0
+        key = (self.endpoint(), level)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window:
+                dropped = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                return dropped
+            if window[1] >= self.limit:
+                window[2] += 1
+                return None
+            window[1] += 1
+            return 0
+
+    def log(self, level, msg, *args, **kwargs):
+        if not self.isEnabledFor(level):
+            return
+        dropped = self._sample(level)
+        if dropped is None:
+            return
+        args = tuple(
+            arg if isinstance(arg, (int, float)) else Compact(arg, self.max_length)
+            for arg in args
+        )
+        if dropped:
+            msg = f"{msg} ({dropped} registros semelhantes descartados)"
+        kwargs.setdefault("stacklevel", 2)
+        self.logger.log(level, msg, *args, **kwargs)
+
+    # stacklevel=3: o registro indica a função e a linha da rota, e não do RequestLogger.
+    def debug(self, msg, *args, **kwargs):
+        self.log(logging.DEBUG, msg, *args, stacklevel=3, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self.log(logging.INFO, msg, *args, stacklevel=3, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self.log(logging.WARNING, msg, *args, stacklevel=3, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self.log(logging.ERROR, msg, *args, stacklevel=3, **kwargs)
+
+
+logger = RequestLogger.from_env(app_logger)
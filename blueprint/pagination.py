@@ -0,0 +1,102 @@
+import base64
+import bisect
+import json
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+
+from json_provider import dumps
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+page_size = int(env.get("FORUM_PAGE_SIZE", 50))
+max_page_size = int(env.get("FORUM_MAX_PAGE_SIZE", 100))
+
+
+def _sort_key(item):
+    """Ordem estável das listagens: mais recentes primeiro e, com a mesma data de
+    atualização, pelo ID do comentário ou do artigo."""
+    return (
+        item.get("updatedAt") or "",
+        str(item.get("commentId") or item.get("articleId") or ""),
+    )
+
+
+def sort_listing(data, raw=None):
+    """Ordena, na própria resposta, os itens de uma listagem do Forum API (ex:
+    {"data": {"articles": [...]}}) na ordem da paginação. Chamado antes de armazenar a
+    resposta no forum_cache, assim cada página é somente um recorte, sem nova
+    ordenação.
+
+    Retorna os bytes do campo 'data' ('raw') na ordem final: os mesmos se a listagem
+    já estava ordenada ou se a resposta não é uma listagem, senão codificados
+    novamente.
+    """
+    result = data.get("data")
+    if not isinstance(result, dict) or len(result) != 1:
+        return raw
+    ((field, items),) = result.items()
+    if not isinstance(items, list):
+        return raw
+    keys = [_sort_key(item) for item in items]
+    if all(keys[index] >= keys[index + 1] for index in range(len(keys) - 1)):
+        return raw
+    items.sort(key=_sort_key, reverse=True)
+    return dumps(result) if raw is not None else None
+
+
+def encode_cursor(item):
+    key = json.dumps(_sort_key(item), separators=(",", ":"))
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Converte o cursor 'after' na chave de ordenação do último item da página
+    anterior. Um cursor inválido gera ValueError."""
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+    if not (
+        isinstance(key, list)
+        and len(key) == 2
+        and all(isinstance(value, str) for value in key)
+    ):
+        raise ValueError("Cursor inválido")
+    return tuple(key)
+
+
+def paginate(data, limit=None, cursor=None):
+    """Retorna uma página da listagem contida em 'data' (o campo 'data' da resposta do
+    Forum API, ex: {"articles": [...]}) e o bloco 'pageInfo'.
+
+    A listagem completa continua no forum_cache, já ordenada por sort_listing, e cada
+    página é somente um recorte dela. O tamanho da página é limitado por
+    FORUM_MAX_PAGE_SIZE.
+    """
+    limit = min(limit or page_size, max_page_size)
+    ((field, items),) = data.items()
+    items = items or []
+
+    start = 0
+    if cursor is not None:
+        # Primeiro item depois do cursor, por busca binária na listagem ordenada.
+        start = bisect.bisect_left(
+            items, True, key=lambda item: _sort_key(item) < cursor
+        )
+
+    page = items[start : start + limit]
+    has_next_page = start + limit < len(items)
+    return {
+        field: page,
+        "pageInfo": {
+            "endCursor": encode_cursor(page[-1]) if page else None,
+            "hasNextPage": has_next_page,
+            "limit": limit,
+            "totalCount": len(items),
+        },
+    }
@@ -1,18 +1,14 @@
-from os import environ as env
-from dotenv import find_dotenv, load_dotenv
-import requests
-
 from flask_openapi3 import APIBlueprint
 from flask_openapi3 import Tag
+from requests.exceptions import InvalidJSONError
 
 from schemas import QuerySchema, SearcherResponse
-from logger import logger
-
-ENV_FILE = find_dotenv()
-if ENV_FILE:
-    load_dotenv(ENV_FILE)
+from blueprint.log import logger
+from tracing import tracer
+from json_provider import loads, dumps, data_bytes, raw_json_response
+from upstream import searcher_client, searcher_flight, UpstreamUnavailable
+from cache import search_cache, search_refresher, normalize_term
 
-searcher_api_url = env.get("SEARCH_API_URL")
 tag = Tag(name="Full Text Searcher API", description="Some Searcher")
 
 searcher_bp = APIBlueprint(
@@ -25,14 +21,75 @@ def get_searcher(query: QuerySchema):
     """Rota para realizar uma busca de texto completo no serviço Full Text Searcher API.
     É utilizado o paramêtro de query '?term=' com o termo a ser buscado no serviço.
     ex: term='direito moradia' para buscar pelos termos 'direito' e/ou 'moradia'.
+
+    Os resultados ficam no search_cache, indexados pelo termo normalizado. Assim
+    'Direito  Moradia' e 'moradia direito' utilizam o mesmo resultado, e buscas
+    simultâneas pelo mesmo termo aguardam uma única requisição ao Searcher API.
+    O resultado é enviado ao cliente com os bytes originais do Searcher API.
+    Um resultado expirado recentemente é enviado imediatamente e atualizado em segundo
+    plano. Com o Searcher API indisponível é enviado o resultado expirado do cache, se
+    existir.
     """
-    formatted_url = searcher_api_url + f"/searcher?query={query.term}"
-    response = requests.get(url=formatted_url)
-    if response.status_code == 200:
-        searcher_data = response.json()
-        return searcher_data["data"]
+    cached, stale = search_cache.lookup_revalidate(query.term)
+    if cached is not None:
+        if stale:
+            schedule_search_refresh(query.term)
+        return raw_json_response(cached)
+
+    try:
+        status_code, searcher_data = search_term(query.term)
+    except UpstreamUnavailable as error:
+        stale = search_cache.get_stale(query.term)
+        if stale is None:
+            raise
+        logger.warning(
+            "Searcher API indisponível (%s), usando o cache expirado.", error.reason
+        )
+        return raw_json_response(stale)
+    if status_code == 200:
+        return raw_json_response(searcher_data)
 
     logger.warning(
-        f"Erro na busca pelo termo {query.term}. Response status code: {response.status_code}."
+        "Erro na busca pelo termo %s. Response status code: %s.",
+        query.term,
+        status_code,
     )
-    return {"status_code": response.status_code, "error": "error"}
+    return {"status_code": status_code, "error": "error"}
+
+
+def search_term(term):
+    """Busca o termo no Searcher API e armazena o resultado no search_cache. Buscas
+    simultâneas pelo mesmo termo normalizado aguardam uma única requisição.
+    Retorna (status_code, resultado).
+    """
+    return searcher_flight.do(normalize_term(term), lambda: _search(term))
+
+
+def schedule_search_refresh(term):
+    """Agenda a atualização em segundo plano de um resultado desatualizado do cache."""
+    search_refresher.submit(normalize_term(term), lambda: search_term(term))
+
+
+def decode_search_response(response):
+    """Decodifica a resposta do Searcher API no span 'searcher.validate' e retorna os
+    bytes do resultado (campo 'data')."""
+    with tracer.span("searcher.validate", bytes=len(response.content)):
+        try:
+            searcher_data = loads(response.content)
+            return data_bytes(response.content, searcher_data) or dumps(
+                searcher_data["data"]
+            )
+        except (ValueError, KeyError, TypeError) as error:
+            # Ex: uma página de erro do proxy ou um JSON sem o campo 'data'. Tratado
+            # como falha de comunicação (502).
+            raise InvalidJSONError(f"Resposta inválida do Searcher API: {error}")
+
+
+def _search(term):
+    response = searcher_client.get("/searcher", params={"query": term})
+    if response.status_code != 200:
+        return response.status_code, None
+
+    raw = decode_search_response(response)
+    search_cache.set(term, raw, len(raw))
+    return response.status_code, raw
@@ -0,0 +1,87 @@
+from flask_openapi3 import APIBlueprint
+from flask_openapi3 import Tag
+
+from schemas import (
+    PoolStatsResponse,
+    CacheStatsResponse,
+    SingleFlightStatsResponse,
+    UpstreamsStatusResponse,
+    ReadyResponse,
+    TimingsResponse,
+)
+from upstream import forum_client, searcher_client, forum_flight, searcher_flight
+from cache import forum_cache, search_cache, forum_refresher, search_refresher
+from compression import compression
+from timing import timings
+from warmup import warmup
+
+tag = Tag(
+    name="Status",
+    description="Rotas para acompanhar o estado interno do APP e das integrações.",
+)
+
+status_bp = APIBlueprint(
+    "status", __name__, url_prefix="/status", abp_tags=[tag], doc_ui=True
+)
+
+
+@status_bp.get("/pools", responses={"200": PoolStatsResponse})
+def get_pool_stats():
+    """Apresenta as estatísticas dos pools de conexões keep-alive com o Forum API e
+    o Searcher API. Utilizado para dimensionar o tamanho dos pools.
+    """
+    return {
+        "forum": forum_client.pool_stats(),
+        "searcher": searcher_client.pool_stats(),
+    }
+
+
+@status_bp.get("/caches", responses={"200": CacheStatsResponse})
+def get_cache_stats():
+    """Apresenta as estatísticas dos caches de leitura e das respostas comprimidas:
+    entradas, bytes ocupados, acertos, falhas, descartes, invalidações e as
+    atualizações em segundo plano das entradas desatualizadas.
+    """
+    return {
+        "forum": {**forum_cache.stats(), "refresh": forum_refresher.stats()},
+        "searcher": {**search_cache.stats(), "refresh": search_refresher.stats()},
+        "compression": compression.stats(),
+    }
+
+
+@status_bp.get("/singleflight", responses={"200": SingleFlightStatsResponse})
+def get_singleflight_stats():
+    """Apresenta quantas requisições aos serviços integrados foram realizadas e quantas
+    chamadas simultâneas idênticas foram agrupadas nessas requisições.
+    """
+    return {"forum": forum_flight.stats(), "searcher": searcher_flight.stats()}
+
+
+@status_bp.get("/upstreams", responses={"200": UpstreamsStatusResponse})
+def get_upstreams_status():
+    """Apresenta o estado do circuit breaker e do bulkhead de cada serviço integrado:
+    se o circuito está aberto, quantas chamadas foram rejeitadas e quantas requisições
+    simultâneas estão em andamento.
+    """
+    return {"forum": forum_client.health(), "searcher": searcher_client.health()}
+
+
+@status_bp.get("/ready", responses={"200": ReadyResponse, "503": ReadyResponse})
+def get_ready():
+    """Indica se o APP está pronto para receber requisições: responde 200 após o
+    pré-carregamento dos caches, e 503 enquanto ele está em andamento. Utilizado como
+    readiness check do container.
+    """
+    ready = warmup.ready
+    return {"ready": ready, "warmup": warmup.stats()}, 200 if ready else 503
+
+
+@status_bp.get("/timings", responses={"200": TimingsResponse})
+def get_timings():
+    """Apresenta os histogramas do tempo de resposta de cada rota do APP (total,
+    serviços integrados, decodificação e codificação do JSON), os bytes recebidos e
+    enviados e os resultados do cache, e os histogramas de cada operação dos serviços
+    integrados (ex: 'forum:articleById'). Mostra as medições do worker que atendeu a
+    requisição.
+    """
+    return timings.stats()
@@ -0,0 +1,6 @@
+from cache.ttl_cache import TTLCache
+from cache.sqlite_cache import SqliteCache
+from cache.backends import create_backend
+from cache.forum_cache import ForumCache, forum_cache
+from cache.search_cache import SearchCache, search_cache, normalize_term
+from cache.refresher import Refresher, forum_refresher, search_refresher
@@ -0,0 +1,34 @@
+import os
+import tempfile
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+
+from cache.ttl_cache import TTLCache
+from cache.sqlite_cache import SqliteCache
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+BACKENDS = ("memory", "sqlite")
+
+
+def create_backend(name, prefix, **settings):
+    """Cria o backend de um cache conforme a variável {prefix}_CACHE_BACKEND, ou
+    CACHE_BACKEND para todos os caches.
+
+    memory: cache na memória de cada processo (TTLCache).
+    sqlite: arquivo '{name}.db' no diretório CACHE_SQLITE_DIR, compartilhado por todos
+    os workers do servidor (SqliteCache).
+
+    ex: create_backend("forum", "FORUM", ttl=30, max_entries=1000)
+    """
+    backend = env.get(f"{prefix}_CACHE_BACKEND") or env.get("CACHE_BACKEND", "memory")
+    if backend == "memory":
+        return TTLCache(**settings)
+    if backend == "sqlite":
+        directory = env.get("CACHE_SQLITE_DIR") or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        return SqliteCache(os.path.join(directory, f"{name}.db"), **settings)
+    raise ValueError(f"Backend de cache inválido: {backend}. Opções: {BACKENDS}")
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import threading
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+
+from cache.backends import create_backend
+from json_provider import loads, dumps, data_bytes
+from queries import operation_name
+from metrics import metrics
+from timing import record_cache
+from tracing import tracer
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+# Tags das listagens completas e por período. Qualquer artigo ou comentário novo
+# pode fazer parte delas.
+ARTICLES_TAG = "articles"
+ARTICLES_PERIOD_TAG = "articles:period"
+COMMENTS_TAG = "comments"
+COMMENTS_PERIOD_TAG = "comments:period"
+
+COLLECTION_TAGS = {
+    "articles": ARTICLES_TAG,
+    "articlesByPeriod": ARTICLES_PERIOD_TAG,
+    "comments": COMMENTS_TAG,
+    "commentsByPeriod": COMMENTS_PERIOD_TAG,
+}
+
+
+def article_tag(article_id):
+    return f"article:{article_id}"
+
+
+def comment_tag(comment_id):
+    return f"comment:{comment_id}"
+
+
+def user_articles_tag(user_id):
+    return f"articles:user:{user_id}"
+
+
+def user_comments_tag(user_id):
+    return f"comments:user:{user_id}"
+
+
+def _entity_tags(value, tags):
+    """Percorre a resposta do Forum API adicionando uma tag para cada artigo e
+    comentário presente, inclusive nos comentários e respostas aninhados."""
+    if isinstance(value, dict):
+        if value.get("articleId"):
+            tags.add(article_tag(value["articleId"]))
+        if value.get("commentId"):
+            tags.add(comment_tag(value["commentId"]))
+        for item in value.values():
+            if isinstance(item, (dict, list)):
+                _entity_tags(item, tags)
+    elif isinstance(value, list):
+        for item in value:
+            _entity_tags(item, tags)
+
+
+def read_tags(operation, variables, data):
+    """Calcula as tags de uma resposta de leitura do Forum API."""
+    tags = set()
+    variables = variables or {}
+    if operation in COLLECTION_TAGS:
+        tags.add(COLLECTION_TAGS[operation])
+    if variables.get("articleID"):
+        tags.add(article_tag(variables["articleID"]))
+    if variables.get("commentID"):
+        tags.add(comment_tag(variables["commentID"]))
+    if operation == "articlesByUserId":
+        tags.add(user_articles_tag(variables.get("userID")))
+    if operation == "commentByUserId":
+        tags.add(user_comments_tag(variables.get("userID")))
+    _entity_tags(data, tags)
+    return tags
+
+
+class ForumCache:
+    """Cache das leituras feitas no Forum API, indexado pelo nome da operação graphql,
+    pelo documento da query e pelas variáveis.
+
+    As entradas são invalidadas pelas mutations através de tags: cada artigo e
+    comentário presente em uma resposta gera uma tag, assim alterar um artigo remove
+    somente as entradas que o contêm.
+
+    Com um backend compartilhado (ex: SqliteCache) as respostas são armazenadas
+    codificadas em JSON, e uma mutation em um worker invalida as entradas de todos.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            create_backend(
+                "forum",
+                "FORUM",
+                ttl=float(env.get("FORUM_CACHE_TTL", 30)),
+                max_entries=int(env.get("FORUM_CACHE_MAX_ENTRIES", 1000)),
+                max_bytes=int(env.get("FORUM_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+                stale_ttl=float(env.get("FORUM_CACHE_STALE_TTL", 300)),
+                revalidate_ttl=float(env.get("FORUM_CACHE_REVALIDATE_TTL", 60)),
+            )
+        )
+
+    @property
+    def generation(self):
+        """Incrementada pelo backend a cada invalidação. Uma leitura iniciada antes de
+        uma invalidação não é armazenada, pois pode conter dados desatualizados."""
+        return self.cache.generation
+
+    def _load(self, value):
+        # Nos backends compartilhados a resposta é armazenada codificada, e os bytes
+        # do campo 'data' são um recorte dela.
+        if value is None or not self.cache.shared:
+            return value
+        data = loads(value)
+        return data, data_bytes(value, data)
+
+    @staticmethod
+    def key(query, variables):
+        digest = hashlib.sha1(query.encode()).hexdigest()[:16]
+        frozen = json.dumps(variables or {}, sort_keys=True, separators=(",", ":"))
+        return f"{operation_name(query)}:{digest}:{frozen}"
+
+    def _record(self, span, outcome):
+        span.set_attribute("cache.outcome", outcome)
+        record_cache(outcome)
+        metrics.cache_outcome("forum", outcome)
+
+    def lookup(self, query, variables=None):
+        """Retorna a resposta armazenada e os bytes do seu campo 'data' (ou None), na
+        forma (data, raw)."""
+        with tracer.span("cache.lookup", cache="forum") as span:
+            entry = self._load(self.cache.get(self.key(query, variables)))
+            self._record(span, "hit" if entry is not None else "miss")
+        return entry
+
+    def lookup_revalidate(self, query, variables=None):
+        """Como lookup, mas retorna também as respostas expiradas há menos de
+        FORUM_CACHE_REVALIDATE_TTL segundos, na forma (entrada, desatualizada). Uma
+        resposta desatualizada deve ser atualizada em segundo plano."""
+        with tracer.span("cache.lookup", cache="forum") as span:
+            entry, stale = self.cache.lookup(self.key(query, variables))
+            self._record(span, "miss" if entry is None else "stale" if stale else "hit")
+            return self._load(entry), stale
+
+    def lookup_stale(self, query, variables=None):
+        """Como lookup, mas retorna também uma resposta expirada, utilizada quando o
+        Forum API está indisponível."""
+        with tracer.span("cache.lookup_stale", cache="forum") as span:
+            entry = self._load(self.cache.get_stale(self.key(query, variables)))
+            if entry is not None:
+                self._record(span, "stale-if-error")
+        return entry
+
+    def get(self, query, variables=None):
+        entry = self.lookup(query, variables)
+        return entry[0] if entry is not None else None
+
+    def set(self, query, variables, data, size, generation, raw=None):
+        """Armazena a resposta decodificada e, opcionalmente, os bytes do campo 'data'
+        da resposta original, que são enviados ao cliente sem nova codificação."""
+        tags = read_tags(operation_name(query), variables, data)
+        if self.cache.shared:
+            value = b'{"data":' + raw + b"}" if raw is not None else dumps(data)
+            size = len(value)
+        else:
+            value = (data, raw)
+            size += len(raw) if raw is not None else 0
+        self.cache.set(
+            self.key(query, variables), value, size, tags=tags, generation=generation
+        )
+
+    def invalidate(self, *tags):
+        with self._lock:
+            self.invalidations += 1
+        return self.cache.invalidate_tags(tags)
+
+    def article_added(self, user_id):
+        """Um novo artigo entra nas listagens completas, por período e do usuário."""
+        return self.invalidate(
+            ARTICLES_TAG, ARTICLES_PERIOD_TAG, user_articles_tag(user_id)
+        )
+
+    def article_changed(self, article_id):
+        """Artigo atualizado ou removido. Remove o artigo e todas as listagens que o
+        contêm, incluindo as listagens de comentários desse artigo."""
+        return self.invalidate(article_tag(article_id))
+
+    def comment_added(self, article_id, user_id, comment_reply=None):
+        """Um novo comentário altera o artigo comentado (e as listagens que o contêm),
+        as listagens de comentários e o comentário respondido."""
+        tags = [
+            article_tag(article_id),
+            COMMENTS_TAG,
+            COMMENTS_PERIOD_TAG,
+            user_comments_tag(user_id),
+        ]
+        if comment_reply:
+            tags.append(comment_tag(comment_reply))
+        return self.invalidate(*tags)
+
+    def comment_changed(self, comment_id):
+        """Comentário atualizado ou removido. Remove todas as entradas que o contêm."""
+        return self.invalidate(comment_tag(comment_id))
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+
+forum_cache = ForumCache.from_env()
@@ -0,0 +1,110 @@
+import os
+import queue
+import threading
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+
+from logger import logger
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+class Refresher:
+    """Atualiza em segundo plano as entradas desatualizadas de um cache
+    (stale-while-revalidate).
+
+    A requisição recebe a entrada desatualizada imediatamente e a leitura no serviço
+    integrado é colocada em uma fila limitada a 'max_queue' leituras, executada por
+    'workers' threads. Uma chave já na fila não é adicionada novamente, e com a fila
+    cheia a atualização é descartada: a entrada será atualizada por uma próxima
+    requisição.
+    """
+
+    def __init__(self, name, workers=2, max_queue=100):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.scheduled = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue)
+        self._pending = set()
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name, prefix):
+        return cls(
+            name,
+            workers=int(env.get(f"{prefix}_REFRESH_WORKERS", 2)),
+            max_queue=int(env.get(f"{prefix}_REFRESH_QUEUE_SIZE", 100)),
+        )
+
+    def submit(self, key, refresh):
+        """Agenda a função 'refresh' para atualizar a entrada 'key'. Retorna False se
+        a chave já está na fila ou se a fila está cheia."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            if key in self._pending:
+                return False
+            try:
+                self._queue.put_nowait((key, refresh))
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self._pending.add(key)
+            self.scheduled += 1
+            self._start()
+        return True
+
+    def _reset(self):
+        # As threads são iniciadas na primeira atualização, e novamente em um
+        # processo criado por fork (workers do gunicorn), que não herda as threads.
+        self._pid = os.getpid()
+        self._queue = queue.Queue(self.max_queue)
+        self._pending = set()
+        self._threads = []
+
+    def _start(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"{self.name}-refresher", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            key, refresh = self._queue.get()
+            try:
+                refresh()
+                with self._lock:
+                    self.refreshed += 1
+            except Exception as error:
+                with self._lock:
+                    self.failed += 1
+                logger.warning("Falha ao atualizar o cache %s: %s", self.name, error)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": len(self._pending),
+                "scheduled": self.scheduled,
+                "refreshed": self.refreshed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            }
+
+
+forum_refresher = Refresher.from_env("forum", "FORUM")
+search_refresher = Refresher.from_env("searcher", "SEARCH")
@@ -0,0 +1,153 @@
+import atexit
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+
+from cache.backends import create_backend
+from json_provider import dumps
+from logger import logger
+from metrics import metrics
+from timing import record_cache
+from tracing import tracer
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+TOKEN = re.compile(r"\w+")
+
+
+def normalize_term(term):
+    """Normaliza os termos de uma busca para a chave do cache.
+
+    O Searcher API trata os termos como 'e/ou', então a busca independe de maiúsculas,
+    acentos, espaços e da ordem dos termos.
+    ex: 'Direito  Moradia', 'direito moradia' e 'moradia direito' -> 'direito moradia'
+    """
+    decomposed = unicodedata.normalize("NFKD", term)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    tokens = set(TOKEN.findall(stripped.casefold()))
+    return " ".join(sorted(tokens))
+
+
+class SearchCache:
+    """Cache dos resultados do Searcher API indexado pelo termo normalizado.
+
+    Os resultados são armazenados já codificados em JSON (bytes), e enviados ao cliente
+    sem nova codificação.
+
+    Opcionalmente o cache é persistido em um arquivo, carregado na inicialização, para
+    que um worker reiniciado já inicie com o cache preenchido.
+    """
+
+    def __init__(self, cache, persist_path=None, persist_every=50):
+        self.cache = cache
+        self.persist_path = persist_path
+        self.persist_every = persist_every
+        self._pending = 0
+        self._saving = threading.Lock()
+        if persist_path:
+            self.load()
+            atexit.register(self.save)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            create_backend(
+                "search",
+                "SEARCH",
+                ttl=float(env.get("SEARCH_CACHE_TTL", 24 * 60 * 60)),
+                max_entries=int(env.get("SEARCH_CACHE_MAX_ENTRIES", 5000)),
+                max_bytes=int(env.get("SEARCH_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+                stale_ttl=float(env.get("SEARCH_CACHE_STALE_TTL", 24 * 60 * 60)),
+                revalidate_ttl=float(env.get("SEARCH_CACHE_REVALIDATE_TTL", 60 * 60)),
+            ),
+            persist_path=env.get("SEARCH_CACHE_FILE") or None,
+            persist_every=int(env.get("SEARCH_CACHE_PERSIST_EVERY", 50)),
+        )
+
+    def _record(self, span, outcome):
+        span.set_attribute("cache.outcome", outcome)
+        record_cache(outcome)
+        metrics.cache_outcome("searcher", outcome)
+
+    def get(self, term):
+        return self.cache.get(normalize_term(term))
+
+    def lookup_revalidate(self, term):
+        """Retorna (resultado, desatualizado), incluindo os resultados expirados há
+        menos de SEARCH_CACHE_REVALIDATE_TTL segundos, que devem ser atualizados em
+        segundo plano."""
+        with tracer.span("cache.lookup", cache="searcher") as span:
+            entry, stale = self.cache.lookup(normalize_term(term))
+            self._record(span, "miss" if entry is None else "stale" if stale else "hit")
+        return entry, stale
+
+    def get_stale(self, term):
+        """Retorna também um resultado expirado, utilizado quando o Searcher API está
+        indisponível."""
+        with tracer.span("cache.lookup_stale", cache="searcher") as span:
+            entry = self.cache.get_stale(normalize_term(term))
+            if entry is not None:
+                self._record(span, "stale-if-error")
+        return entry
+
+    def set(self, term, data, size):
+        self.cache.set(normalize_term(term), data, size)
+        if not self.persist_path:
+            return
+        self._pending += 1
+        if self._pending >= self.persist_every and not self._saving.locked():
+            self._pending = 0
+            threading.Thread(target=self.save, daemon=True).start()
+
+    def load(self):
+        """Carrega as entradas ainda válidas do arquivo de persistência."""
+        try:
+            with open(self.persist_path, encoding="utf-8") as file:
+                entries = json.load(file)["entries"]
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning("Arquivo do cache de busca ignorado: %s", error)
+            return
+
+        now = time.time()
+        for key, value, size, expires_at in entries:
+            if expires_at > now:
+                # Arquivos gravados por versões anteriores contêm o resultado decodificado.
+                raw = value.encode() if isinstance(value, str) else dumps(value)
+                self.cache.set(key, raw, size, ttl=expires_at - now)
+        logger.info("Cache de busca carregado com %d entradas.", len(entries))
+
+    def save(self):
+        """Grava as entradas válidas no arquivo de persistência de forma atômica."""
+        if not self.persist_path:
+            return
+        with self._saving:
+            now = time.time()
+            entries = [
+                [key, value.decode(), size, now + ttl]
+                for key, value, size, ttl, _ in self.cache.snapshot()
+            ]
+            temp_path = f"{self.persist_path}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    json.dump({"entries": entries}, file, ensure_ascii=False)
+                os.replace(temp_path, self.persist_path)
+            except OSError as error:
+                logger.warning("Falha ao gravar o cache de busca: %s", error)
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats["persist_path"] = self.persist_path
+        return stats
+
+
+search_cache = SearchCache.from_env()
@@ -0,0 +1,244 @@
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL REFERENCES entries (key) ON DELETE CASCADE,
+    PRIMARY KEY (tag, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_key ON tags (key);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('generation', 0);
+"""
+
+
+class SqliteCache:
+    """Cache com expiração por tempo (TTL) armazenado em um arquivo SQLite local,
+    compartilhado por todos os workers do APP no mesmo servidor.
+
+    Possui a mesma interface do TTLCache (tags, geração, janelas 'stale_ttl' e
+    'revalidate_ttl'), mas os valores devem ser bytes. O arquivo utiliza o modo WAL,
+    então as leituras dos workers não bloqueiam umas às outras, e a invalidação por
+    tags e o incremento da geração são feitos em uma única transação. Ao atingir
+    'max_entries' ou 'max_bytes' são descartadas as entradas que expiram primeiro.
+    Os contadores de acertos e falhas são de cada processo.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        path,
+        ttl=30.0,
+        max_entries=1000,
+        max_bytes=64 * 1024 * 1024,
+        stale_ttl=0.0,
+        revalidate_ttl=0.0,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self.revalidate_ttl = revalidate_ttl
+        self.retention = max(stale_ttl, revalidate_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        # Uma conexão por thread, criada novamente em um processo criado por fork.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _row(self, key):
+        return (
+            self._connection()
+            .execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,))
+            .fetchone()
+        )
+
+    def get(self, key):
+        row = self._row(key)
+        if row is None or row[1] <= time.time():
+            if row is not None and row[1] + self.retention <= time.time():
+                self.delete(key)
+            self._count("misses")
+            return None
+        self._count("hits")
+        return row[0]
+
+    def lookup(self, key):
+        """Retorna (valor, desatualizado), como o TTLCache.lookup."""
+        row = self._row(key)
+        if row is None:
+            self._count("misses")
+            return None, False
+        age = time.time() - row[1]
+        if age < 0:
+            self._count("hits")
+            return row[0], False
+        if age < self.revalidate_ttl:
+            self._count("stale_hits")
+            return row[0], True
+        if age >= self.retention:
+            self.delete(key)
+        self._count("misses")
+        return None, False
+
+    def get_stale(self, key):
+        row = self._row(key)
+        if row is None or time.time() - row[1] >= self.stale_ttl:
+            return None
+        self._count("stale_hits")
+        return row[0]
+
+    def set(self, key, value, size, ttl=None, tags=(), generation=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if generation is not None and generation != self._generation(connection):
+                connection.execute("ROLLBACK")
+                return
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            connection.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time() + ttl),
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO tags VALUES (?, ?)", [(tag, key) for tag in tags]
+            )
+            self._evict(connection)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _evict(self, connection):
+        connection.execute(
+            "DELETE FROM entries WHERE expires_at < ?", (time.time() - self.retention,)
+        )
+        entries, total = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM entries ORDER BY expires_at"
+        ):
+            if entries <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            entries -= 1
+            total -= size
+        connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        with self._lock:
+            self.evictions += len(evicted)
+
+    @staticmethod
+    def _generation(connection):
+        return connection.execute(
+            "SELECT value FROM meta WHERE name = 'generation'"
+        ).fetchone()[0]
+
+    @property
+    def generation(self):
+        return self._generation(self._connection())
+
+    def delete(self, key):
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def invalidate_tags(self, tags):
+        """Remove todas as entradas que possuem alguma das tags e incrementa a geração,
+        em uma única transação. Retorna a quantidade de entradas removidas."""
+        tags = list(tags)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            keys = []
+            if tags:
+                placeholders = ",".join("?" * len(tags))
+                keys = connection.execute(
+                    f"SELECT DISTINCT key FROM tags WHERE tag IN ({placeholders})", tags
+                ).fetchall()
+                connection.executemany("DELETE FROM entries WHERE key = ?", keys)
+            connection.execute(
+                "UPDATE meta SET value = value + 1 WHERE name = 'generation'"
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return len(keys)
+
+    def snapshot(self):
+        """Retorna as entradas válidas como (chave, valor, tamanho, ttl restante, tags),
+        das que expiram primeiro às que expiram por último."""
+        now = time.time()
+        rows = self._connection().execute(
+            "SELECT key, value, size, expires_at FROM entries WHERE expires_at > ? "
+            "ORDER BY expires_at",
+            (now,),
+        )
+        return [
+            (key, value, size, expires_at - now, frozenset())
+            for key, value, size, expires_at in rows
+        ]
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entries")
+
+    def stats(self):
+        entries, total = (
+            self._connection()
+            .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+            .fetchone()
+        )
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "sqlite",
+                "entries": entries,
+                "bytes": total,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "revalidate_ttl": self.revalidate_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale_hits": self.stale_hits,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
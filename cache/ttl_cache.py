@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    """Valor armazenado no cache com seu tamanho estimado, expiração e tags."""
+
+    __slots__ = ("value", "size", "expires_at", "tags")
+
+    def __init__(self, value, size, expires_at, tags):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class TTLCache:
+    """Cache em memória com expiração por tempo (TTL) e descarte LRU.
+
+    O cache é limitado tanto pela quantidade de entradas quanto pelo total de bytes
+    estimado das entradas. Cada entrada pode ter tags, permitindo invalidar de uma vez
+    todas as entradas relacionadas a uma tag.
+
+    Com 'stale_ttl' as entradas expiradas são mantidas por mais 'stale_ttl' segundos,
+    e podem ser lidas com get_stale quando o serviço integrado está indisponível. Com
+    'revalidate_ttl' as entradas expiradas há menos de 'revalidate_ttl' segundos são
+    retornadas por lookup como desatualizadas, para serem atualizadas em segundo plano.
+
+    É o backend em memória do processo. Veja cache/backends.py para o backend
+    compartilhado entre os workers.
+    """
+
+    # Os valores são armazenados como objetos Python, sem serialização.
+    shared = False
+
+    def __init__(
+        self,
+        ttl=30.0,
+        max_entries=1000,
+        max_bytes=64 * 1024 * 1024,
+        stale_ttl=0.0,
+        revalidate_ttl=0.0,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.revalidate_ttl = revalidate_ttl
+        # Tempo que uma entrada expirada é mantida.
+        self.retention = max(stale_ttl, revalidate_ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+        # Incrementado a cada invalidação por tags.
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            now = time.monotonic()
+            if entry.expires_at <= now:
+                if entry.expires_at + self.retention <= now:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def lookup(self, key):
+        """Retorna (valor, desatualizado). Uma entrada expirada há menos de
+        'revalidate_ttl' segundos é retornada com desatualizado=True; as demais
+        entradas expiradas são tratadas como ausentes e retornam (None, False)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            age = time.monotonic() - entry.expires_at
+            if age < 0:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value, False
+            if age < self.revalidate_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return entry.value, True
+            if age >= self.retention:
+                self._remove(key)
+            self.misses += 1
+            return None, False
+
+    def get_stale(self, key):
+        """Retorna a entrada mesmo expirada, se ainda estiver na janela 'stale_ttl'."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expired_for = time.monotonic() - entry.expires_at
+            if expired_for >= self.retention:
+                self._remove(key)
+                return None
+            if expired_for >= self.stale_ttl:
+                return None
+            self.stale_hits += 1
+            return entry.value
+
+    def set(self, key, value, size, ttl=None, tags=(), generation=None):
+        """Armazena o valor. Com 'generation', o valor só é armazenado se nenhuma
+        invalidação ocorreu desde que essa geração foi lida."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            entry = CacheEntry(value, size, time.monotonic() + ttl, frozenset(tags))
+            self._entries[key] = entry
+            self.bytes += size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_tags(self, tags):
+        """Remove todas as entradas que possuem alguma das tags e incrementa a geração.
+        Retorna a quantidade de entradas removidas."""
+        with self._lock:
+            self.generation += 1
+            keys = set()
+            for tag in tags:
+                keys.update(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def snapshot(self):
+        """Retorna as entradas válidas como (chave, valor, tamanho, ttl restante, tags),
+        da menos para a mais recentemente utilizada."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, entry.value, entry.size, entry.expires_at - now, entry.tags)
+                for key, entry in self._entries.items()
+                if entry.expires_at > now
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "revalidate_ttl": self.revalidate_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale_hits": self.stale_hits,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
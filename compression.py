@@ -0,0 +1,143 @@
+"""Compressão e validação (ETag) das respostas do APP.
+
+As respostas JSON recebem um ETag forte calculado pelo conteúdo. Uma requisição com o
+cabeçalho If-None-Match igual ao ETag atual recebe 304 sem corpo. As respostas maiores
+que COMPRESSION_MIN_SIZE são comprimidas com brotli ou gzip, conforme o cabeçalho
+Accept-Encoding, e os corpos comprimidos ficam em cache pelo ETag, então a mesma
+resposta não é comprimida a cada requisição.
+
+O ETag é calculado depois que a rota montou o corpo, então um 304 economiza a
+transferência e a compressão, mas não a leitura nem a montagem da resposta. As
+respostas enviadas com os bytes originais dos serviços integrados não são codificadas
+novamente, e o custo do 304 é somente o hash do corpo. As páginas das listagens são
+codificadas a partir do cache antes do hash.
+"""
+
+import gzip
+import hashlib
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+from flask import request
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+
+from cache.ttl_cache import TTLCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/html"}
+
+
+def etag_for(body):
+    """ETag forte calculado pelo conteúdo da resposta."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class Compression:
+    """Aplica o ETag, as respostas 304 e a compressão nas respostas do app Flask,
+    como um after_request. Também é utilizado pelo modo assíncrono (asgi.py) através
+    do método process.
+    """
+
+    def __init__(
+        self,
+        app=None,
+        min_size=1024,
+        gzip_level=6,
+        brotli_quality=4,
+        cache_max_bytes=32 * 1024 * 1024,
+    ):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+        self.cache = TTLCache(ttl=60 * 60, max_entries=10000, max_bytes=cache_max_bytes)
+        if app is not None:
+            self.init_app(app)
+
+    @classmethod
+    def from_env(cls, app=None):
+        return cls(
+            app,
+            min_size=int(env.get("COMPRESSION_MIN_SIZE", 1024)),
+            gzip_level=int(env.get("COMPRESSION_GZIP_LEVEL", 6)),
+            brotli_quality=int(env.get("COMPRESSION_BROTLI_QUALITY", 4)),
+            cache_max_bytes=int(
+                env.get("COMPRESSION_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+            ),
+        )
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+
+    def negotiate(self, accept_encoding):
+        """Escolhe a codificação aceita pelo cliente, preferindo brotli."""
+        accepted = parse_accept_header(accept_encoding or "")
+        for encoding in self.encodings:
+            if accepted[encoding]:
+                return encoding
+        return None
+
+    def compress(self, body, etag, encoding):
+        key = f"{etag}:{encoding}"
+        compressed = self.cache.get(key)
+        if compressed is None:
+            if encoding == "br":
+                compressed = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                compressed = gzip.compress(body, compresslevel=self.gzip_level)
+            self.cache.set(key, compressed, len(compressed))
+        return compressed
+
+    def process(self, body, mimetype, accept_encoding=None, if_none_match=None):
+        """Retorna (status, corpo, cabeçalhos) de uma resposta 200, já comprimida ou
+        convertida em 304 quando o cliente possui a versão atual."""
+        etag = etag_for(body)
+        encoding = None
+        if mimetype in COMPRESSIBLE_MIMETYPES and len(body) >= self.min_size:
+            encoding = self.negotiate(accept_encoding)
+
+        tag = f"{etag}-{encoding}" if encoding else etag
+        headers = {"ETag": quote_etag(tag), "Vary": "Accept-Encoding"}
+        if if_none_match and parse_etags(if_none_match).contains_weak(tag):
+            return 304, b"", headers
+
+        if encoding:
+            body = self.compress(body, etag, encoding)
+            headers["Content-Encoding"] = encoding
+        return 200, body, headers
+
+    def after_request(self, response):
+        if (
+            request.method not in ("GET", "HEAD")
+            or response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        status, body, headers = self.process(
+            response.get_data(),
+            response.mimetype,
+            request.headers.get("Accept-Encoding"),
+            request.headers.get("If-None-Match"),
+        )
+        response.status_code = status
+        response.set_data(body)
+        response.vary.add(headers.pop("Vary"))
+        response.headers.update(headers)
+        return response
+
+    def stats(self):
+        return self.cache.stats()
+
+
+compression = Compression.from_env()
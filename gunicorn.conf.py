@@ -0,0 +1,84 @@
+"""Configuração do gunicorn, o servidor de produção do APP.
+
+gunicorn -c gunicorn.conf.py
+
+Cada worker é um processo com um pool de threads (gthread), ou um event loop do
+uvicorn com a variável ASYNC_MODE. Para recarregar o código sem derrubar as conexões
+em andamento: `kill -HUP <pid do master>`.
+"""
+
+import glob
+import multiprocessing
+import os
+import tempfile
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+
+from logger import LOGGING_CONFIG, start_log_queues
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+bind = f"0.0.0.0:{env.get('API_PORT', 5000)}"
+
+if bool(env.get("ASYNC_MODE", None)):
+    wsgi_app = "asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "app:app"
+    worker_class = "gthread"
+
+workers = int(env.get("GUNICORN_WORKERS") or multiprocessing.cpu_count() * 2 + 1)
+threads = int(env.get("GUNICORN_THREADS", 8))
+# Tempo em segundos que uma conexão keep-alive aguarda a próxima requisição.
+keepalive = int(env.get("GUNICORN_KEEPALIVE", 5))
+timeout = int(env.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(env.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+# Reinicia o worker após atender 'max_requests' requisições, limitando o crescimento
+# de memória. O jitter evita que todos os workers reiniciem ao mesmo tempo.
+max_requests = int(env.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(env.get("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+logconfig_dict = LOGGING_CONFIG
+loglevel = "debug" if env.get("DEBUG") else "info"
+accesslog = env.get("GUNICORN_ACCESS_LOG", "-") or None
+
+# Diretório em que cada worker grava as suas métricas (metrics.py), agregadas pela
+# rota /metrics. Definido antes de os workers importarem o prometheus_client.
+if not env.get("PROMETHEUS_MULTIPROC_DIR"):
+    env["PROMETHEUS_MULTIPROC_DIR"] = os.path.join(
+        tempfile.gettempdir(), "mvp2_metrics"
+    )
+
+
+def on_starting(server):
+    """Remove as métricas de uma execução anterior do servidor."""
+    directory = env["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    """Remove os gauges de um worker encerrado (ex: após max_requests), mantendo os
+    seus contadores e histogramas no total."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    """O gunicorn aplica o LOGGING_CONFIG no processo principal com handlers
+    síncronos. Em cada worker os handlers passam a ser executados em segundo plano."""
+    start_log_queues()
+
+
+def post_worker_init(worker):
+    """Inicia o pré-carregamento dos caches (warmup.py) no worker, após carregar o
+    APP. Cada worker possui os seus próprios caches em memória e a sua rota
+    /status/ready."""
+    from warmup import warmup
+
+    warmup.start()
@@ -2,6 +2,7 @@ from os import environ as env
 from dotenv import find_dotenv, load_dotenv
 
 from app import app
+from warmup import warmup
 
 
 ENV_FILE = find_dotenv()
@@ -10,6 +11,21 @@ if ENV_FILE:
 
 
 if __name__ == "__main__":
-    app.run(
-        host="0.0.0.0", port=env.get("API_PORT", 5000), debug=env.get("DEBUG", False)
-    )
+    if bool(env.get("ASYNC_MODE", None)):
+        import uvicorn
+
+        uvicorn.run(
+            "asgi:application",
+            host="0.0.0.0",
+            port=int(env.get("API_PORT", 5000)),
+            log_level="debug" if env.get("DEBUG") else "info",
+        )
+    else:
+        # Com o reloader do modo DEBUG, somente no processo que atende as requisições.
+        if not env.get("DEBUG") or env.get("WERKZEUG_RUN_MAIN"):
+            warmup.start()
+        app.run(
+            host="0.0.0.0",
+            port=env.get("API_PORT", 5000),
+            debug=env.get("DEBUG", False),
+        )
@@ -0,0 +1,89 @@
+import json
+import time
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+from timing import record
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """Decodifica um JSON (str ou bytes) com o orjson, quando disponível. O tempo é
+    registrado na medição da requisição atual."""
+    start = time.perf_counter()
+    try:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    finally:
+        record("decode", time.perf_counter() - start)
+
+
+def dumps(obj):
+    """Codifica um objeto em JSON compacto, retornando bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def data_bytes(body, payload):
+    """Retorna os bytes do campo 'data' de uma resposta dos serviços integrados, já
+    decodificada em 'payload', sem codificá-lo novamente. Quando a resposta possui
+    outros campos além de 'data' retorna None.
+
+    ex: b'{"data": {"articleById": {...}}}' -> b'{"articleById": {...}}'
+    """
+    if not isinstance(payload, dict) or payload.keys() != {"data"}:
+        return None
+    start = body.index(b":") + 1
+    end = body.rindex(b"}")
+    return body[start:end].strip()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Provider JSON do APP que utiliza o orjson, quando disponível, para codificar e
+    decodificar as respostas. Sem o orjson, ou para objetos que ele não suporta, utiliza
+    o provider padrão do Flask.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {"separators"}:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self._dumps_bytes(obj) + b"\n", mimetype=self.mimetype
+        )
+
+    def _dumps_bytes(self, obj):
+        # As datas seguem o formato do provider padrão do Flask (http_date).
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        start = time.perf_counter()
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            return super().dumps(obj).encode()
+        finally:
+            record("encode", time.perf_counter() - start)
+
+
+def raw_json_response(body, status=200):
+    """Resposta com o JSON já codificado, enviado ao cliente sem ser decodificado e
+    codificado novamente."""
+    return current_app.response_class(body, status, mimetype="application/json")
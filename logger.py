@@ -1,6 +1,15 @@
 from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
+import json
 import logging
 import os
+import queue
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
 
 
 log_path = "log/"
@@ -10,64 +19,227 @@ if not os.path.exists(log_path):
     os.makedirs(log_path)
 
 
-dictConfig(
-    {
-        "version": 1,
-        "disable_existing_loggers": True,
-        "formatters": {
-            "default": {
-                "format": "[%(asctime)s] %(levelname)-4s %(funcName)s() L%(lineno)-4d %(message)s",
-            },
-            "detailed": {
-                "format": "[%(asctime)s] %(levelname)-4s %(funcName)s() L%(lineno)-4d %(message)s - call_trace=%(pathname)s L%(lineno)-4d",
-            },
+class JsonFormatter(logging.Formatter):
+    """Formata cada registro como uma linha JSON, para coletores de logs estruturados."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Aguarda espaço na fila limitada para o sinal de parada.
+        self.queue.put(self._sentinel)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Envia os registros para uma fila limitada, escrita pelos handlers de destino
+    (console e arquivos) em uma thread de fundo (QueueListener). Assim a escrita e a
+    rotação dos arquivos não acontecem na thread da requisição.
+
+    Com a fila cheia o registro é descartado ('drop'), ou a thread aguarda até
+    'timeout' segundos por espaço na fila antes de descartá-lo ('block'). A quantidade
+    de registros descartados é registrada assim que a fila volta a ter espaço.
+    """
+
+    dropped_message = "Fila de logs cheia: %d registros descartados"
+
+    def __init__(self, handlers, maxsize=10000, policy="drop", timeout=0.1):
+        super().__init__(queue.Queue(maxsize))
+        self.policy = policy
+        self.timeout = timeout
+        self.dropped = 0
+        self.listener = _Listener(self.queue, *handlers, respect_handler_level=True)
+
+    def prepare(self, record):
+        # A fila é da memória do processo, então a mensagem é formatada somente na
+        # thread de fundo, pelos handlers de destino.
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            warning = logging.makeLogRecord(
+                {
+                    "name": record.name,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": self.dropped_message,
+                    "args": (dropped,),
+                }
+            )
+            try:
+                self.queue.put_nowait(warning)
+            except queue.Full:
+                self.dropped += dropped
+
+    def start(self):
+        self.listener.start()
+
+    def restart(self):
+        """Recria a fila e a thread de fundo no processo filho após um fork, já que a
+        thread não é copiada e os registros na fila são escritos pelo processo pai."""
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.listener.queue = self.queue
+        self.listener._thread = None
+        self.dropped = 0
+        self.start()
+
+    def close(self):
+        # Escreve os registros ainda na fila antes de fechar os handlers de destino.
+        if self.listener._thread is not None:
+            self.listener.stop()
+        if self in queue_handlers:
+            queue_handlers.remove(self)
+        super().close()
+
+
+def env_flag(name, default):
+    return env.get(name, str(default)).lower() in ("1", "true", "yes")
+
+
+# Tamanho em bytes de cada arquivo de log antes da rotação, e arquivos mantidos.
+LOG_MAX_BYTES = int(env.get("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(env.get("LOG_BACKUP_COUNT", 5))
+LOG_FORMAT = env.get("LOG_FORMAT", "text")
+
+TEXT_FORMATTERS = {
+    "default": {
+        "format": "[%(asctime)s] %(levelname)-4s %(funcName)s() L%(lineno)-4d %(message)s",
+    },
+    "detailed": {
+        "format": "[%(asctime)s] %(levelname)-4s %(funcName)s() L%(lineno)-4d %(message)s - call_trace=%(pathname)s L%(lineno)-4d",
+    },
+    "access": {
+        "format": "%(message)s",
+    },
+}
+JSON_FORMATTERS = {name: {"()": "logger.JsonFormatter"} for name in TEXT_FORMATTERS}
+
+
+# Também utilizado pelo gunicorn (logconfig_dict no gunicorn.conf.py). O gunicorn o
+# aplica após importar este módulo, então os loggers já existentes (ex: o 'logger'
+# abaixo) devem continuar ativos.
+LOGGING_CONFIG = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": JSON_FORMATTERS if LOG_FORMAT == "json" else TEXT_FORMATTERS,
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "default",
+            "stream": "ext://sys.stdout",
+        },
+        # "email": {
+        #     "class": "logging.handlers.SMTPHandler",
+        #     "formatter": "default",
+        #     "level": "ERROR",
+        #     "mailhost": ("smtp.example.com", 587),
+        #     "fromaddr": "devops@example.com",
+        #     "toaddrs": ["receiver@example.com", "receiver2@example.com"],
+        #     "subject": "Error Logs",
+        #     "credentials": ("username", "password"),
+        # },
+        "error_file": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "formatter": "detailed",
+            "filename": "log/gunicorn.error.log",
+            "maxBytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
+            "delay": "True",
         },
-        "handlers": {
-            "console": {
-                "class": "logging.StreamHandler",
-                "formatter": "default",
-                "stream": "ext://sys.stdout",
-            },
-            # "email": {
-            #     "class": "logging.handlers.SMTPHandler",
-            #     "formatter": "default",
-            #     "level": "ERROR",
-            #     "mailhost": ("smtp.example.com", 587),
-            #     "fromaddr": "devops@example.com",
-            #     "toaddrs": ["receiver@example.com", "receiver2@example.com"],
-            #     "subject": "Error Logs",
-            #     "credentials": ("username", "password"),
-            # },
-            "error_file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "formatter": "detailed",
-                "filename": "log/gunicorn.error.log",
-                "maxBytes": 10000,
-                "backupCount": 10,
-                "delay": "True",
-            },
-            "detailed_file": {
-                "class": "logging.handlers.RotatingFileHandler",
-                "formatter": "detailed",
-                "filename": "log/gunicorn.detailed.log",
-                "maxBytes": 10000,
-                "backupCount": 10,
-                "delay": "True",
-            },
+        "access_file": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "formatter": "access",
+            "filename": "log/gunicorn.access.log",
+            "maxBytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
+            "delay": "True",
         },
-        "loggers": {
-            "gunicorn.error": {
-                "handlers": ["console", "error_file"],  # , email],
-                "level": "INFO",
-                "propagate": False,
-            }
+        "detailed_file": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "formatter": "detailed",
+            "filename": "log/gunicorn.detailed.log",
+            "maxBytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
+            "delay": "True",
+        },
+    },
+    "loggers": {
+        "gunicorn.error": {
+            "handlers": ["console", "error_file"],  # , email],
+            "level": "INFO",
+            "propagate": False,
         },
-        "root": {
-            "handlers": ["console", "detailed_file"],
+        "gunicorn.access": {
+            "handlers": ["console", "access_file"],
             "level": "INFO",
+            "propagate": False,
         },
-    }
-)
+    },
+    "root": {
+        "handlers": ["console", "detailed_file"],
+        "level": "INFO",
+    },
+}
+
+QUEUED_LOGGERS = ("", "gunicorn.error", "gunicorn.access")
+queue_handlers = []
+
+
+def start_log_queues():
+    """Substitui os handlers do root e dos loggers do gunicorn por um
+    BoundedQueueHandler, que os executa em uma thread de fundo.
+
+    Chamado após a configuração dos loggers: na importação deste módulo e, no
+    gunicorn, em cada worker (post_fork no gunicorn.conf.py), já que o gunicorn
+    aplica o LOGGING_CONFIG novamente no processo principal.
+    """
+    if not env_flag("LOG_QUEUE_ENABLED", True):
+        return
+    queue_handlers.clear()
+    for name in QUEUED_LOGGERS:
+        log = logging.getLogger(name)
+        targets = [h for h in log.handlers if not isinstance(h, QueueHandler)]
+        if not targets:
+            continue
+        handler = BoundedQueueHandler(
+            targets,
+            maxsize=int(env.get("LOG_QUEUE_SIZE", 10000)),
+            policy=env.get("LOG_QUEUE_POLICY", "drop"),
+            timeout=float(env.get("LOG_QUEUE_TIMEOUT", 0.1)),
+        )
+        log.handlers = [handler]
+        handler.start()
+        queue_handlers.append(handler)
+
+
+def _restart_log_queues():
+    for handler in queue_handlers:
+        handler.restart()
+
+
+dictConfig(LOGGING_CONFIG)
+start_log_queues()
+os.register_at_fork(after_in_child=_restart_log_queues)
 
 
 logger = logging.getLogger(__name__)
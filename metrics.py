@@ -0,0 +1,226 @@
+"""Métricas do APP no formato do Prometheus, apresentadas na rota /metrics.
+
+Contadores de requisições por rota, método e status, histogramas de latência das
+rotas e das operações dos serviços integrados, requisições em andamento, requisições
+aos serviços integrados por operação graphql e resultado (2xx, 4xx, 5xx, exception),
+chamadas rejeitadas pelo circuit breaker e pelo bulkhead, resultados dos caches e o
+uso dos pools de conexões.
+
+Com o gunicorn (gunicorn.conf.py) a variável PROMETHEUS_MULTIPROC_DIR é definida e
+cada worker grava as suas métricas em arquivos nesse diretório. A rota /metrics,
+atendida por qualquer worker, agrega os arquivos de todos eles.
+"""
+
+import time
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from timing import Histogram as TimingHistogram
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+# Os mesmos intervalos dos histogramas da rota /status/timings, em segundos.
+BUCKETS = tuple(bound / 1000 for bound in TimingHistogram.BUCKETS)
+
+REQUESTS = Counter(
+    "gateway_requests_total",
+    "Requisições atendidas pelo APP.",
+    ("endpoint", "method", "status"),
+)
+REQUEST_DURATION = Histogram(
+    "gateway_request_duration_seconds",
+    "Tempo de resposta das rotas do APP.",
+    ("endpoint",),
+    buckets=BUCKETS,
+)
+RESPONSE_BYTES = Counter(
+    "gateway_response_bytes_total",
+    "Bytes enviados nas respostas das rotas do APP.",
+    ("endpoint",),
+)
+IN_FLIGHT = Gauge(
+    "gateway_requests_in_flight",
+    "Requisições em andamento no APP.",
+    multiprocess_mode="livesum",
+)
+UPSTREAM_REQUESTS = Counter(
+    "gateway_upstream_requests_total",
+    "Requisições aos serviços integrados por operação e resultado.",
+    ("upstream", "operation", "outcome"),
+)
+UPSTREAM_GRAPHQL_ERRORS = Counter(
+    "gateway_upstream_graphql_errors_total",
+    "Respostas do Forum API com erros graphql (no campo 'errors' ou no resultado da "
+    "operação), por operação.",
+    ("upstream", "operation"),
+)
+UPSTREAM_DURATION = Histogram(
+    "gateway_upstream_request_duration_seconds",
+    "Tempo de resposta das operações dos serviços integrados.",
+    ("upstream", "operation"),
+    buckets=BUCKETS,
+)
+UPSTREAM_REJECTED = Counter(
+    "gateway_upstream_rejected_total",
+    "Chamadas aos serviços integrados rejeitadas pelo circuit breaker ou bulkhead.",
+    ("upstream", "reason"),
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "gateway_upstream_requests_in_flight",
+    "Requisições em andamento aos serviços integrados (conexões do pool em uso).",
+    ("upstream",),
+    multiprocess_mode="livesum",
+)
+UPSTREAM_POOL_SIZE = Gauge(
+    "gateway_upstream_pool_maxsize",
+    "Tamanho máximo dos pools de conexões com os serviços integrados.",
+    ("upstream",),
+    multiprocess_mode="livesum",
+)
+UPSTREAM_CONNECTIONS = Counter(
+    "gateway_upstream_connections_opened_total",
+    "Conexões abertas com os serviços integrados.",
+    ("host",),
+)
+CACHE_REQUESTS = Counter(
+    "gateway_cache_requests_total",
+    "Consultas aos caches de leitura por resultado (hit, miss, stale, stale-if-error).",
+    ("cache", "outcome"),
+)
+
+
+class Metrics:
+    """Registra as métricas das requisições do app Flask e apresenta a rota /metrics.
+    Também é utilizado pelo modo assíncrono (asgi.py), pelos clientes dos serviços
+    integrados e pelos caches.
+
+    As métricas com labels são guardadas em um dicionário após a primeira utilização,
+    evitando o lock do prometheus_client na busca dos labels a cada requisição.
+    """
+
+    def __init__(self, app=None, enabled=True):
+        self.enabled = enabled
+        self._children = {}
+        if app is not None:
+            self.init_app(app)
+
+    @classmethod
+    def from_env(cls, app=None):
+        return cls(
+            app,
+            enabled=env.get("METRICS_ENABLED", "True").lower() in ("1", "true", "yes"),
+        )
+
+    def init_app(self, app):
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule("/metrics", "metrics", self.export)
+
+    def child(self, metric, *labels):
+        key = (metric, labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = metric.labels(*labels)
+        return child
+
+    def begin(self):
+        """Inicia uma requisição. Retorna o instante de início para o finish."""
+        if not self.enabled:
+            return None
+        IN_FLIGHT.inc()
+        return time.perf_counter()
+
+    def finish(self, start, endpoint, method, status, bytes_out=None):
+        if start is None:
+            return
+        self.child(REQUESTS, endpoint, method, str(status)).inc()
+        self.child(REQUEST_DURATION, endpoint).observe(time.perf_counter() - start)
+        if bytes_out:
+            self.child(RESPONSE_BYTES, endpoint).inc(bytes_out)
+
+    def end(self, start):
+        if start is not None:
+            IN_FLIGHT.dec()
+
+    def observe_upstream(self, name, operation, seconds, status=None):
+        """Registra uma requisição a um serviço integrado. Sem 'status' a requisição
+        falhou com uma exceção (conexão, timeout)."""
+        if not self.enabled:
+            return
+        outcome = f"{status // 100}xx" if status else "exception"
+        self.child(UPSTREAM_REQUESTS, name, operation, outcome).inc()
+        self.child(UPSTREAM_DURATION, name, operation).observe(seconds)
+
+    def graphql_error(self, name, operation):
+        """Registra uma resposta com erros graphql, que o serviço retorna com status
+        200 e por isso é contada como 2xx em gateway_upstream_requests_total."""
+        if self.enabled:
+            self.child(UPSTREAM_GRAPHQL_ERRORS, name, operation or "unknown").inc()
+
+    def upstream_rejected(self, name, reason):
+        if self.enabled:
+            self.child(UPSTREAM_REJECTED, name, reason).inc()
+
+    def upstream_in_flight(self, name, delta):
+        if self.enabled:
+            self.child(UPSTREAM_IN_FLIGHT, name).inc(delta)
+
+    def upstream_pool_size(self, name, size):
+        """Soma o tamanho do pool de um cliente (síncrono ou assíncrono) do serviço."""
+        if self.enabled:
+            self.child(UPSTREAM_POOL_SIZE, name).inc(size)
+
+    def connection_opened(self, host):
+        if self.enabled:
+            self.child(UPSTREAM_CONNECTIONS, host).inc()
+
+    def cache_outcome(self, cache, outcome):
+        if self.enabled:
+            self.child(CACHE_REQUESTS, cache, outcome).inc()
+
+    def _before_request(self):
+        g.metrics_start = self.begin()
+
+    def _after_request(self, response):
+        bytes_out = None if response.is_streamed else response.content_length
+        self.finish(
+            g.get("metrics_start"),
+            request.endpoint or "not_found",
+            request.method,
+            response.status_code,
+            bytes_out,
+        )
+        return response
+
+    def _teardown_request(self, error=None):
+        self.end(g.pop("metrics_start", None))
+
+    def export(self):
+        """Métricas no formato de texto do Prometheus, agregando os arquivos de todos
+        os workers quando PROMETHEUS_MULTIPROC_DIR está definida."""
+        if env.get("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return generate_latest(registry), 200, {"Content-Type": CONTENT_TYPE_LATEST}
+
+
+metrics = Metrics.from_env()
@@ -17,3 +17,27 @@ from queries.comment_queries import (
     remove_comment_mutation,
     update_comment_mutation,
 )
+
+from queries.operations import operation_name
+from queries.batch import (
+    build_batch_document,
+    has_document_errors,
+    split_batch_response,
+)
+from queries.selection import project_query, available_fields, SUMMARY_FIELDS
+
+
+# Queries de leitura indexadas pelo nome do campo raiz da operação.
+read_queries = {
+    operation_name(query): query
+    for query in (
+        articles_query,
+        article_by_id_query,
+        articles_by_user_id_query,
+        articles_by_period_query,
+        comments_query,
+        comment_by_id_query,
+        comments_by_user_id_query,
+        comments_by_period_query,
+    )
+}
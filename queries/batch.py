@@ -0,0 +1,64 @@
+import re
+
+
+OPERATION = re.compile(
+    r"^\s*(?P<type>query|mutation)\s*(?:\((?P<definitions>[^)]*)\))?\s*\{(?P<body>.*)\}\s*$",
+    re.S,
+)
+VARIABLE = re.compile(r"\$(\w+)")
+ROOT_FIELD = re.compile(r"^\s*(\w+)")
+
+
+def build_batch_document(items, operation_type="query"):
+    """Combina várias operações graphql em um único documento com aliases.
+
+    Recebe uma lista de (alias, documento, variáveis). As variáveis de cada operação
+    são renomeadas com o prefixo do alias (ex: $articleID -> $r0_articleID) e o campo
+    raiz recebe o alias, assim a resposta tem uma chave por item.
+    Retorna o documento combinado e as variáveis combinadas.
+    """
+    definitions, bodies, variables = [], [], {}
+    for alias, document, item_variables in items:
+        match = OPERATION.match(document)
+        if match is None or match.group("type") != operation_type:
+            raise ValueError(f"Operação graphql inválida para o alias '{alias}'")
+
+        def rename(variable):
+            return f"${alias}_{variable.group(1)}"
+
+        if match.group("definitions"):
+            definitions.append(VARIABLE.sub(rename, match.group("definitions")))
+        body = VARIABLE.sub(rename, match.group("body"))
+        bodies.append(ROOT_FIELD.sub(rf"{alias}: \1", body, count=1))
+        for name, value in (item_variables or {}).items():
+            variables[f"{alias}_{name}"] = value
+
+    header = operation_type
+    if definitions:
+        header += " (" + ", ".join(d.strip().rstrip(",") for d in definitions) + ")"
+    return header + " {" + "".join(bodies) + "}", variables
+
+
+def has_document_errors(response):
+    """Indica se a resposta contém erros sem 'path', que não pertencem a um único
+    alias (ex: uma variável inválida, que rejeita o documento inteiro)."""
+    return any(not error.get("path") for error in response.get("errors") or [])
+
+
+def split_batch_response(aliases, response):
+    """Separa a resposta de um documento combinado em uma resposta por alias.
+
+    Os erros com 'path' são atribuídos ao alias correspondente e os erros sem 'path'
+    a todos os itens.
+    """
+    data = response.get("data") or {}
+    errors = response.get("errors") or []
+    results = {}
+    for alias in aliases:
+        alias_errors = [
+            error
+            for error in errors
+            if not error.get("path") or error["path"][0] == alias
+        ]
+        results[alias] = {"data": data.get(alias), "errors": alias_errors or None}
+    return results
@@ -0,0 +1,13 @@
+import re
+from functools import lru_cache
+
+ROOT_FIELD = re.compile(r"\{\s*(\w+)")
+
+
+@lru_cache(maxsize=256)
+def operation_name(query):
+    """Retorna o nome do campo raiz de uma query ou mutation graphql.
+    ex: 'articleById' para a article_by_id_query e 'addArticle' para a add_article_mutation.
+    """
+    match = ROOT_FIELD.search(query)
+    return match.group(1) if match else None
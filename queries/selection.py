@@ -0,0 +1,125 @@
+import re
+from functools import lru_cache
+
+
+TOKEN = re.compile(r"[{}]|\w+")
+
+# Campos sempre mantidos em uma projeção, pois identificam os artigos e comentários
+# da resposta (e são utilizados na invalidação do cache).
+ID_FIELDS = ("articleId", "commentId")
+
+# Campos da visão resumida das listagens.
+SUMMARY_FIELDS = (
+    "articleId",
+    "commentId",
+    "title",
+    "userNickname",
+    "updatedAt",
+    "isReply",
+    "commentReply",
+)
+
+
+def _root_selection_span(query):
+    """Retorna o início e o fim do conjunto de seleção do campo raiz da query."""
+    body = query.index("{")
+    start = query.index("{", body + 1)
+    depth = 0
+    for position in range(start, len(query)):
+        if query[position] == "{":
+            depth += 1
+        elif query[position] == "}":
+            depth -= 1
+            if depth == 0:
+                return start, position + 1
+    raise ValueError("Query graphql com chaves desbalanceadas")
+
+
+def _parse(tokens, position):
+    """Converte os tokens de um conjunto de seleção em uma lista (nome, filhos)."""
+    fields = []
+    while position < len(tokens):
+        token = tokens[position]
+        if token == "}":
+            return fields, position + 1
+        if token == "{":
+            children, position = _parse(tokens, position + 1)
+            name, _ = fields[-1]
+            fields[-1] = (name, children)
+            continue
+        fields.append((token, None))
+        position += 1
+    return fields, position
+
+
+@lru_cache(maxsize=64)
+def parse_selection(query):
+    """Retorna a árvore de campos selecionados pelo campo raiz da query."""
+    start, end = _root_selection_span(query)
+    tokens = TOKEN.findall(query[start + 1 : end - 1])
+    fields, _ = _parse(tokens, 0)
+    return tuple(fields)
+
+
+def _paths(fields, prefix):
+    paths = []
+    for name, children in fields:
+        path = f"{prefix}{name}"
+        paths.append(path)
+        if children:
+            paths.extend(_paths(children, f"{path}."))
+    return paths
+
+
+def available_fields(query):
+    """Lista os caminhos de todos os campos da query. ex: 'comments.replies.content'."""
+    return _paths(parse_selection(query), "")
+
+
+def _project(fields, requested, prefix):
+    selected = []
+    for name, children in fields:
+        path = f"{prefix}{name}"
+        if path in requested:
+            selected.append((name, children))
+        elif children and any(field.startswith(f"{path}.") for field in requested):
+            projected = _project(children, requested, f"{path}.")
+            if projected:
+                selected.append((name, projected))
+        elif name in ID_FIELDS:
+            selected.append((name, None))
+    return selected
+
+
+def _render(fields):
+    parts = []
+    for name, children in fields:
+        parts.append(name)
+        if children:
+            parts.append("{ " + _render(children) + " }")
+    return " ".join(parts)
+
+
+@lru_cache(maxsize=256)
+def _project_query(query, requested, strict):
+    fields = parse_selection(query)
+    if strict:
+        unknown = set(requested) - set(available_fields(query))
+        if unknown:
+            raise ValueError(f"Campos inexistentes: {', '.join(sorted(unknown))}")
+
+    selected = _project(fields, set(requested), "")
+    start, end = _root_selection_span(query)
+    return query[:start] + "{ " + _render(selected) + " }" + query[end:]
+
+
+def project_query(query, fields, strict=True):
+    """Gera uma nova query com somente os campos pedidos no conjunto de seleção do
+    campo raiz. Os campos aninhados são indicados pelo caminho com pontos, e um campo
+    com filhos pedido sem caminho mantém todos os seus filhos.
+    ex: ('title', 'comments.content') mantém title, comments { content } e os IDs.
+
+    Com strict=True um campo inexistente na query gera ValueError, senão é ignorado.
+    """
+    requested = tuple(sorted({field.strip() for field in fields if field.strip()}))
+    return _project_query(query, requested, strict)
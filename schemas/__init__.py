@@ -28,6 +28,9 @@ from schemas.comment_schemas import (
 from schemas.common_schemas import (
     ByUserPathSchema,
     ByPeriodQueryParamSchema,
+    ProjectionQueryParamSchema,
+    ListingQueryParamSchema,
+    PageInfoSchema,
     ErrorSchema,
 )
 
@@ -35,3 +38,18 @@ from schemas.searcher_schemas import (
     QuerySchema,
     SearcherResponse,
 )
+
+from schemas.batch_schemas import (
+    BatchBodySchema,
+    BatchResponse,
+    ImportResultSchema,
+)
+
+from schemas.status_schemas import (
+    PoolStatsResponse,
+    CacheStatsResponse,
+    SingleFlightStatsResponse,
+    UpstreamsStatusResponse,
+    ReadyResponse,
+    TimingsResponse,
+)
@@ -1,9 +1,9 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Union
 import uuid
 import datetime
 
-from schemas.common_schemas import MessageSchema
+from schemas.common_schemas import MessageSchema, PageInfoSchema
 
 
 class ArticlePathSchema(BaseModel):
@@ -50,18 +50,51 @@ class ArticleBasicSchema(BaseModel):
     title: str
 
 
-class ArticleSchema(ArticleBasicSchema):
+class ArticleSummarySchema(ArticleBasicSchema):
+    """Representação resumida de um artigo, retornada nas listagens com view=summary."""
+
+    updatedAt: datetime.datetime
+
+
+class ArticleSchema(ArticleSummarySchema):
     """Representação de um artigo com a lista dos comentários que são relacionados."""
 
     content: str
-    updatedAt: datetime.datetime
     comments: List[ArticleCommentsSchema]
 
 
+class ArticleCommentReplyProjectionSchema(BaseModel):
+    """Representação de uma resposta a um comentário nas listagens com 'fields'."""
+
+    commentId: uuid.UUID
+    userNickname: Optional[str] = None
+    content: Optional[str] = None
+    updatedAt: Optional[datetime.datetime] = None
+
+
+class ArticleCommentProjectionSchema(ArticleCommentReplyProjectionSchema):
+    """Representação de um comentário de um artigo nas listagens com 'fields'."""
+
+    replies: Optional[List[ArticleCommentReplyProjectionSchema]] = None
+
+
+class ArticleProjectionSchema(BaseModel):
+    """Representação de um artigo nas listagens com 'fields': somente os campos pedidos,
+    além do ID e da data de atualização, que são sempre retornados."""
+
+    articleId: uuid.UUID
+    updatedAt: datetime.datetime
+    userNickname: Optional[str] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+    comments: Optional[List[ArticleCommentProjectionSchema]] = None
+
+
 class GetArticlesResponse(BaseModel):
     """Representação da resposta a requisição que busca lista de artigos."""
 
-    articles: List[ArticleSchema]
+    articles: List[Union[ArticleSchema, ArticleSummarySchema, ArticleProjectionSchema]]
+    pageInfo: Optional[PageInfoSchema] = None
 
 
 class GetArticleByIdResponse(BaseModel):
@@ -73,13 +106,19 @@ class GetArticleByIdResponse(BaseModel):
 class GetArticleByUserResponse(BaseModel):
     """Representação da resposta a requisição que busca lista de artigos de usuário específico."""
 
-    articleByUserId: List[ArticleSchema]
+    articleByUserId: List[
+        Union[ArticleSchema, ArticleSummarySchema, ArticleProjectionSchema]
+    ]
+    pageInfo: Optional[PageInfoSchema] = None
 
 
 class GetArticleByPeriodResponse(BaseModel):
     """Representação da resposta a requisição que busca lista de artigos de um período específico."""
 
-    articleByPeriod: List[ArticleSchema]
+    articleByPeriod: List[
+        Union[ArticleSchema, ArticleSummarySchema, ArticleProjectionSchema]
+    ]
+    pageInfo: Optional[PageInfoSchema] = None
 
 
 class AddArticleResponse(BaseModel):
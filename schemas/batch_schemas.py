@@ -0,0 +1,60 @@
+import uuid
+from pydantic import BaseModel
+from typing import Any, Dict, List, Literal, Optional
+
+from schemas.common_schemas import ErrorsInfo
+
+
+class BatchReadSchema(BaseModel):
+    """Representação de uma leitura do fórum dentro de uma requisição em lote.
+    Os atributos necessários dependem da operação: article_id para articleById,
+    comment_id para commentById, user_id para as operações por usuário e
+    initialDate/endDate (dd-mm-aaaa) para as operações por período.
+    """
+
+    operation: Literal[
+        "articles",
+        "articleById",
+        "articlesByUserId",
+        "articlesByPeriod",
+        "comments",
+        "commentById",
+        "commentByUserId",
+        "commentsByPeriod",
+    ]
+    article_id: Optional[uuid.UUID] = None
+    comment_id: Optional[uuid.UUID] = None
+    user_id: Optional[str] = None
+    initialDate: Optional[str] = None
+    endDate: Optional[str] = None
+
+
+class BatchBodySchema(BaseModel):
+    """Representação do corpo de requisição para leituras do fórum em lote."""
+
+    reads: List[BatchReadSchema]
+
+
+class BatchResultSchema(BaseModel):
+    """Representação do resultado de uma das leituras do lote."""
+
+    data: Optional[Dict[str, Any]] = None
+    errors: Optional[List[ErrorsInfo]] = None
+
+
+class BatchResponse(BaseModel):
+    """Representação da resposta a requisição de leituras em lote, com um resultado
+    para cada leitura na mesma ordem da requisição."""
+
+    results: List[BatchResultSchema]
+
+
+class ImportResultSchema(BaseModel):
+    """Representação de uma linha da resposta NDJSON da importação em massa, com o
+    resultado do registro da linha 'line' do corpo da requisição."""
+
+    line: int
+    type: Optional[str] = None
+    status: Literal["created", "failed", "unknown"]
+    data: Optional[Dict[str, Any]] = None
+    errors: Optional[List[Any]] = None
@@ -1,9 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, field_validator
+from typing import Optional, List, Union
 import uuid
 import datetime
 
-from schemas.common_schemas import MessageSchema
+from schemas.common_schemas import MessageSchema, PageInfoSchema
 
 
 class CommentPathSchema(BaseModel):
@@ -15,10 +15,16 @@ class CommentPathSchema(BaseModel):
 class AddCommentBodySchema(BaseModel):
     """Representação do corpo de requisição para adicionar comentário."""
 
-    article_id: str
+    article_id: uuid.UUID
     content: str
     is_reply: Optional[bool] = None
-    comment_reply: Optional[str] = None
+    comment_reply: Optional[uuid.UUID] = None
+
+    @field_validator("comment_reply", mode="before")
+    @classmethod
+    def empty_reply(cls, value):
+        # Um comment_reply vazio indica um comentário que não é resposta.
+        return value or None
 
 
 class UpdateCommentBodySchema(BaseModel):
@@ -55,10 +61,44 @@ class CommentRepliesSchema(CommentWithDateSchema):
     replies: Optional[List[ReplySchema]] = None
 
 
+class CommentSummarySchema(BaseModel):
+    """Representação resumida de um comentário, retornada nas listagens com view=summary."""
+
+    commentId: uuid.UUID
+    articleId: uuid.UUID
+    isReply: bool
+    commentReply: Optional[uuid.UUID] = None
+    userNickname: str
+    updatedAt: datetime.datetime
+
+
+class CommentReplyProjectionSchema(BaseModel):
+    """Representação de uma resposta a um comentário nas listagens com 'fields'."""
+
+    commentId: uuid.UUID
+    isReply: Optional[bool] = None
+    commentReply: Optional[uuid.UUID] = None
+    content: Optional[str] = None
+    userNickname: Optional[str] = None
+    updatedAt: Optional[datetime.datetime] = None
+
+
+class CommentProjectionSchema(CommentReplyProjectionSchema):
+    """Representação de um comentário nas listagens com 'fields': somente os campos
+    pedidos, além dos IDs e da data de atualização, que são sempre retornados."""
+
+    articleId: uuid.UUID
+    updatedAt: datetime.datetime
+    replies: Optional[List[CommentReplyProjectionSchema]] = None
+
+
 class GetCommentsResponse(BaseModel):
     """Representação da resposta a requisição que busca lista de comentários."""
 
-    comments: List[CommentRepliesSchema]
+    comments: List[
+        Union[CommentRepliesSchema, CommentSummarySchema, CommentProjectionSchema]
+    ]
+    pageInfo: Optional[PageInfoSchema] = None
 
 
 class GetCommentByIdResponse(BaseModel):
@@ -70,13 +110,19 @@ class GetCommentByIdResponse(BaseModel):
 class GetCommentByUserIdResponse(BaseModel):
     """Representação da resposta a requisição que busca lista de comentários de usuário específico."""
 
-    commentByUserId: List[CommentWithDateSchema]
+    commentByUserId: List[
+        Union[CommentWithDateSchema, CommentSummarySchema, CommentProjectionSchema]
+    ]
+    pageInfo: Optional[PageInfoSchema] = None
 
 
 class GetCommentByPeriodResponse(BaseModel):
     """Representação da resposta a requisição que busca lista de comentários de um período específico."""
 
-    commentByPeriod: List[CommentRepliesSchema]
+    commentByPeriod: List[
+        Union[CommentRepliesSchema, CommentSummarySchema, CommentProjectionSchema]
+    ]
+    pageInfo: Optional[PageInfoSchema] = None
 
 
 class AddCommentResponse(BaseModel):
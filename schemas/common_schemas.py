@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional, Dict
 
 
 class ByUserPathSchema(BaseModel):
@@ -8,13 +8,55 @@ class ByUserPathSchema(BaseModel):
     user_id: str
 
 
-class ByPeriodQueryParamSchema(BaseModel):
+class ProjectionQueryParamSchema(BaseModel):
+    """Representação dos paramêtros de query para a seleção dos campos das listagens.
+    'view=summary' retorna somente os campos resumidos (sem conteúdo e comentários) e
+    'fields' indica os campos separados por vírgula, com os campos aninhados indicados
+    por ponto. ex: fields=title,comments.content
+    """
+
+    view: Optional[Literal["summary", "full"]] = None
+    fields: Optional[str] = None
+
+
+class ListingQueryParamSchema(ProjectionQueryParamSchema):
+    """Representação dos paramêtros de query para a paginação das listagens.
+    'limit' é a quantidade de itens da página e 'after' o cursor 'endCursor' retornado
+    no 'pageInfo' da página anterior, dos mais recentes aos mais antigos. Sem 'limit' e
+    'after' a listagem completa é retornada, sem o 'pageInfo'. 'stream'
+    retorna a listagem completa em partes, como um array JSON ou NDJSON (um item por
+    linha). Se a leitura do Forum API falhar no meio do envio, o NDJSON termina com
+    uma linha {"error": ...} e o JSON fica sem o fechamento do array.
+    """
+
+    limit: Optional[int] = Field(None, ge=1)
+    after: Optional[str] = None
+    stream: Optional[Literal["json", "ndjson"]] = None
+
+    @model_validator(mode="after")
+    def check_stream(self):
+        """'stream' envia a listagem completa em partes, sem paginação."""
+        if self.stream and (self.limit or self.after):
+            raise ValueError("'limit' e 'after' não são utilizados com 'stream'")
+        return self
+
+
+class ByPeriodQueryParamSchema(ListingQueryParamSchema):
     """Representação do paramêtro de query para as datas de inicio e fim de período."""
 
     initialDate: str
     endDate: str
 
 
+class PageInfoSchema(BaseModel):
+    """Representação das informações de paginação de uma listagem."""
+
+    endCursor: Optional[str] = None
+    hasNextPage: bool
+    limit: int
+    totalCount: int
+
+
 class MessageSchema(BaseModel):
     """Representação padrão para mensagem em respostas."""
 
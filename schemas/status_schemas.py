@@ -0,0 +1,178 @@
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+
+
+class PoolSchema(BaseModel):
+    """Representação das estatísticas de um pool de conexões para um host."""
+
+    host: str
+    maxsize: int
+    in_use: int
+    idle: int
+    connections_created: int
+    requests: int
+
+
+class UpstreamPoolsSchema(BaseModel):
+    """Representação dos pools de conexões de um serviço integrado."""
+
+    name: str
+    pool_maxsize: int
+    pools: List[PoolSchema]
+
+
+class PoolStatsResponse(BaseModel):
+    """Representação da resposta com as estatísticas dos pools de conexões."""
+
+    forum: UpstreamPoolsSchema
+    searcher: UpstreamPoolsSchema
+
+
+class RefreshSchema(BaseModel):
+    """Representação das estatísticas de atualização em segundo plano de um cache."""
+
+    workers: int
+    max_queue: int
+    queued: int
+    scheduled: int
+    refreshed: int
+    failed: int
+    dropped: int
+
+
+class CacheSchema(BaseModel):
+    """Representação das estatísticas de um cache."""
+
+    backend: Optional[str] = None
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+    stale_ttl: Optional[float] = None
+    stale_hits: Optional[int] = None
+    revalidate_ttl: Optional[float] = None
+    invalidations: Optional[int] = None
+    persist_path: Optional[str] = None
+    refresh: Optional[RefreshSchema] = None
+
+
+class CacheStatsResponse(BaseModel):
+    """Representação da resposta com as estatísticas dos caches."""
+
+    forum: CacheSchema
+    searcher: CacheSchema
+    compression: CacheSchema
+
+
+class SingleFlightSchema(BaseModel):
+    """Representação das estatísticas de agrupamento de chamadas idênticas."""
+
+    calls: int
+    collapsed: int
+    in_flight: int
+    collapsed_ratio: float
+
+
+class SingleFlightStatsResponse(BaseModel):
+    """Representação da resposta com as estatísticas de agrupamento de chamadas."""
+
+    forum: SingleFlightSchema
+    searcher: SingleFlightSchema
+
+
+class BreakerSchema(BaseModel):
+    """Representação do estado do circuit breaker de um serviço integrado."""
+
+    state: Literal["closed", "open", "half_open"]
+    failures: int
+    failure_threshold: int
+    reset_timeout: float
+    opened: int
+    rejected: int
+
+
+class BulkheadSchema(BaseModel):
+    """Representação do limite de requisições simultâneas a um serviço integrado."""
+
+    max_concurrent: int
+    max_wait: float
+    in_use: int
+    rejected: int
+
+
+class UpstreamHealthSchema(BaseModel):
+    """Representação do estado de isolamento de um serviço integrado."""
+
+    name: str
+    breaker: BreakerSchema
+    bulkhead: BulkheadSchema
+
+
+class UpstreamsStatusResponse(BaseModel):
+    """Representação da resposta com o estado dos serviços integrados."""
+
+    forum: UpstreamHealthSchema
+    searcher: UpstreamHealthSchema
+
+
+class WarmUpSchema(BaseModel):
+    """Representação do andamento do pré-carregamento dos caches."""
+
+    state: Literal["disabled", "pending", "running", "done"]
+    ready: bool
+    tasks: int
+    completed: int
+    failed: int
+    duration: Optional[float] = None
+
+
+class ReadyResponse(BaseModel):
+    """Representação da resposta de prontidão do APP."""
+
+    ready: bool
+    warmup: WarmUpSchema
+
+
+class HistogramSchema(BaseModel):
+    """Representação de um histograma de durações em milissegundos. Os percentis são
+    o limite superior do intervalo que os contém."""
+
+    count: int
+    sum_ms: Optional[float] = None
+    mean_ms: Optional[float] = None
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    buckets: Optional[Dict[str, int]] = None
+
+
+class EndpointTimingSchema(BaseModel):
+    """Representação das medições de uma rota do APP."""
+
+    total: HistogramSchema
+    upstream: HistogramSchema
+    decode: HistogramSchema
+    encode: HistogramSchema
+    bytes_in: int
+    bytes_out: int
+    cache: Dict[str, int]
+
+
+class UpstreamTimingSchema(BaseModel):
+    """Representação das medições de uma operação de um serviço integrado."""
+
+    response: HistogramSchema
+    bytes_in: int
+    errors: int
+
+
+class TimingsResponse(BaseModel):
+    """Representação da resposta com as medições por rota e por operação."""
+
+    endpoints: Dict[str, EndpointTimingSchema]
+    upstreams: Dict[str, UpstreamTimingSchema]
@@ -0,0 +1,319 @@
+"""Sessão dos usuários armazenada no servidor.
+
+O cookie de sessão contém somente um id aleatório e opaco, e o token do Auth0
+(id_token, access_token e userinfo) fica no backend de SESSION_BACKEND:
+
+memory: memória do processo (TTLCache, descarte LRU). Somente com um único processo,
+    já que cada worker do gunicorn teria as suas próprias sessões.
+sqlite: arquivo 'sessions.db' no diretório CACHE_SQLITE_DIR, compartilhado pelos
+    workers do servidor.
+postgres: tabela no banco de SESSION_DATABASE_URL, compartilhada por todas as
+    instâncias do APP.
+cookie: sessão do Flask, com o token inteiro no cookie assinado.
+
+Assim cada requisição autenticada envia um cookie de 43 caracteres ao invés do token
+inteiro, e o APP não verifica a assinatura nem decodifica o cookie a cada requisição.
+
+Somente as sessões com usuário autenticado são gravadas no backend. A sessão anterior
+ao login (o 'state' e o 'nonce' do OAuth, criados a cada acesso ao /login) fica no
+cookie assinado do Flask até o /callback, então requisições anônimas não ocupam o
+backend nem descartam as sessões dos usuários.
+"""
+
+import os
+import re
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+from flask.sessions import (
+    SecureCookieSessionInterface,
+    SessionInterface,
+    SessionMixin,
+)
+from werkzeug.datastructures import CallbackDict
+
+from cache.ttl_cache import TTLCache
+from json_provider import dumps, loads
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+BACKENDS = ("memory", "sqlite", "postgres", "cookie")
+
+# secrets.token_urlsafe(32)
+SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{43}$")
+
+
+class PostgresSessionStore:
+    """Sessões em uma tabela do PostgreSQL, com a mesma interface de leitura e escrita
+    do TTLCache. As sessões expiradas são removidas a cada nova sessão gravada."""
+
+    shared = True
+
+    def __init__(self, dsn, ttl=86400.0, table="app_sessions"):
+        if psycopg2 is None:
+            raise RuntimeError("O backend de sessão postgres necessita do psycopg2.")
+        self.dsn = dsn
+        self.ttl = ttl
+        self.table = table
+        self._local = threading.local()
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "id TEXT PRIMARY KEY, value BYTEA NOT NULL, "
+                "expires_at DOUBLE PRECISION NOT NULL)"
+            )
+
+    def _cursor(self):
+        # Uma conexão por thread, criada novamente em um processo criado por fork.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or connection.closed or self._local.pid != os.getpid():
+            connection = psycopg2.connect(self.dsn)
+            connection.autocommit = True
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection.cursor()
+
+    def get(self, key):
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"SELECT value FROM {self.table} WHERE id = %s AND expires_at > %s",
+                (key, time.time()),
+            )
+            row = cursor.fetchone()
+        return bytes(row[0]) if row is not None else None
+
+    def set(self, key, value, size, ttl=None):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table} VALUES (%s, %s, %s) ON CONFLICT (id) "
+                "DO UPDATE SET value = EXCLUDED.value, expires_at = EXCLUDED.expires_at",
+                (key, psycopg2.Binary(value), expires_at),
+            )
+            cursor.execute(f"DELETE FROM {self.table} WHERE expires_at <= %s", (now,))
+
+    def delete(self, key):
+        with self._cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE id = %s", (key,))
+
+
+class SqliteSessionStore:
+    """Sessões em uma tabela de um arquivo SQLite, compartilhado pelos workers do
+    servidor, com a mesma interface de leitura e escrita do TTLCache. Ao contrário do
+    SqliteCache, a gravação não percorre a tabela para o descarte por tamanho: as
+    sessões expiradas são removidas pelo índice de expiração, no máximo uma vez a cada
+    'purge_interval' segundos por processo."""
+
+    shared = True
+
+    def __init__(self, path, ttl=86400.0, purge_interval=60.0):
+        self.path = path
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._purged_at = 0.0
+        self._local = threading.local()
+        self._connection().executescript(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at);"
+        )
+
+    def _connection(self):
+        # Uma conexão por thread, criada novamente em um processo criado por fork.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM sessions WHERE id = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0] if row is not None else None
+
+    def set(self, key, value, size, ttl=None):
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+            (key, value, now + (self.ttl if ttl is None else ttl)),
+        )
+        if now - self._purged_at >= self.purge_interval:
+            self._purged_at = now
+            connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, key):
+        self._connection().execute("DELETE FROM sessions WHERE id = ?", (key,))
+
+
+def create_store(backend, ttl, max_entries):
+    """Cria o backend das sessões. Retorna None para o backend 'cookie'."""
+    if backend == "cookie":
+        return None
+    if backend == "memory":
+        return TTLCache(ttl=ttl, max_entries=max_entries)
+    if backend == "sqlite":
+        directory = env.get("CACHE_SQLITE_DIR") or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        return SqliteSessionStore(os.path.join(directory, "sessions.db"), ttl=ttl)
+    if backend == "postgres":
+        return PostgresSessionStore(env.get("SESSION_DATABASE_URL"), ttl=ttl)
+    raise ValueError(f"Backend de sessão inválido: {backend}. Opções: {BACKENDS}")
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Sessão de uma requisição, com o id do backend. 'sid' é None até a sessão ser
+    gravada pela primeira vez."""
+
+    def __init__(self, initial=None, sid=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.previous_sid = None
+        self.modified = False
+
+    def regenerate(self):
+        """Troca o id da sessão ao gravá-la (ex: no login), evitando que um id obtido
+        antes da autenticação continue válido depois dela."""
+        if self.sid is not None:
+            self.previous_sid = self.sid
+        self.sid = None
+        self.modified = True
+
+
+class ServerSessionInterface(SessionInterface):
+    """Substitui a sessão em cookie do Flask pela sessão armazenada no backend.
+
+    A sessão só é gravada quando alterada, com a validade de 'ttl' segundos a partir
+    da gravação. Nos backends compartilhados a sessão é armazenada codificada em JSON;
+    no backend em memória é armazenado o próprio dicionário, sem decodificação.
+    As sessões sem a chave 'authenticated_key' (antes do login) são mantidas no
+    cookie assinado do Flask.
+    """
+
+    authenticated_key = "user"
+
+    def __init__(self, app=None, store=None, ttl=86400.0):
+        self.store = store
+        self.ttl = ttl
+        self.cookie_sessions = SecureCookieSessionInterface()
+        if app is not None:
+            self.init_app(app)
+
+    @classmethod
+    def from_env(cls, app=None):
+        ttl = float(env.get("SESSION_TTL", 86400))
+        return cls(
+            app,
+            store=create_store(
+                env.get("SESSION_BACKEND", "sqlite"),
+                ttl,
+                int(env.get("SESSION_MAX_ENTRIES", 100000)),
+            ),
+            ttl=ttl,
+        )
+
+    def init_app(self, app):
+        if self.store is not None:
+            app.session_interface = self
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and SESSION_ID.match(sid):
+            value = self.store.get(sid)
+            if value is None:
+                return ServerSession()
+            return ServerSession(loads(value) if self.store.shared else value, sid)
+        # Sessão anterior ao login, no cookie assinado.
+        signed = self.cookie_sessions.open_session(app, request)
+        return ServerSession(dict(signed) if signed else None)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.previous_sid is not None:
+            self.store.delete(session.previous_sid)
+            session.previous_sid = None
+
+        if self.authenticated_key not in session:
+            # Ex: logout. A sessão deixa o backend e volta ao cookie assinado.
+            if session.sid is not None and session.modified:
+                self.store.delete(session.sid)
+                session.sid = None
+            if session.sid is None:
+                return self.cookie_sessions.save_session(app, session, response)
+
+        if not session:
+            if session.modified:
+                if session.sid is not None:
+                    self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+                response.vary.add("Cookie")
+            return
+        if session.sid is not None:
+            response.vary.add("Cookie")
+        if not session.modified:
+            return
+
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+        self._write(session.sid, dict(session))
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        response.vary.add("Cookie")
+
+    def regenerate(self, session):
+        """Troca o id da sessão atual na próxima gravação. Sem efeito no backend
+        'cookie'."""
+        if isinstance(session, ServerSession):
+            session.regenerate()
+
+    def _write(self, sid, data):
+        value = dumps(data)
+        self.store.set(
+            sid, value if self.store.shared else data, len(value), ttl=self.ttl
+        )
+
+    def create(self, data):
+        """Grava uma sessão com 'data' e retorna o seu id (ex: para os benchmarks)."""
+        sid = secrets.token_urlsafe(32)
+        self._write(sid, data)
+        return sid
+
+
+sessions = ServerSessionInterface.from_env()
@@ -0,0 +1,263 @@
+"""Medição do tempo das requisições do APP.
+
+Para cada requisição são medidos o tempo total, o tempo das requisições aos serviços
+integrados (e das novas conexões), o tempo de decodificação e codificação do JSON,
+os bytes recebidos e enviados e o resultado do cache. As medições são enviadas ao
+cliente no cabeçalho Server-Timing e agregadas em histogramas por rota e por
+operação dos serviços integrados, apresentados na rota /status/timings.
+
+As medições da requisição atual ficam em uma ContextVar, então funcionam tanto nas
+threads do modo síncrono quanto nas tasks do modo assíncrono. Fora de uma requisição
+(ex: atualizações em segundo plano) somente os histogramas dos serviços integrados
+são atualizados.
+"""
+
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+from flask import g, request
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+current = ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    """Medições de uma requisição, em segundos e bytes."""
+
+    __slots__ = ("start", "durations", "cache", "upstreams", "bytes_in")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.durations = Counter()
+        self.cache = None
+        self.upstreams = []
+        self.bytes_in = 0
+
+    def header(self, total):
+        """Valor do cabeçalho Server-Timing, com as durações em milissegundos."""
+        metrics = []
+        if self.cache:
+            metrics.append(f'cache;desc="{self.cache}"')
+        if self.upstreams:
+            operations = " ".join(self.upstreams)
+            metrics.append(
+                f"upstream;dur={self.durations['upstream'] * 1000:.2f};"
+                f'desc="{operations} {self.bytes_in}B"'
+            )
+        for name in ("connect", "decode", "encode"):
+            if name in self.durations:
+                metrics.append(f"{name};dur={self.durations[name] * 1000:.2f}")
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+def record(name, seconds):
+    """Soma uma duração à requisição atual, se houver."""
+    timing = current.get()
+    if timing is not None:
+        timing.durations[name] += seconds
+
+
+@contextmanager
+def measure(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def record_cache(outcome):
+    """Registra o resultado do cache na requisição atual: hit, miss, stale (enviado
+    e atualizado em segundo plano) ou stale-if-error."""
+    timing = current.get()
+    if timing is not None:
+        timing.cache = outcome
+
+
+class Histogram:
+    """Histograma de durações em milissegundos com intervalos fixos."""
+
+    BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, ms):
+        index = 0
+        while index < len(self.BUCKETS) and ms > self.BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += ms
+
+    def percentile(self, fraction):
+        """Estimativa do percentil: o limite superior do intervalo que o contém."""
+        target, cumulative = fraction * self.count, 0
+        for bound, count in zip(self.BUCKETS + (float("inf"),), self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return None
+
+    def stats(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum, 2),
+            "mean_ms": round(self.sum / self.count, 2),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {
+                str(bound): count
+                for bound, count in zip(self.BUCKETS + ("+Inf",), self.counts)
+            },
+        }
+
+
+class Timings:
+    """Inicia e finaliza as medições das requisições do app Flask, e agrega os
+    histogramas por rota e por operação dos serviços integrados. Também é utilizado
+    pelo modo assíncrono (asgi.py) através dos métodos begin e finish.
+    """
+
+    def __init__(self, app=None, enabled=True, header=True):
+        self.enabled = enabled
+        self.header = header
+        self.endpoints = {}
+        self.upstreams = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    @classmethod
+    def from_env(cls, app=None):
+        return cls(
+            app,
+            enabled=env.get("TIMING_ENABLED", "True").lower() in ("1", "true", "yes"),
+            header=env.get("TIMING_HEADER", "True").lower() in ("1", "true", "yes"),
+        )
+
+    def init_app(self, app):
+        # Registrado antes das demais extensões, o after_request é executado por
+        # último e mede a resposta já comprimida.
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def begin(self):
+        """Inicia as medições de uma requisição. Retorna o token para o end."""
+        return current.set(RequestTiming()) if self.enabled else None
+
+    def finish(self, endpoint, bytes_out):
+        """Agrega as medições da requisição atual e retorna o valor do cabeçalho
+        Server-Timing, ou None se ele estiver desativado."""
+        timing = current.get()
+        if timing is None:
+            return None
+        total = time.perf_counter() - timing.start
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {
+                    "total": Histogram(),
+                    "upstream": Histogram(),
+                    "decode": Histogram(),
+                    "encode": Histogram(),
+                    "bytes_in": 0,
+                    "bytes_out": 0,
+                    "cache": Counter(),
+                }
+            stats["total"].observe(total * 1000)
+            for name in ("upstream", "decode", "encode"):
+                if name in timing.durations:
+                    stats[name].observe(timing.durations[name] * 1000)
+            stats["bytes_in"] += timing.bytes_in
+            stats["bytes_out"] += bytes_out or 0
+            if timing.cache:
+                stats["cache"][timing.cache] += 1
+        return timing.header(total) if self.header else None
+
+    def end(self, token):
+        if token is not None:
+            current.reset(token)
+
+    def record_upstream(self, name, operation, seconds, bytes_in=0, failed=False):
+        """Registra uma requisição a um serviço integrado, na requisição atual e no
+        histograma da operação (ex: 'forum:articles')."""
+        if not self.enabled:
+            return
+        key = f"{name}:{operation}"
+        timing = current.get()
+        if timing is not None:
+            timing.durations["upstream"] += seconds
+            timing.upstreams.append(key)
+            timing.bytes_in += bytes_in
+        with self._lock:
+            stats = self.upstreams.get(key)
+            if stats is None:
+                stats = self.upstreams[key] = {
+                    "response": Histogram(),
+                    "bytes_in": 0,
+                    "errors": 0,
+                }
+            stats["response"].observe(seconds * 1000)
+            stats["bytes_in"] += bytes_in
+            stats["errors"] += failed
+
+    def _before_request(self):
+        g.timing_token = self.begin()
+
+    def _after_request(self, response):
+        bytes_out = None if response.is_streamed else response.content_length
+        header = self.finish(request.endpoint or "not_found", bytes_out)
+        if header:
+            response.headers["Server-Timing"] = header
+        return response
+
+    def _teardown_request(self, error=None):
+        self.end(g.pop("timing_token", None))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "endpoints": {
+                    endpoint: {
+                        "total": stats["total"].stats(),
+                        "upstream": stats["upstream"].stats(),
+                        "decode": stats["decode"].stats(),
+                        "encode": stats["encode"].stats(),
+                        "bytes_in": stats["bytes_in"],
+                        "bytes_out": stats["bytes_out"],
+                        "cache": dict(stats["cache"]),
+                    }
+                    for endpoint, stats in self.endpoints.items()
+                },
+                "upstreams": {
+                    key: {
+                        "response": stats["response"].stats(),
+                        "bytes_in": stats["bytes_in"],
+                        "errors": stats["errors"],
+                    }
+                    for key, stats in self.upstreams.items()
+                },
+            }
+
+
+timings = Timings.from_env()
@@ -0,0 +1,301 @@
+"""Rastreamento distribuído (W3C Trace Context) das requisições do APP.
+
+Cada requisição inicia um span, continuando o trace do cabeçalho 'traceparent' da
+requisição recebida, quando existir. As etapas da requisição (consulta ao cache,
+requisição ao serviço integrado e validação da resposta) são spans filhos, e as
+requisições ao Forum API e ao Searcher API levam o cabeçalho 'traceparent' do seu
+span, então o trace continua nos serviços integrados.
+
+Os spans finalizados são enviados ao exportador configurado em TRACING_EXPORTER:
+'none' (somente propaga o trace), 'stdout', 'file' (arquivo TRACING_FILE, uma linha
+JSON por span) ou 'modulo:Classe' para um exportador próprio, que deve implementar
+export(span), recebendo o span como dicionário. Os spans são enviados ao exportador
+por uma fila limitada de TRACING_QUEUE_SIZE spans, em uma thread de fundo, e
+descartados com a fila cheia.
+"""
+
+import importlib
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+from flask import g, request
+
+from json_provider import dumps
+from logger import BoundedQueueHandler, logger
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+current_span = ContextVar("current_span", default=None)
+
+
+class Span:
+    """Uma etapa de um trace, com duração e atributos."""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "sampled",
+        "attributes",
+        "status",
+        "start",
+        "_started",
+    )
+
+    def __init__(self, name, trace_id, parent_id=None, sampled=True, kind="internal"):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.sampled = sampled
+        self.attributes = {}
+        self.status = "ok"
+        self.start = time.time_ns()
+        self._started = time.perf_counter()
+
+    @property
+    def traceparent(self):
+        """Valor do cabeçalho 'traceparent' para as requisições feitas neste span."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_error(self, error):
+        self.status = "error"
+        self.attributes["error.type"] = type(error).__name__
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "duration_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class NoopSpan:
+    """Span utilizado fora de um trace (ex: atualizações em segundo plano)."""
+
+    traceparent = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_error(self, error):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class StdoutExporter:
+    """Escreve cada span como uma linha JSON na saída padrão, para um coletor que
+    leia os logs do container."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = dumps(span).decode() + "\n"
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+
+class FileExporter(StdoutExporter):
+    """Escreve cada span como uma linha JSON em um arquivo local."""
+
+    def __init__(self, path):
+        super().__init__(open(path, "a", encoding="utf-8"))
+
+
+class _ExporterHandler(logging.Handler):
+    """Handler de destino da fila dos spans, executado na thread de fundo."""
+
+    def __init__(self, exporter):
+        super().__init__()
+        self.exporter = exporter
+
+    def emit(self, record):
+        if isinstance(record.msg, dict):
+            self.exporter.export(record.msg)
+        else:
+            # Aviso dos spans descartados com a fila cheia.
+            logger.warning(record.getMessage())
+
+
+class QueuedExporter:
+    """Envia os spans ao exportador em uma thread de fundo, pela mesma fila limitada
+    dos logs (BoundedQueueHandler). A requisição somente coloca o span na fila, sem
+    aguardar a escrita nem o lock do exportador, e com a fila cheia o span é
+    descartado."""
+
+    def __init__(self, exporter, maxsize=10000):
+        self.exporter = exporter
+        self.handler = BoundedQueueHandler(
+            [_ExporterHandler(exporter)], maxsize=maxsize, policy="drop"
+        )
+        self.handler.dropped_message = "Fila de spans cheia: %d spans descartados"
+        self.handler.start()
+        os.register_at_fork(after_in_child=self.handler.restart)
+
+    def export(self, span):
+        record = logging.makeLogRecord(
+            {"name": __name__, "levelno": logging.INFO, "msg": span}
+        )
+        self.handler.enqueue(record)
+
+
+def create_exporter(name, path=None):
+    """Cria o exportador 'none', 'stdout', 'file' ou 'modulo:Classe'."""
+    if not name or name == "none":
+        return None
+    if name == "stdout":
+        return StdoutExporter()
+    if name == "file":
+        return FileExporter(path or "log/traces.jsonl")
+    module, _, attribute = name.partition(":")
+    if not attribute:
+        raise ValueError(f"Exportador de traces inválido: {name}")
+    return getattr(importlib.import_module(module), attribute)()
+
+
+def queued(exporter, maxsize):
+    return QueuedExporter(exporter, maxsize) if exporter is not None else None
+
+
+class Tracer:
+    """Inicia o span de cada requisição do app Flask e os spans das suas etapas.
+    Também é utilizado pelo modo assíncrono (asgi.py) através dos métodos begin e end.
+
+    Os traces iniciados no APP são amostrados com a probabilidade 'sample_rate'; os
+    recebidos pelo 'traceparent' seguem a decisão do serviço que os iniciou. Os spans
+    dos traces não amostrados não são exportados, mas o trace é propagado.
+    """
+
+    def __init__(self, app=None, enabled=True, exporter=None, sample_rate=1.0):
+        self.enabled = enabled
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        if app is not None:
+            self.init_app(app)
+
+    @classmethod
+    def from_env(cls, app=None):
+        return cls(
+            app,
+            enabled=env.get("TRACING_ENABLED", "True").lower() in ("1", "true", "yes"),
+            exporter=queued(
+                create_exporter(
+                    env.get("TRACING_EXPORTER", "none"), env.get("TRACING_FILE")
+                ),
+                int(env.get("TRACING_QUEUE_SIZE", 10000)),
+            ),
+            sample_rate=float(env.get("TRACING_SAMPLE_RATE", 1.0)),
+        )
+
+    def init_app(self, app):
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def begin(self, name, traceparent=None, **attributes):
+        """Inicia o span de uma requisição recebida, continuando o trace do cabeçalho
+        'traceparent', se válido. Retorna o token para o end."""
+        if not self.enabled:
+            return None
+        match = TRACEPARENT.match(traceparent or "")
+        if match and match.group(1) != "0" * 32:
+            trace_id, parent_id = match.group(1), match.group(2)
+            sampled = int(match.group(3), 16) & 1 == 1
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < self.sample_rate
+        span = Span(name, trace_id, parent_id, sampled, kind="server")
+        span.attributes.update(attributes)
+        return current_span.set(span)
+
+    def end(self, token, error=None):
+        if token is None:
+            return
+        span = current_span.get()
+        current_span.reset(token)
+        if error is not None:
+            span.record_error(error)
+        elif span.attributes.get("http.status_code", 0) >= 500:
+            span.status = "error"
+        self._export(span)
+
+    def current(self):
+        """Span atual, ou um span que não é registrado fora de um trace."""
+        return current_span.get() or NOOP_SPAN
+
+    @contextmanager
+    def span(self, name, kind="internal", **attributes):
+        """Span de uma etapa da requisição atual. Fora de um trace retorna um span
+        que não é registrado."""
+        parent = current_span.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+        span = Span(name, parent.trace_id, parent.span_id, parent.sampled, kind)
+        span.attributes.update(attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.record_error(error)
+            raise
+        finally:
+            current_span.reset(token)
+            self._export(span)
+
+    def _export(self, span):
+        if self.exporter is not None and span.sampled:
+            self.exporter.export(span.to_dict())
+
+    def _before_request(self):
+        attributes = {
+            "http.method": request.method,
+            "http.target": request.full_path.rstrip("?"),
+        }
+        g.trace_token = self.begin(
+            request.endpoint or "not_found",
+            request.headers.get("traceparent"),
+            **attributes,
+        )
+
+    def _after_request(self, response):
+        self.current().set_attribute("http.status_code", response.status_code)
+        return response
+
+    def _teardown_request(self, error=None):
+        self.end(g.pop("trace_token", None), error)
+
+
+tracer = Tracer.from_env()
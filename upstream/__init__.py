@@ -0,0 +1,19 @@
+from upstream.client import (
+    UpstreamClient,
+    forum_client,
+    searcher_client,
+)
+
+from upstream.singleflight import (
+    SingleFlight,
+    forum_flight,
+    searcher_flight,
+)
+
+from upstream.streaming import iter_graphql_items
+
+from upstream.resilience import (
+    Bulkhead,
+    CircuitBreaker,
+    UpstreamUnavailable,
+)
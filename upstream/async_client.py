@@ -0,0 +1,179 @@
+import asyncio
+import json
+import time
+
+import aiohttp
+
+from metrics import metrics
+from timing import record
+from tracing import tracer
+from upstream.client import record_upstream, traced_kwargs, upstream_operation
+from upstream.settings import env_setting
+from upstream.resilience import Bulkhead, CircuitBreaker
+
+
+class AsyncUpstreamResponse:
+    """Resposta já lida de um serviço integrado, com a mesma interface utilizada do
+    requests.Response (status_code, content e json()).
+    """
+
+    def __init__(self, status_code, content, operation=None):
+        self.status_code = status_code
+        self.content = content
+        self.operation = operation
+
+    def json(self):
+        return json.loads(self.content)
+
+
+async def _on_request_start(session, context, params):
+    context.host = f"{params.url.host}:{params.url.port}"
+
+
+async def _on_connection_create_start(session, context, params):
+    context.connect_start = time.perf_counter()
+
+
+async def _on_connection_create_end(session, context, params):
+    # Executado na task da requisição, então é registrado na requisição atual.
+    record("connect", time.perf_counter() - context.connect_start)
+    metrics.connection_opened(context.host)
+
+
+def connection_trace_config():
+    """TraceConfig do aiohttp que mede o tempo de abertura das conexões."""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    return trace_config
+
+
+class AsyncUpstreamClient:
+    """Cliente HTTP não bloqueante para um serviço integrado, utilizado no modo ASGI.
+
+    Mantém uma aiohttp.ClientSession com pool de conexões keep-alive, os mesmos timeouts
+    do cliente síncrono e retentativas somente para requisições GET. O circuit breaker
+    e o bulkhead podem ser compartilhados com o cliente síncrono do mesmo serviço.
+    """
+
+    def __init__(
+        self,
+        name,
+        base_url,
+        pool_maxsize=100,
+        connect_timeout=3.05,
+        read_timeout=30.0,
+        get_retries=2,
+        breaker=None,
+        bulkhead=None,
+    ):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker(name)
+        self.bulkhead = bulkhead or Bulkhead(name)
+        self.base_url = base_url or ""
+        self.pool_maxsize = pool_maxsize
+        self.get_retries = get_retries
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        self._session = None
+        metrics.upstream_pool_size(name, pool_maxsize)
+
+    @classmethod
+    def from_env(cls, name, prefix, base_url, breaker=None, bulkhead=None):
+        """Cria o cliente com as configurações lidas das variáveis de ambiente."""
+        return cls(
+            name,
+            base_url,
+            pool_maxsize=env_setting(prefix, "ASYNC_POOL_MAXSIZE", 100),
+            connect_timeout=env_setting(prefix, "CONNECT_TIMEOUT", 3.05, cast=float),
+            read_timeout=env_setting(prefix, "READ_TIMEOUT", 30.0, cast=float),
+            get_retries=env_setting(prefix, "GET_RETRIES", 2),
+            breaker=breaker or CircuitBreaker.from_env(name, prefix),
+            bulkhead=bulkhead or Bulkhead.from_env(name, prefix),
+        )
+
+    @property
+    def session(self):
+        # A ClientSession deve ser criada dentro do event loop em que será utilizada.
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_maxsize)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                trace_configs=[connection_trace_config()],
+            )
+        return self._session
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, method, path="", **kwargs):
+        operation = upstream_operation(path, kwargs)
+        attributes = {"http.method": method, "upstream.operation": operation}
+        with tracer.span(f"{self.name} {operation}", "client", **attributes) as span:
+            result = await self._send(
+                method, path, operation, **traced_kwargs(span, kwargs)
+            )
+            span.set_attribute("http.status_code", result.status_code)
+        result.operation = operation
+        return result
+
+    async def _send(self, method, path, operation, **kwargs):
+        async with self.bulkhead.slot_async():
+            probe = self.breaker.before_call()
+            try:
+                return await self._record(method, path, operation, **kwargs)
+            finally:
+                # Ex: requisição cancelada pela desconexão do cliente. Sem efeito se o
+                # resultado já foi registrado no circuit breaker.
+                if probe:
+                    self.breaker.release_probe()
+
+    async def _record(self, method, path, operation, **kwargs):
+        start = time.perf_counter()
+        try:
+            async with self.session.request(
+                method, self.base_url + path, **kwargs
+            ) as response:
+                result = AsyncUpstreamResponse(response.status, await response.read())
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.breaker.record_failure()
+            record_upstream(self.name, operation, time.perf_counter() - start)
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        record_upstream(
+            self.name,
+            operation,
+            time.perf_counter() - start,
+            result.status_code,
+            len(result.content),
+        )
+        if result.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return result
+
+    async def post(self, path="", **kwargs):
+        return await self.request("POST", path, **kwargs)
+
+    async def get(self, path="", **kwargs):
+        attempt = 0
+        while True:
+            try:
+                response = await self.request("GET", path, **kwargs)
+                if response.status_code not in (502, 503, 504):
+                    return response
+                if attempt >= self.get_retries:
+                    return response
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.get_retries:
+                    raise
+            await asyncio.sleep(0.1 * (2**attempt))
+            attempt += 1
@@ -0,0 +1,278 @@
+import re
+import time
+from os import environ as env
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from metrics import metrics
+from queries import operation_name
+from timing import record, timings
+from tracing import tracer
+from upstream.settings import env_setting
+from upstream.resilience import Bulkhead, CircuitBreaker
+
+BATCH_ROOT = re.compile(r"\{\s*\w+\s*:")
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """Conexão que registra o tempo de abertura (DNS, TCP) na requisição atual."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            record("connect", time.perf_counter() - start)
+            metrics.connection_opened(f"{self.host}:{self.port}")
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """Conexão que registra o tempo de abertura (DNS, TCP e TLS) na requisição atual."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            record("connect", time.perf_counter() - start)
+            metrics.connection_opened(f"{self.host}:{self.port}")
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def upstream_operation(path, kwargs):
+    """Nome da operação de uma requisição a um serviço integrado, utilizado nas
+    medições: o campo raiz da query graphql (ex: 'articleById'), 'batch' para os
+    documentos com aliases, ou o caminho da requisição (ex: '/searcher').
+    """
+    payload = kwargs.get("json")
+    if isinstance(payload, dict) and payload.get("query"):
+        if BATCH_ROOT.search(payload["query"]):
+            return "batch"
+        return operation_name(payload["query"]) or "graphql"
+    return path or "/"
+
+
+def traced_kwargs(span, kwargs):
+    """Acrescenta o cabeçalho 'traceparent' do span às opções da requisição."""
+    if span.traceparent:
+        headers = dict(kwargs.get("headers") or {})
+        headers["traceparent"] = span.traceparent
+        kwargs["headers"] = headers
+    return kwargs
+
+
+def record_upstream(name, operation, seconds, status=None, size=0):
+    """Registra uma requisição a um serviço integrado nas medições da requisição
+    atual (timing.py) e nas métricas (metrics.py). Sem 'status' a requisição falhou
+    com uma exceção."""
+    failed = status is None or status >= 500
+    timings.record_upstream(name, operation, seconds, size, failed=failed)
+    metrics.observe_upstream(name, operation, seconds, status)
+
+
+def release_on_close(close, bulkhead):
+    """Retorna o 'close' de uma resposta que também libera a vaga do bulkhead, uma
+    única vez mesmo que a resposta seja fechada novamente."""
+    released = []
+
+    def closing():
+        try:
+            close()
+        finally:
+            if not released:
+                released.append(True)
+                bulkhead.release()
+
+    return closing
+
+
+class UpstreamClient:
+    """Cliente HTTP compartilhado para um serviço integrado (Forum API ou Searcher API).
+
+    Mantém uma requests.Session com pool de conexões keep-alive por host, timeouts de
+    conexão e leitura, e retentativas somente para requisições GET (idempotentes).
+    As requisições passam pelo bulkhead (limite de requisições simultâneas) e pelo
+    circuit breaker do serviço, que falham com UpstreamUnavailable.
+    """
+
+    def __init__(
+        self,
+        name,
+        base_url,
+        pool_connections=10,
+        pool_maxsize=20,
+        pool_block=False,
+        connect_timeout=3.05,
+        read_timeout=30.0,
+        get_retries=2,
+        breaker=None,
+        bulkhead=None,
+    ):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker(name)
+        self.bulkhead = bulkhead or Bulkhead(name)
+        self.base_url = base_url or ""
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_maxsize = pool_maxsize
+
+        retry = Retry(
+            total=get_retries,
+            backoff_factor=0.1,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=retry,
+        )
+        # Pools com as conexões que medem o tempo de abertura.
+        self.adapter.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        metrics.upstream_pool_size(name, pool_maxsize)
+
+    @classmethod
+    def from_env(cls, name, prefix, base_url):
+        """Cria o cliente com as configurações lidas das variáveis de ambiente."""
+        return cls(
+            name,
+            base_url,
+            pool_connections=env_setting(prefix, "POOL_CONNECTIONS", 10),
+            pool_maxsize=env_setting(prefix, "POOL_MAXSIZE", 20),
+            pool_block=env_setting(prefix, "POOL_BLOCK", False, cast=bool),
+            connect_timeout=env_setting(prefix, "CONNECT_TIMEOUT", 3.05, cast=float),
+            read_timeout=env_setting(prefix, "READ_TIMEOUT", 30.0, cast=float),
+            get_retries=env_setting(prefix, "GET_RETRIES", 2),
+            breaker=CircuitBreaker.from_env(name, prefix),
+            bulkhead=Bulkhead.from_env(name, prefix),
+        )
+
+    def request(self, method, path="", **kwargs):
+        """Executa a requisição no span '<serviço> <operação>' do trace atual,
+        propagando o trace ao serviço pelo cabeçalho 'traceparent'."""
+        kwargs.setdefault("timeout", self.timeout)
+        operation = upstream_operation(path, kwargs)
+        attributes = {"http.method": method, "upstream.operation": operation}
+        with tracer.span(f"{self.name} {operation}", "client", **attributes) as span:
+            response = self._send(
+                method, path, operation, **traced_kwargs(span, kwargs)
+            )
+            span.set_attribute("http.status_code", response.status_code)
+        # Utilizado nas métricas dos erros graphql, registrados na decodificação.
+        response.operation = operation
+        return response
+
+    def _send(self, method, path, operation, **kwargs):
+        self.bulkhead.acquire()
+        streaming = False
+        try:
+            probe = self.breaker.before_call()
+            try:
+                response = self._record(method, path, operation, **kwargs)
+            finally:
+                # Sem efeito se o resultado já foi registrado no circuit breaker.
+                if probe:
+                    self.breaker.release_probe()
+            if kwargs.get("stream"):
+                # O corpo das respostas lidas em partes ainda será recebido, então a
+                # vaga do bulkhead só é liberada quando a resposta é fechada.
+                response.close = release_on_close(response.close, self.bulkhead)
+                streaming = True
+            return response
+        finally:
+            if not streaming:
+                self.bulkhead.release()
+
+    def _record(self, method, path, operation, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, **kwargs)
+        except RequestException:
+            self.breaker.record_failure()
+            record_upstream(self.name, operation, time.perf_counter() - start)
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        # As respostas lidas em partes (stream=True) ainda não foram recebidas: o
+        # tempo é o de recebimento dos cabeçalhos e os bytes os do Content-Length.
+        if kwargs.get("stream"):
+            size = int(response.headers.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+        record_upstream(
+            self.name,
+            operation,
+            time.perf_counter() - start,
+            response.status_code,
+            size,
+        )
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def get(self, path="", **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path="", **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def pool_stats(self):
+        """Retorna as estatísticas de cada pool de conexões (um por host) do cliente."""
+        pools = []
+        manager = self.adapter.poolmanager
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is None or pool.pool is None:
+                continue
+            queue = pool.pool
+            idle = sum(1 for conn in list(queue.queue) if conn is not None)
+            pools.append(
+                {
+                    "host": f"{pool.host}:{pool.port}",
+                    "maxsize": queue.maxsize,
+                    "in_use": queue.maxsize - queue.qsize(),
+                    "idle": idle,
+                    "connections_created": pool.num_connections,
+                    "requests": pool.num_requests,
+                }
+            )
+        return {
+            "name": self.name,
+            "pool_maxsize": self.pool_maxsize,
+            "pools": pools,
+        }
+
+    def health(self):
+        """Retorna o estado do circuit breaker e do bulkhead do serviço."""
+        return {
+            "name": self.name,
+            "breaker": self.breaker.stats(),
+            "bulkhead": self.bulkhead.stats(),
+        }
+
+
+forum_client = UpstreamClient.from_env("forum", "FORUM", env.get("FORUM_API_URL"))
+searcher_client = UpstreamClient.from_env(
+    "searcher", "SEARCH", env.get("SEARCH_API_URL")
+)
@@ -0,0 +1,223 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from requests.exceptions import RequestException
+
+from metrics import metrics
+from upstream.settings import env_setting
+
+
+class UpstreamUnavailable(RequestException):
+    """O serviço integrado não foi chamado: o circuito está aberto ou o limite de
+    requisições simultâneas foi atingido. 'retry_after' indica em quantos segundos uma
+    nova tentativa pode ser feita."""
+
+    def __init__(self, name, reason, retry_after=1):
+        super().__init__(f"{name}: {reason}")
+        self.name = name
+        self.reason = reason
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class CircuitBreaker:
+    """Circuit breaker de um serviço integrado.
+
+    Após 'failure_threshold' falhas seguidas (erros de conexão, timeouts ou status 5xx)
+    o circuito abre e as chamadas falham imediatamente com UpstreamUnavailable, sem
+    ocupar threads e conexões aguardando um serviço que não responde. Depois de
+    'reset_timeout' segundos uma única chamada de teste é permitida (meio aberto): se
+    tiver sucesso o circuito fecha, senão abre novamente. Uma chamada de teste que
+    termina sem resultado (ex: cancelada) é liberada por release_probe, e a próxima
+    chamada é o novo teste.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name, prefix):
+        return cls(
+            name,
+            failure_threshold=env_setting(prefix, "BREAKER_FAILURES", 5),
+            reset_timeout=env_setting(prefix, "BREAKER_RESET_TIMEOUT", 30.0, float),
+        )
+
+    def before_call(self):
+        """Verifica se a chamada pode ser feita, senão gera UpstreamUnavailable.
+        Retorna True se a chamada é a chamada de teste do circuito meio aberto, que
+        deve ser liberada com release_probe ao terminar."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+        metrics.upstream_rejected(self.name, "circuit open")
+        raise UpstreamUnavailable(self.name, "circuit open", max(remaining, 1))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Libera a chamada de teste que terminou sem record_success ou record_failure,
+        assim o circuito não fica meio aberto rejeitando todas as chamadas."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class Bulkhead:
+    """Limita as requisições simultâneas a um serviço integrado.
+
+    Assim um serviço lento ocupa no máximo 'max_concurrent' threads do APP, e as
+    demais rotas continuam sendo atendidas. Uma chamada aguarda até 'max_wait'
+    segundos por uma vaga, senão falha com UpstreamUnavailable. O limite é
+    compartilhado entre as threads e o event loop do modo assíncrono.
+    """
+
+    def __init__(self, name, max_concurrent=50, max_wait=0.5):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.in_use = 0
+        self.rejected = 0
+        self._available = threading.Condition()
+        # (event loop, future) das chamadas do modo assíncrono aguardando uma vaga.
+        self._async_waiters = deque()
+
+    @classmethod
+    def from_env(cls, name, prefix):
+        return cls(
+            name,
+            max_concurrent=env_setting(prefix, "BULKHEAD_SIZE", 50),
+            max_wait=env_setting(prefix, "BULKHEAD_WAIT", 0.5, float),
+        )
+
+    def _try_acquire(self):
+        if self.in_use < self.max_concurrent:
+            self.in_use += 1
+            metrics.upstream_in_flight(self.name, 1)
+            return True
+        return False
+
+    def _reject(self):
+        self.rejected += 1
+        metrics.upstream_rejected(self.name, "too many concurrent requests")
+        return UpstreamUnavailable(self.name, "too many concurrent requests")
+
+    def acquire(self):
+        """Ocupa uma vaga, aguardando até 'max_wait' segundos. Cada acquire deve ter
+        exatamente um release."""
+        with self._available:
+            if not self._available.wait_for(self._try_acquire, self.max_wait):
+                raise self._reject()
+
+    def release(self):
+        with self._available:
+            self.in_use -= 1
+            metrics.upstream_in_flight(self.name, -1)
+            self._available.notify()
+            self._wake_async()
+
+    def _wake_async(self):
+        while self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            if waiter.done():
+                continue
+            try:
+                loop.call_soon_threadsafe(self._resolve, waiter)
+                return
+            except RuntimeError:
+                # Event loop já encerrado.
+                continue
+
+    def _resolve(self, waiter):
+        if waiter.done():
+            # A espera terminou antes (timeout), então a vaga é passada adiante.
+            with self._available:
+                self._wake_async()
+        else:
+            waiter.set_result(None)
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def slot_async(self):
+        # Aguarda a notificação do release, sem bloquear o event loop.
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            with self._available:
+                if self._try_acquire():
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._reject()
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                pass
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        with self._available:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_wait": self.max_wait,
+                "in_use": self.in_use,
+                "rejected": self.rejected,
+            }
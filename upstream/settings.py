@@ -0,0 +1,18 @@
+from os import environ as env
+from dotenv import find_dotenv, load_dotenv
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+def env_setting(prefix, name, default, cast=int):
+    """Lê uma configuração do upstream. A variável específica do serviço
+    (ex: FORUM_POOL_MAXSIZE) tem prioridade sobre a global (ex: UPSTREAM_POOL_MAXSIZE).
+    """
+    value = env.get(f"{prefix}_{name}") or env.get(f"UPSTREAM_{name}")
+    if value in (None, ""):
+        return default
+    if cast is bool:
+        return value.lower() in ("1", "true", "yes")
+    return cast(value)
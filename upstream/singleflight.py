@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Agrupa chamadas idênticas e simultâneas a um serviço integrado.
+
+    Enquanto uma chamada para uma chave estiver em andamento, as demais chamadas com a
+    mesma chave aguardam e recebem o mesmo resultado, ao invés de fazer outra
+    requisição. Funciona tanto com threads (do) quanto no event loop (do_async).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.collapsed = 0
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def do_async(self, key, coroutine_fn):
+        future = self._async_calls.get(key)
+        if future is not None:
+            with self._lock:
+                self.collapsed += 1
+            return await asyncio.shield(future)
+
+        future = self._async_calls[key] = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self.calls += 1
+        try:
+            result = await coroutine_fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Evita o aviso de exceção não recuperada quando não há outras chamadas.
+            future.exception()
+            raise
+        finally:
+            del self._async_calls[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.calls + self.collapsed
+            return {
+                "calls": self.calls,
+                "collapsed": self.collapsed,
+                "in_flight": len(self._calls) + len(self._async_calls),
+                "collapsed_ratio": round(self.collapsed / total, 4) if total else 0.0,
+            }
+
+
+forum_flight = SingleFlight("forum")
+searcher_flight = SingleFlight("searcher")
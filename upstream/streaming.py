@@ -0,0 +1,30 @@
+import ijson
+
+
+def iter_graphql_items(stream, field):
+    """Lê incrementalmente a resposta graphql em 'stream' (um objeto com read(), ex:
+    requests.Response.raw) e retorna cada item da lista data.<field> assim que é
+    lido, sem carregar a resposta inteira na memória.
+
+    Gera tuplas ("item", valor) para os itens e ("errors", lista) para os erros da
+    resposta, que podem vir antes ou depois dos dados.
+    """
+    captures = {f"data.{field}.item": "item", "errors": "errors"}
+    builder = kind = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == capture and event in ("end_map", "end_array"):
+                yield kind, builder.value
+                builder = None
+            continue
+
+        kind = captures.get(prefix)
+        if kind is None:
+            continue
+        if event in ("start_map", "start_array"):
+            capture = prefix
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif event != "null":
+            yield kind, value
@@ -0,0 +1,232 @@
+"""Pré-carregamento dos caches na inicialização do APP.
+
+Logo após um deploy os caches estão vazios, e as primeiras requisições são todas
+encaminhadas ao Forum API e ao Searcher API. O WarmUp executa em segundo plano, com
+concorrência limitada, as leituras mais comuns: a listagem de artigos, as listagens
+dos períodos recentes e os termos de busca mais utilizados (informados diretamente ou
+lidos do log de acesso do dia anterior). A rota /status/ready responde 200 somente
+depois do pré-carregamento.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from os import environ as env
+from urllib.parse import parse_qs
+from dotenv import find_dotenv, load_dotenv
+
+from logger import logger
+from cache import normalize_term
+from queries import articles_query, articles_by_period_query
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+
+SEARCH_REQUEST = re.compile(r"/api/searcher\?(\S+?)[\s\"]")
+
+
+def period_windows(days, today=None):
+    """Variáveis das queries por período terminando hoje, uma para cada quantidade de
+    dias, no formato de data utilizado pelas rotas (dd-mm-aaaa)."""
+    today = today or date.today()
+    return [
+        {
+            "initialDate": (today - timedelta(days=day)).strftime("%d-%m-%Y"),
+            "endDate": today.strftime("%d-%m-%Y"),
+        }
+        for day in days
+    ]
+
+
+def top_search_terms(lines, limit):
+    """Retorna os 'limit' termos mais buscados nas linhas de um log de acesso,
+    agrupados pelo termo normalizado. De cada grupo é retornado o termo como foi mais
+    buscado, e não o normalizado, que é somente a chave do search_cache.
+
+    ex: 'Direito Moradia' (3x), 'moradia direito' (1x) -> ['Direito Moradia']
+    """
+    counter = Counter()
+    originals = {}
+    for line in lines:
+        for match in SEARCH_REQUEST.finditer(line):
+            for term in parse_qs(match.group(1)).get("term", []):
+                key = normalize_term(term)
+                if key:
+                    counter[key] += 1
+                    originals.setdefault(key, Counter())[term] += 1
+    return [
+        originals[key].most_common(1)[0][0] for key, _ in counter.most_common(limit)
+    ]
+
+
+# Os blueprints são importados nas funções, pois o status_bp importa este módulo.
+
+
+def forum_read(query, variables=None):
+    from blueprint.forum_bp import fetch_forum_query
+
+    data = fetch_forum_query(query, variables)
+    if data.get("errors"):
+        raise ValueError(data["errors"])
+
+
+def search_read(term):
+    from blueprint.searcher_bp import search_term
+
+    status_code, _ = search_term(term)
+    if status_code != 200:
+        raise ValueError(f"Searcher API status code {status_code}")
+
+
+class WarmUp:
+    """Executa as leituras de pré-carregamento em segundo plano, com no máximo
+    'concurrency' leituras simultâneas.
+
+    Uma leitura que falha é somente contabilizada: o APP fica pronto ao final do
+    pré-carregamento, ou após 'timeout' segundos, mesmo com falhas.
+    """
+
+    def __init__(
+        self,
+        enabled=True,
+        concurrency=4,
+        timeout=60.0,
+        period_days=(),
+        search_terms=(),
+        search_log=None,
+        search_top=20,
+    ):
+        self.enabled = enabled
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.period_days = period_days
+        self.search_terms = list(search_terms)
+        self.search_log = search_log
+        self.search_top = search_top
+        self.state = "pending" if enabled else "disabled"
+        self.tasks = 0
+        self.completed = 0
+        self.failed = 0
+        self.duration = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        if not enabled:
+            self._ready.set()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=env.get("WARMUP_ENABLED", "True").lower() in ("1", "true", "yes"),
+            concurrency=int(env.get("WARMUP_CONCURRENCY", 4)),
+            timeout=float(env.get("WARMUP_TIMEOUT", 60)),
+            period_days=[
+                int(day)
+                for day in env.get("WARMUP_PERIOD_DAYS", "7,30").split(",")
+                if day
+            ],
+            search_terms=[
+                term for term in env.get("WARMUP_SEARCH_TERMS", "").split(",") if term
+            ],
+            search_log=env.get("WARMUP_SEARCH_LOG") or None,
+            search_top=int(env.get("WARMUP_SEARCH_TOP", 20)),
+        )
+
+    def start(self):
+        """Inicia o pré-carregamento em uma thread, sem atrasar a inicialização.
+
+        Não é chamado na importação do APP, e sim uma vez em cada processo que atende
+        requisições: pelo init_app.py, pelo gunicorn após carregar o APP em cada worker
+        (post_worker_init no gunicorn.conf.py) e na inicialização da aplicação ASGI
+        (lifespan no asgi.py). As chamadas seguintes no mesmo processo não têm efeito.
+        """
+        with self._lock:
+            if self.state != "pending":
+                return
+            self.state = "running"
+        threading.Thread(target=self.run, name="warmup", daemon=True).start()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def reads(self):
+        """Lista as leituras do pré-carregamento como (descrição, função)."""
+        reads = [("articles", lambda: forum_read(articles_query))]
+        for variables in period_windows(self.period_days):
+            reads.append(
+                (
+                    f"articlesByPeriod {variables['initialDate']}",
+                    lambda v=variables: forum_read(articles_by_period_query, v),
+                )
+            )
+        for term in self._search_terms():
+            reads.append((f"searcher {term}", lambda t=term: search_read(t)))
+        return reads
+
+    def _search_terms(self):
+        terms = list(self.search_terms)
+        if self.search_log:
+            try:
+                with open(self.search_log, encoding="utf-8", errors="replace") as file:
+                    terms += top_search_terms(file, self.search_top)
+            except OSError as error:
+                logger.warning("Log de buscas do pré-carregamento ignorado: %s", error)
+        unique = {}
+        for term in terms:
+            unique.setdefault(normalize_term(term), term)
+        return list(unique.values())
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            reads = self.reads()
+            self.tasks = len(reads)
+            executor = ThreadPoolExecutor(self.concurrency, "warmup")
+            futures = [executor.submit(self._read, *read) for read in reads]
+            wait(futures, timeout=self.timeout)
+            executor.shutdown(wait=False, cancel_futures=True)
+        except Exception as error:
+            logger.warning("Falha no pré-carregamento dos caches: %s", error)
+        finally:
+            self.duration = round(time.perf_counter() - start, 3)
+            self.state = "done"
+            self._ready.set()
+        logger.info(
+            "Pré-carregamento concluído em %ss: %d de %d leituras, %d falhas.",
+            self.duration,
+            self.completed,
+            self.tasks,
+            self.failed,
+        )
+
+    def _read(self, name, read):
+        try:
+            read()
+            with self._lock:
+                self.completed += 1
+        except Exception as error:
+            with self._lock:
+                self.failed += 1
+            logger.warning("Falha no pré-carregamento de %s: %s", name, error)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "ready": self.ready,
+                "tasks": self.tasks,
+                "completed": self.completed,
+                "failed": self.failed,
+                "duration": self.duration,
+            }
+
+
+warmup = WarmUp.from_env()